@@ -1,7 +1,21 @@
 """Base class for database connectors used in the application."""
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Tuple
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import orjson
 
 from models.connection import Connection
 from models.metadata import ColumnMetadata, RelationshipMetadata, TableMetadata
@@ -11,6 +25,9 @@ from models.query import ColumnInfo
 class DatabaseConnector(ABC):
     """Base class for all database connectors."""
 
+    # Whether execute_query_copy is implemented
+    supports_export = False
+
     def __init__(self, connection: Connection):
         """Initialize the connector with connection details.
 
@@ -18,6 +35,37 @@ class DatabaseConnector(ABC):
             connection: The connection configuration
         """
         self.connection = connection
+        self._warmup_task: Optional["asyncio.Task[None]"] = None
+        # Held while connect() opens pools or clients, so concurrent callers open them once
+        self._connect_lock = asyncio.Lock()
+
+    def start_warmup(self) -> None:
+        """Start connecting in the background so the first query doesn't pay for it.
+
+        Errors are not raised here; they surface on the next call to connect().
+        Does nothing when called outside a running event loop.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        task = loop.create_task(self.connect())
+        # Mark the exception as retrieved; _join_warmup re-raises it to the caller
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._warmup_task = task
+
+    async def _join_warmup(self) -> None:
+        """Wait for a pending background warm-up, re-raising its error if it failed."""
+        task = self._warmup_task
+        if task is None or task is asyncio.current_task():
+            return
+        try:
+            await task
+        finally:
+            # Keep the task visible until it finishes so concurrent callers wait on it too
+            if self._warmup_task is task:
+                self._warmup_task = None
 
     @abstractmethod
     async def connect(self) -> None:
@@ -44,6 +92,12 @@ class DatabaseConnector(ABC):
         """
         pass
 
+    def invalidate_metadata(self) -> None:
+        """Drop any cached metadata so the next get_metadata() reads the database.
+
+        Connectors that cache metadata should override this.
+        """
+
     @abstractmethod
     async def execute_query(
         self, sql: str, params: Optional[Dict[str, Any]] = None
@@ -60,6 +114,84 @@ class DatabaseConnector(ABC):
         """
         pass
 
+    async def execute_query_rows(
+        self, sql: str, params: Optional[Dict[str, Any]] = None
+    ) -> Tuple[List[str], List[Tuple[Any, ...]], List["ColumnInfo"], float]:
+        """Execute a SQL query and return rows as tuples.
+
+        Column names are returned once instead of being repeated in every row.
+        Connectors whose driver already yields tuple-like rows should override this.
+
+        Args:
+            sql: The SQL query to execute
+            params: Query parameters
+
+        Returns:
+            Tuple of (column_names, rows, column_info, execution_time)
+        """
+        results, columns, execution_time = await self.execute_query(sql, params)
+        column_names = [column.name for column in columns]
+        rows = [tuple(row[name] for name in column_names) for row in results]
+        return column_names, rows, columns, execution_time
+
+    async def execute_query_columnar(
+        self, sql: str, params: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Dict[str, List[Any]], List["ColumnInfo"], float]:
+        """Execute a SQL query and return results as one list of values per column.
+
+        Args:
+            sql: The SQL query to execute
+            params: Query parameters
+
+        Returns:
+            Tuple of (data, column_info, execution_time)
+            where data maps each column name to its values in row order
+        """
+        column_names, rows, columns, execution_time = await self.execute_query_rows(sql, params)
+        data = {name: [row[i] for row in rows] for i, name in enumerate(column_names)}
+        return data, columns, execution_time
+
+    async def execute_with_streaming_json(
+        self, sql: str, params: Optional[Dict[str, Any]] = None, batch_size: int = 1000
+    ) -> AsyncIterator[bytes]:
+        """Execute a SQL query and yield result rows as newline-delimited JSON.
+
+        This default runs the whole query before yielding anything. Connectors that can
+        read through a server-side cursor should override it to fetch batch_size rows
+        at a time.
+
+        Args:
+            sql: The SQL query to execute
+            params: Query parameters
+            batch_size: Number of rows to fetch per round-trip
+
+        Yields:
+            One JSON object per row, terminated by a newline
+        """
+        results, _, _ = await self.execute_query(sql, params)
+        for row in results:
+            yield orjson.dumps(row, default=str, option=orjson.OPT_APPEND_NEWLINE)
+
+    async def execute_query_copy(
+        self,
+        sql: str,
+        params: Optional[Dict[str, Any]],
+        out: Union[BinaryIO, Callable[[bytes], Awaitable[Any]]],
+        format: str = "binary",
+    ) -> None:
+        """Write query results to out using the database's bulk export protocol.
+
+        Args:
+            sql: The SQL query to execute
+            params: Query parameters
+            out: A binary file object, or a coroutine function called with each chunk
+            format: Export format ("binary" or "csv")
+
+        Raises:
+            NotImplementedError: If the connector has no bulk export path
+        """
+        raise NotImplementedError(f"Export is not supported for {self.get_dialect()}")
+
     @abstractmethod
     async def get_query_explanation(
         self, sql: str, params: Optional[Dict[str, Any]] = None
@@ -1,6 +1,8 @@
 """Connector implementation for Google BigQuery databases."""
 
 import asyncio
+import contextlib
+import functools
 import json
 import logging
 import time
@@ -34,12 +36,13 @@ class BigQueryConnector(DatabaseConnector):
 
     async def connect(self) -> None:
         """Establish connection to the database."""
+        await self._join_warmup()
         if self.client:
             return
 
         try:
             # Log connection attempt
-            logger.info(f"Connecting to BigQuery with project {self.connection.config.project_id}")
+            logger.info("Connecting to BigQuery with project %s", self.connection.config.project_id)
 
             # Create credentials from service account JSON
             credentials_info = json.loads(self.connection.config.credentials_json)
@@ -117,7 +120,7 @@ class BigQueryConnector(DatabaseConnector):
 
         try:
             logger.info(
-                f"Fetching metadata for BigQuery project: {self.connection.config.project_id}"
+                "Fetching metadata for BigQuery project: %s", self.connection.config.project_id
             )
 
             # Get datasets
@@ -142,7 +145,7 @@ class BigQueryConnector(DatabaseConnector):
                 # dataset_id = dataset
 
                 logger.info(
-                    f"Getting tables for dataset: {dataset_id} in project: {dataset_project}"
+                    "Getting tables for dataset: %s in project: %s", dataset_id, dataset_project
                 )
 
                 # Construct the fully qualified dataset ID if using a different project
@@ -157,22 +160,30 @@ class BigQueryConnector(DatabaseConnector):
                 bq_tables = await self._run_in_executor(
                     lambda: list(client.list_tables(fully_qualified_dataset))
                 )
-                logger.info(f"Tables: {bq_tables} for dataset: {dataset_id}")
-                for table_ref in bq_tables:
-                    table_id = table_ref.table_id
+                logger.info("Tables: %s for dataset: %s", bq_tables, dataset_id)
 
+                # Get detailed table information for all tables at once; the executor's
+                # worker count bounds how many requests are in flight
+                table_ids = [table_ref.table_id for table_ref in bq_tables]
+                client = await self.get_client()
+                bq_table_details = await asyncio.gather(
+                    *(
+                        self._run_in_executor(
+                            functools.partial(
+                                client.get_table, f"{fully_qualified_dataset}.{table_id}"
+                            )
+                        )
+                        for table_id in table_ids
+                    )
+                )
+
+                for table_id, table in zip(table_ids, bq_table_details):
                     # For display purposes, include project in the ID if it's different
                     if dataset_project != self.connection.config.project_id:
                         full_table_id = f"{dataset_project}.{dataset_id}.{table_id}"
                     else:
                         full_table_id = f"{dataset_id}.{table_id}"
 
-                    # Get detailed table information
-                    client = await self.get_client()
-                    table = await self._run_in_executor(
-                        lambda: client.get_table(f"{fully_qualified_dataset}.{table_id}")
-                    )
-
                     # Determine table type
                     table_type = "table"
                     if table.table_type == "VIEW":
@@ -426,6 +437,8 @@ class BigQueryConnector(DatabaseConnector):
 
     async def close(self) -> None:
         """Close the connection."""
+        with contextlib.suppress(Exception):
+            await self._join_warmup()
         if self.client:
             try:
                 await self._run_in_executor(lambda: self.client.close())
@@ -1,7 +1,11 @@
 """Connector implementation for ClickHouse databases."""
 
+import contextlib
+import hashlib
 import logging
+import re
 import time
+from collections import OrderedDict
 from typing import Any, Dict, List, Optional, Tuple
 
 import aiochclient
@@ -14,6 +18,39 @@ from models.query import ColumnInfo
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of tables described in a single batched query
+DESCRIBE_BATCH_SIZE = 50
+
+# ClickHouse default max_query_size in bytes
+MAX_QUERY_SIZE = 2**18
+
+# Maximum number of cached EXPLAIN results per connector
+EXPLAIN_CACHE_SIZE = 256
+
+# Matches {name} query placeholders
+_PLACEHOLDER_RE = re.compile(r"\{(\w+)\}")
+
+# Escapes backslashes and single quotes inside string literals
+_STRING_ESCAPES = str.maketrans({"\\": "\\\\", "'": "\\'"})
+
+
+def _quote(value: Any) -> str:
+    """Render a Python value as a ClickHouse SQL literal."""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return f"'{str(value).translate(_STRING_ESCAPES)}'"
+
+
+def _apply_params(sql: str, params: Dict[str, Any]) -> str:
+    """Replace {name} placeholders in a single pass, leaving unknown names untouched."""
+    return _PLACEHOLDER_RE.sub(
+        lambda m: _quote(params[m.group(1)]) if m.group(1) in params else m.group(0), sql
+    )
+
 
 class ClickHouseConnector(DatabaseConnector):
     """Connector for ClickHouse databases."""
@@ -27,72 +64,69 @@ class ClickHouseConnector(DatabaseConnector):
         super().__init__(connection)
         self.client = None
         self.session: Optional[aiohttp.ClientSession] = None
+        # LRU cache of EXPLAIN results keyed by a digest of (sql, params)
+        self._explain_cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
 
     async def connect(self) -> None:
         """Establish connection to the database."""
+        await self._join_warmup()
         if self.client:
             return
 
-        try:
-            # Log connection attempt
-            logger.info(
-                f"Connecting to ClickHouse at {self.connection.config.host}:"
-                f"{self.connection.config.port} with database {self.connection.config.database}"
-            )
-
-            # Setup HTTP session
-            session = aiohttp.ClientSession()
-            self.session = session
-
-            # Create protocol prefix based on https setting
-            protocol = "https" if self.connection.config.https else "http"
+        # Concurrent first callers share one connect instead of each opening their own
+        async with self._connect_lock:
+            if self.client:
+                return
 
-            # Build connection URL
-            url = f"{protocol}://{self.connection.config.host}:{self.connection.config.port}"
-            logger.info(f"Using connection URL: {url}")
+            try:
+                # Log connection attempt
+                logger.info(
+                    "Connecting to ClickHouse at %s:%s with database %s",
+                    self.connection.config.host,
+                    self.connection.config.port,
+                    self.connection.config.database,
+                )
 
-            # Create client
-            self.client = aiochclient.ChClient(
-                self.session,
-                url=url,
-                user=self.connection.config.user,
-                password=self.connection.config.password,
-                database=self.connection.config.database,
-            )
+                # Setup HTTP session
+                session = aiohttp.ClientSession()
+                self.session = session
 
-        except Exception as e:
-            logger.error(f"Error connecting to ClickHouse: {str(e)}")
-            raise
-
-    async def test_connection(self) -> Tuple[bool, str]:
-        """
-        Test if the connection is valid.
-
-        Returns:
-            Tuple of (success, message)
-        """
-        try:
-            # Create a session for testing
-            async with aiohttp.ClientSession() as session:
                 # Create protocol prefix based on https setting
                 protocol = "https" if self.connection.config.https else "http"
 
                 # Build connection URL
                 url = f"{protocol}://{self.connection.config.host}:{self.connection.config.port}"
+                logger.info("Using connection URL: %s", url)
 
                 # Create client
-                client = aiochclient.ChClient(
-                    session,
+                self.client = aiochclient.ChClient(
+                    self.session,
                     url=url,
                     user=self.connection.config.user,
                     password=self.connection.config.password,
                     database=self.connection.config.database,
+                    # Ask ClickHouse to gzip responses; aiohttp decompresses them transparently
+                    compress_response=True,
                 )
 
-                # Execute a simple query
-                version = await client.fetchone("SELECT version() as version")
+            except Exception as e:
+                logger.error(f"Error connecting to ClickHouse: {str(e)}")
+                raise
 
-                return True, f"Connection successful. ClickHouse version: {version['version']}"
+    async def test_connection(self) -> Tuple[bool, str]:
+        """
+        Test if the connection is valid.
+
+        Returns:
+            Tuple of (success, message)
+        """
+        try:
+            # Run the check on the pooled client, so a passing test leaves it ready for use
+            await self.connect()
+            if self.client is None:
+                raise RuntimeError("ClickHouse client is not initialized")
+            version = await self.client.fetchone("SELECT version() as version")
+            return True, f"Connection successful. ClickHouse version: {version['version']}"
         except Exception as e:
             logger.error(f"Connection test failed: {str(e)}")
             return False, f"Connection failed: {str(e)}"
@@ -114,49 +148,30 @@ class ClickHouseConnector(DatabaseConnector):
 
         try:
             logger.info(
-                f"Fetching metadata for ClickHouse database: {self.connection.config.database}"
+                "Fetching metadata for ClickHouse database: %s", self.connection.config.database
             )
 
-            # Use the SHOW TABLES query which is reliable and works well
-            # Get tables using SHOW TABLES command
-            table_names: List[str] = []
-            query = f"SHOW TABLES FROM {self.connection.config.database}"
-
             if self.client is None:
                 raise RuntimeError("Client is not initialized")
-            result = await self.client.fetch(query)
-
-            if result:
-                for row in result:
-                    table_name = None
-                    if isinstance(row, dict) and "name" in row:
-                        table_name = row["name"]
-                    elif hasattr(row, "__getitem__"):
-                        try:
-                            # In ClickHouse SHOW TABLES, the result might be a single value
-                            if len(row) == 1:
-                                table_name = row[0]
-                            # Simple string result
-                            elif isinstance(row, str):
-                                table_name = row
-                        except Exception as e:
-                            logger.error(f"Error parsing row: {str(e)}")
-                            pass
-                    # Simple string result
-                    elif isinstance(row, str):
-                        table_name = row
-
-                    if table_name:
-                        table_names.append(table_name)
+            result = await self.client.fetch(
+                "SELECT name FROM system.tables WHERE database = {database} ORDER BY name",
+                params={"database": self.connection.config.database},
+            )
+
+            try:
+                table_names = [row["name"] for row in result]
+            except (KeyError, TypeError) as e:
+                raise RuntimeError(f"Unexpected system.tables row shape: {str(e)}") from e
 
             logger.info(
-                f"Found {len(table_names)} tables in {self.connection.config.database} database"
+                "Found %d tables in %s database", len(table_names), self.connection.config.database
             )
 
             # Create table metadata objects
             for table_name in table_names:
+                # Rows come from typed system tables, so skip pydantic validation
                 tables.append(
-                    TableMetadata(
+                    TableMetadata.model_construct(
                         name=table_name,
                         schema_name=self.connection.config.database,
                         description=None,
@@ -166,46 +181,40 @@ class ClickHouseConnector(DatabaseConnector):
                     )
                 )
 
-            # Get columns for tables we found
+            # Get columns for tables we found, grouped by table in column position order
+            columns_by_table = await self._fetch_columns(table_names)
+
             for table_name in table_names:
-                try:
-                    column_query = f"DESCRIBE TABLE {self.connection.config.database}.{table_name}"
-                    if self.client is None:
-                        raise RuntimeError("Client is not initialized")
-                    desc_result = await self.client.fetch(column_query)
-
-                    for col in desc_result:
-                        col_name = col.get("name")
-                        col_type = col.get("type", "").lower()
-
-                        # Simple type normalization
-                        normalized_type = col_type
-                        if "int" in col_type:
-                            normalized_type = "integer"
-                        elif any(
-                            float_type in col_type for float_type in ["float", "double", "decimal"]
-                        ):
-                            normalized_type = "number"
-                        elif any(str_type in col_type for str_type in ["string", "fixedstring"]):
-                            normalized_type = "string"
-                        elif "date" in col_type:
-                            normalized_type = "date" if "datetime" not in col_type else "timestamp"
-                        elif "array" in col_type:
-                            normalized_type = "array"
-
-                        columns.append(
-                            ColumnMetadata(
-                                name=col_name,
-                                tableName=table_name,
-                                dataType=normalized_type,
-                                nullable=True,
-                                description=None,
-                                primaryKey=False,
-                                explorable=True,
-                            )
+                for col in columns_by_table.get(table_name, []):
+                    col_name = col.get("name")
+                    col_type = col.get("type", "").lower()
+
+                    # Simple type normalization
+                    normalized_type = col_type
+                    if "int" in col_type:
+                        normalized_type = "integer"
+                    elif any(
+                        float_type in col_type for float_type in ["float", "double", "decimal"]
+                    ):
+                        normalized_type = "number"
+                    elif any(str_type in col_type for str_type in ["string", "fixedstring"]):
+                        normalized_type = "string"
+                    elif "date" in col_type:
+                        normalized_type = "date" if "datetime" not in col_type else "timestamp"
+                    elif "array" in col_type:
+                        normalized_type = "array"
+
+                    columns.append(
+                        ColumnMetadata.model_construct(
+                            name=col_name,
+                            tableName=table_name,
+                            dataType=normalized_type,
+                            nullable=True,
+                            description=None,
+                            primaryKey=bool(col.get("is_in_primary_key", 0)),
+                            explorable=True,
                         )
-                except Exception as col_error:
-                    logger.error(f"Error getting columns for {table_name}: {str(col_error)}")
+                    )
 
         except Exception as e:
             logger.error(f"Error getting metadata: {str(e)}")
@@ -213,6 +222,103 @@ class ClickHouseConnector(DatabaseConnector):
 
         return tables, columns, relationships
 
+    async def _fetch_columns(self, table_names: List[str]) -> Dict[str, List[Any]]:
+        """
+        Fetch columns for the given tables in a single system.columns query.
+
+        Falls back to batched DESCRIBE queries when system tables are not readable.
+
+        Args:
+            table_names: Names of the tables to fetch columns for
+
+        Returns:
+            Mapping of table name to its column rows, ordered by column position
+        """
+        if self.client is None:
+            raise RuntimeError("Client is not initialized")
+
+        columns_by_table: Dict[str, List[Any]] = {name: [] for name in table_names}
+        try:
+            rows = await self.client.fetch(
+                "SELECT table, name, type, is_in_primary_key FROM system.columns "
+                "WHERE database = {database} ORDER BY table, position",
+                params={"database": self.connection.config.database},
+            )
+        except Exception as e:
+            logger.warning("Reading system.columns failed, falling back to DESCRIBE: %s", e)
+            return await self._describe_tables(table_names)
+
+        for row in rows:
+            table_columns = columns_by_table.get(row["table"])
+            if table_columns is not None:
+                table_columns.append(row)
+
+        return columns_by_table
+
+    async def _describe_tables(self, table_names: List[str]) -> Dict[str, List[Any]]:
+        """
+        Describe many tables with as few round-trips as possible.
+
+        Tables are described in UNION ALL batches of up to DESCRIBE_BATCH_SIZE, with each
+        batch kept under ClickHouse's default max_query_size. If a batch fails, its tables
+        are described one by one so a single bad table does not hide the others.
+
+        Args:
+            table_names: Names of the tables to describe
+
+        Returns:
+            Mapping of table name to its DESCRIBE rows
+        """
+        if self.client is None:
+            raise RuntimeError("Client is not initialized")
+
+        database = self.connection.config.database
+        columns_by_table: Dict[str, List[Any]] = {name: [] for name in table_names}
+
+        batches: List[List[str]] = []
+        batch: List[str] = []
+        batch_size = 0
+        for table_name in table_names:
+            part_size = len(self._describe_select(database, table_name)) + len(" UNION ALL ")
+            if batch and (
+                len(batch) >= DESCRIBE_BATCH_SIZE or batch_size + part_size > MAX_QUERY_SIZE
+            ):
+                batches.append(batch)
+                batch, batch_size = [], 0
+            batch.append(table_name)
+            batch_size += part_size
+        if batch:
+            batches.append(batch)
+
+        for batch in batches:
+            query = " UNION ALL ".join(
+                self._describe_select(database, table_name) for table_name in batch
+            )
+            try:
+                for row in await self.client.fetch(query):
+                    columns_by_table[row["_t"]].append(row)
+            except Exception as batch_error:
+                logger.warning(
+                    "Batched DESCRIBE failed, falling back to per-table: %s", batch_error
+                )
+                for table_name in batch:
+                    try:
+                        columns_by_table[table_name] = await self.client.fetch(
+                            f"DESCRIBE TABLE {database}.{table_name}"
+                        )
+                    except Exception as col_error:
+                        logger.error(f"Error getting columns for {table_name}: {str(col_error)}")
+
+        return columns_by_table
+
+    @staticmethod
+    def _describe_select(database: Optional[str], table_name: str) -> str:
+        """Build the DESCRIBE subquery used for one table in a batch."""
+        return (
+            f"SELECT {_quote(table_name)} AS _t, name, type "
+            f"FROM (DESCRIBE TABLE {database}.{table_name})"
+        )
+
     async def execute_query(
         self, sql: str, params: Optional[Dict[str, Any]] = None
     ) -> Tuple[List[Dict[str, Any]], List[ColumnInfo], float]:
@@ -232,16 +338,9 @@ class ClickHouseConnector(DatabaseConnector):
         try:
             start_time = time.time()
 
-            # ClickHouse supports named parameters using {name:type}
+            # Substitute {name} placeholders with quoted literals
             if params:
-                # Convert params to ClickHouse format
-                for key, value in params.items():
-                    placeholder = f"{{{key}}}"
-                    if placeholder in sql:
-                        if isinstance(value, str):
-                            sql = sql.replace(placeholder, f"'{value}'")
-                        else:
-                            sql = sql.replace(placeholder, str(value))
+                sql = _apply_params(sql, params)
 
             # Execute query
             if self.client is None:
@@ -265,6 +364,53 @@ class ClickHouseConnector(DatabaseConnector):
             logger.error(f"Error executing query: {str(e)}")
             raise
 
+    async def execute_query_rows(
+        self, sql: str, params: Optional[Dict[str, Any]] = None
+    ) -> Tuple[List[str], List[Tuple[Any, ...]], List[ColumnInfo], float]:
+        """
+        Execute a SQL query and return rows as tuples.
+
+        aiochclient records already hold each row as a tuple behind a shared
+        name index, so rows are sliced out directly without building dicts.
+
+        Args:
+            sql: The SQL query to execute
+            params: Query parameters
+
+        Returns:
+            Tuple of (column_names, rows, column_info, execution_time)
+        """
+        await self.connect()
+
+        try:
+            start_time = time.time()
+
+            # Substitute {name} placeholders with quoted literals
+            if params:
+                sql = _apply_params(sql, params)
+
+            if self.client is None:
+                raise RuntimeError("Client is not initialized")
+            records = await self.client.fetch(sql)
+
+            column_names: List[str] = []
+            columns: List[ColumnInfo] = []
+            rows = [record[:] for record in records]
+            if records:
+                column_names = list(records[0].keys())
+                columns = [
+                    ColumnInfo(name=name, type=type(value).__name__)
+                    for name, value in zip(column_names, rows[0])
+                ]
+
+            execution_time = time.time() - start_time
+
+            return column_names, rows, columns, execution_time
+
+        except Exception as e:
+            logger.error(f"Error executing query: {str(e)}")
+            raise
+
     async def get_query_explanation(
         self, sql: str, params: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
@@ -278,19 +424,18 @@ class ClickHouseConnector(DatabaseConnector):
         Returns:
             Query plan information
         """
+        cache_key = hashlib.blake2b((sql + repr(params)).encode()).digest()
+        cached = self._explain_cache.get(cache_key)
+        if cached is not None:
+            self._explain_cache.move_to_end(cache_key)
+            return cached
+
         await self.connect()
 
         try:
-            # ClickHouse supports named parameters using {name:type}
+            # Substitute {name} placeholders with quoted literals
             if params:
-                # Convert params to ClickHouse format
-                for key, value in params.items():
-                    placeholder = f"{{{key}}}"
-                    if placeholder in sql:
-                        if isinstance(value, str):
-                            sql = sql.replace(placeholder, f"'{value}'")
-                        else:
-                            sql = sql.replace(placeholder, str(value))
+                sql = _apply_params(sql, params)
 
             # ClickHouse doesn't have a direct EXPLAIN like PostgreSQL
             # We can use EXPLAIN SYNTAX or EXPLAIN PLAN
@@ -300,12 +445,18 @@ class ClickHouseConnector(DatabaseConnector):
                 raise RuntimeError("Client is not initialized")
             plan = await self.client.fetchone(explain_sql)
 
-            return {
+            explanation = {
                 "plan": plan.get("Plan", ""),
                 "cost": None,  # ClickHouse doesn't provide cost estimates
                 "details": plan,
             }
 
+            self._explain_cache[cache_key] = explanation
+            if len(self._explain_cache) > EXPLAIN_CACHE_SIZE:
+                self._explain_cache.popitem(last=False)
+
+            return explanation
+
         except Exception as e:
             logger.error(f"Error getting query explanation: {str(e)}")
             raise
@@ -321,6 +472,8 @@ class ClickHouseConnector(DatabaseConnector):
 
     async def close(self) -> None:
         """Close the connection."""
+        with contextlib.suppress(Exception):
+            await self._join_warmup()
         if self.session:
             try:
                 await self.session.close()
@@ -329,6 +482,7 @@ class ClickHouseConnector(DatabaseConnector):
             finally:
                 self.session = None
                 self.client = None
+                self._explain_cache.clear()
 
     async def __aenter__(self) -> "ClickHouseConnector":
         """Async context manager support."""
@@ -1,7 +1,7 @@
 """Factory for creating database connectors based on connection type."""
 
 import logging
-from typing import Optional
+from typing import Dict, Optional, Type
 
 from connectors.base_connector import DatabaseConnector
 from connectors.bigquery_connector import BigQueryConnector
@@ -16,45 +16,44 @@ logger = logging.getLogger(__name__)
 class DatabaseConnectorFactory:
     """Factory for creating database connectors."""
 
+    # Mapping of connection type to connector class
+    _REGISTRY: Dict[str, Type[DatabaseConnector]] = {
+        "postgres": PostgresConnector,
+        "clickhouse": ClickHouseConnector,
+        "bigquery": BigQueryConnector,
+        "snowflake": SnowflakeConnector,
+    }
+
     @staticmethod
-    async def create_connector(connection: Connection) -> Optional[DatabaseConnector]:
+    def create_connector(connection: Connection) -> Optional[DatabaseConnector]:
         """
         Create a connector for the given connection.
 
+        When called from a running event loop, the connector starts connecting in the
+        background; any connection error is raised from the connector's next connect().
+
         Args:
             connection: The connection configuration
 
         Returns:
             A database connector instance, or None if the database type is not supported
         """
+        connector_class = DatabaseConnectorFactory._REGISTRY.get(connection.type)
+        if connector_class is None:
+            logger.error(f"Unsupported database type: {connection.type}")
+            return None
+
         try:
-            logger.info(f"Creating connector for database type: {connection.type}")
             logger.info(
-                f"Connection details: id={connection.id}, name={connection.name}, "
-                f"database={connection.config.database}"
+                "Creating %s connector: id=%s, name=%s, database=%s",
+                connection.type,
+                connection.id,
+                connection.name,
+                connection.config.database,
             )
-
-            if connection.type == "postgres":
-                logger.info("Creating PostgreSQL connector")
-                return PostgresConnector(connection)
-            elif connection.type == "clickhouse":
-                logger.info("Creating ClickHouse connector")
-                connector = ClickHouseConnector(connection)
-                logger.info("ClickHouse connector created successfully")
-                return connector
-            elif connection.type == "bigquery":
-                logger.info("Creating BigQuery connector")
-                connector = BigQueryConnector(connection)
-                logger.info("BigQuery connector created successfully")
-                return connector
-            elif connection.type == "snowflake":
-                logger.info("Creating Snowflake connector")
-                connector = SnowflakeConnector(connection)
-                logger.info("Snowflake connector created successfully")
-                return connector
-            else:
-                logger.error(f"Unsupported database type: {connection.type}")
-                return None
+            connector = connector_class(connection)
+            connector.start_warmup()
+            return connector
         except Exception as e:
             logger.error(f"Error creating connector for {connection.type}: {str(e)}")
             raise
@@ -1,10 +1,27 @@
 """PostgreSQL database connector implementation."""
 
+import contextlib
+import hashlib
 import logging
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import asyncpg
+import orjson
 
 from connectors.base_connector import DatabaseConnector
 from models.connection import Connection
@@ -13,10 +30,232 @@ from models.query import ColumnInfo
 
 logger = logging.getLogger(__name__)
 
+# Parameters bind positionally to $1, $2, ...; mappings are still accepted for older callers
+QueryParams = Union[Sequence[Any], Mapping[str, Any]]
+
+# Rows fetched per server-side cursor round-trip when streaming results
+STREAM_BATCH_SIZE = 1000
+
+# Seconds catalog metadata is reused before the catalog is queried again
+METADATA_TTL = 300
+
+# (fetched_at, metadata) by connection id and config digest, shared so it survives connector
+# re-creation; a changed host or database gets its own entry instead of the old catalog
+_metadata_cache: Dict[
+    Tuple[str, bytes],
+    Tuple[float, Tuple[List[TableMetadata], List[ColumnMetadata], List[RelationshipMetadata]]],
+] = {}
+
+# Catalog metadata in one query. The relation list is computed once in a MATERIALIZED CTE
+# and reused by the column and foreign key CTEs; the result is a single JSON document.
+_CATALOG_SQL = """
+WITH rels AS MATERIALIZED (
+    SELECT c.oid, c.relname, c.relkind, n.nspname
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE c.relkind IN ('r', 'p', 'v')
+    AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+    AND n.nspname NOT LIKE 'pg\\_%temp\\_%'
+),
+cols AS MATERIALIZED (
+    SELECT
+        r.relname as table_name,
+        a.attname as name,
+        format_type(a.atttypid, NULL) as data_type,
+        NOT a.attnotnull as nullable,
+        col_description(r.oid, a.attnum) as description,
+        pk.oid IS NOT NULL as primary_key,
+        fk.foreign_key,
+        a.attnum
+    FROM rels r
+    JOIN pg_attribute a ON a.attrelid = r.oid
+    LEFT JOIN pg_constraint pk
+        ON pk.conrelid = r.oid
+        AND pk.contype = 'p'
+        AND a.attnum = ANY(pk.conkey)
+    LEFT JOIN LATERAL (
+        SELECT rc.relname || '.' || ra.attname as foreign_key
+        FROM pg_constraint con
+        JOIN pg_class rc ON rc.oid = con.confrelid
+        JOIN pg_attribute ra
+            ON ra.attrelid = con.confrelid
+            AND ra.attnum = con.confkey[array_position(con.conkey, a.attnum)]
+        WHERE con.conrelid = r.oid
+        AND con.contype = 'f'
+        AND a.attnum = ANY(con.conkey)
+        LIMIT 1
+    ) fk ON true
+    WHERE a.attnum > 0
+    AND NOT a.attisdropped
+),
+fks AS MATERIALIZED (
+    SELECT
+        con.conname as constraint_name,
+        r.relname as source_table,
+        sa.attname as source_column,
+        tc.relname as target_table,
+        ta.attname as target_column
+    FROM pg_constraint con
+    JOIN rels r ON r.oid = con.conrelid
+    JOIN pg_class tc ON tc.oid = con.confrelid
+    CROSS JOIN LATERAL
+        unnest(con.conkey, con.confkey) as k(source_attnum, target_attnum)
+    JOIN pg_attribute sa
+        ON sa.attrelid = con.conrelid AND sa.attnum = k.source_attnum
+    JOIN pg_attribute ta
+        ON ta.attrelid = con.confrelid AND ta.attnum = k.target_attnum
+    WHERE con.contype = 'f'
+)
+SELECT json_build_object(
+    'tables', (
+        SELECT COALESCE(json_agg(json_build_object(
+            'name', r.relname,
+            'schema', r.nspname,
+            'description', obj_description(r.oid, 'pg_class'),
+            'type', CASE WHEN r.relkind = 'v' THEN 'view' ELSE 'table' END,
+            'row_count', pg_stat_get_live_tuples(r.oid)
+        ) ORDER BY r.nspname, r.relname), '[]')
+        FROM rels r
+    ),
+    'columns', (
+        SELECT COALESCE(json_agg(c ORDER BY c.table_name, c.attnum), '[]')
+        FROM cols c
+    ),
+    'relationships', (
+        SELECT COALESCE(json_agg(f), '[]') FROM fks f
+    )
+)::text
+"""
+
+# Normalized types keyed by the names format_type() returns for common PostgreSQL types
+_PG_TYPE_MAP = {
+    "smallint": "integer",
+    "integer": "integer",
+    "bigint": "integer",
+    "real": "number",
+    "double precision": "number",
+    "numeric": "number",
+    "text": "string",
+    "character varying": "string",
+    "character": "string",
+    '"char"': "string",
+    "name": "string",
+    "boolean": "boolean",
+    "date": "date",
+    "timestamp without time zone": "timestamp",
+    "timestamp with time zone": "timestamp",
+    "time without time zone": "timestamp",
+    "time with time zone": "timestamp",
+    "json": "json",
+    "jsonb": "json",
+}
+
+
+def _positional(params: Optional[QueryParams]) -> Sequence[Any]:
+    """Get positional parameter values to bind to $1, $2, ...
+
+    Args:
+        params: Positional parameters, or a mapping whose values are used in order
+
+    Returns:
+        The parameter values
+    """
+    if not params:
+        return ()
+    if isinstance(params, Mapping):
+        return tuple(params.values())
+    return params
+
+
+def _encode_json(value: Any) -> str:
+    """Encode a value for a json/jsonb parameter.
+
+    Args:
+        value: The value to encode
+
+    Returns:
+        The JSON text
+    """
+    return orjson.dumps(value).decode()
+
+
+async def _setup_codecs(conn: asyncpg.Connection) -> None:
+    """Decode json/jsonb values with orjson instead of the stdlib json module.
+
+    Args:
+        conn: A newly opened pool connection
+    """
+    for type_name in ("json", "jsonb"):
+        await conn.set_type_codec(
+            type_name,
+            encoder=_encode_json,
+            decoder=orjson.loads,
+            schema="pg_catalog",
+            format="text",
+        )
+
+
+def _describe_statement(
+    statement: asyncpg.prepared_stmt.PreparedStatement,
+) -> Tuple[Tuple[str, ...], List[ColumnInfo]]:
+    """Get the result column names and info for a prepared statement.
+
+    The attributes come from the statement's own Describe response, so they always
+    match the rows it returns, even after the tables it reads have changed.
+
+    Args:
+        statement: The prepared statement
+
+    Returns:
+        Tuple of (column_names, column_info)
+    """
+    attributes = statement.get_attributes()
+    keys = tuple(attr.name for attr in attributes)
+    columns = [ColumnInfo(name=attr.name, type=attr.type.name) for attr in attributes]
+    return keys, columns
+
+
+def _normalize_pg_type(data_type: str) -> str:
+    """Map a PostgreSQL type name to a normalized type.
+
+    Args:
+        data_type: Type name as returned by format_type()
+
+    Returns:
+        The normalized type, or the lowercased type name if it is not recognized
+    """
+    data_type = data_type.lower()
+    # format_type() names arrays "<element>[]"; they are not usable as their element type
+    if data_type.endswith("[]"):
+        return "array"
+
+    normalized_type = _PG_TYPE_MAP.get(data_type)
+    if normalized_type is not None:
+        return normalized_type
+
+    # Fall back to substring matching for domains and other composites
+    if "int" in data_type:
+        return "integer"
+    if data_type in ("real", "double precision", "numeric", "decimal"):
+        return "number"
+    if "char" in data_type or "text" in data_type:
+        return "string"
+    if "bool" in data_type:
+        return "boolean"
+    if "date" in data_type:
+        return "date"
+    if "time" in data_type:
+        return "timestamp"
+    if "json" in data_type:
+        return "json"
+    return data_type
+
 
 class PostgresConnector(DatabaseConnector):
     """Connector for PostgreSQL databases."""
 
+    supports_export = True
+
     def __init__(self, connection: Connection):
         """Initialize the connector with connection details.
 
@@ -25,31 +264,70 @@ class PostgresConnector(DatabaseConnector):
         """
         super().__init__(connection)
         self.pool = None
+        self.long_pool = None
+        self._metadata_key = (
+            connection.id,
+            hashlib.blake2b(connection.config.model_dump_json().encode(), digest_size=8).digest(),
+        )
 
     async def connect(self) -> None:
         """Establish connection to the database."""
+        await self._join_warmup()
         if self.pool:
             return
 
-        try:
-            self.pool = await asyncpg.create_pool(
-                host=self.connection.config.host,
-                port=self.connection.config.port,
-                user=self.connection.config.user,
-                password=self.connection.config.password,
-                database=self.connection.config.database,
-                ssl=self.connection.config.ssl,
-                command_timeout=30,  # 30 second timeout for queries
-                timeout=10,  # Connection timeout in seconds
-                min_size=1,
-                max_size=10,
-            )
-        except Exception as e:
-            logger.error(f"Error connecting to PostgreSQL: {str(e)}")
-            raise
+        # Concurrent first callers share one connect instead of each opening their own
+        async with self._connect_lock:
+            if self.pool:
+                return
+
+            config = self.connection.config
+            pool_args = {
+                "host": config.host,
+                "port": config.port,
+                "user": config.user,
+                "password": config.password,
+                "database": config.database,
+                "ssl": config.ssl,
+                "timeout": 10,  # Connection timeout in seconds
+                "init": _setup_codecs,
+            }
+
+            try:
+                # Interactive work: metadata, connection tests and regular queries
+                pool = await asyncpg.create_pool(
+                    **pool_args,
+                    command_timeout=30,  # 30 second timeout for queries
+                    min_size=1,
+                    max_size=8,
+                    # JIT compilation costs more than it saves on short interactive queries
+                    server_settings={"jit": "off", "application_name": "facet"},
+                )
+                # Long-running work: streaming, exports and EXPLAIN ANALYZE. Kept separate so
+                # these can't hold every connection while interactive requests wait.
+                try:
+                    self.long_pool = await asyncpg.create_pool(
+                        **pool_args,
+                        command_timeout=None,
+                        min_size=0,
+                        max_size=4,
+                        server_settings={"application_name": "facet"},
+                    )
+                except Exception:
+                    await pool.close()
+                    raise
+                self.pool = pool
+            except Exception as e:
+                logger.error(f"Error connecting to PostgreSQL: {str(e)}")
+                raise
 
     async def close(self) -> None:
-        """Close the connection pool."""
+        """Close the connection pools."""
+        with contextlib.suppress(Exception):
+            await self._join_warmup()
+        if self.long_pool:
+            await self.long_pool.close()
+            self.long_pool = None
         if self.pool:
             await self.pool.close()
             self.pool = None
@@ -76,9 +354,16 @@ class PostgresConnector(DatabaseConnector):
     ) -> Tuple[List[TableMetadata], List[ColumnMetadata], List[RelationshipMetadata]]:
         """Extract metadata from the database.
 
+        Results are cached per connection and config for METADATA_TTL seconds; call
+        invalidate_metadata() to force a fresh read.
+
         Returns:
             Tuple of (tables, columns, relationships)
         """
+        cached = _metadata_cache.get(self._metadata_key)
+        if cached is not None and time.monotonic() - cached[0] < METADATA_TTL:
+            return cached[1]
+
         await self.connect()
 
         tables: List[TableMetadata] = []
@@ -86,174 +371,88 @@ class PostgresConnector(DatabaseConnector):
         relationships: List[RelationshipMetadata] = []
 
         try:
-            if self.pool is None:
-                raise RuntimeError("Database connection pool is not initialized")
-            async with self.pool.acquire() as conn:
-                tables_query = """
-                SELECT
-                    t.table_name as name,
-                    t.table_schema as schema,
-                    obj_description(pgc.oid) as description,
-                    CASE
-                        WHEN t.table_type = 'VIEW' THEN 'view'
-                        ELSE 'table'
-                    END as type,
-                    pg_stat_get_live_tuples(pgc.oid) as row_count
-                FROM information_schema.tables t
-                JOIN pg_class pgc ON pgc.relname = t.table_name
-                JOIN pg_namespace n ON pgc.relnamespace = n.oid AND n.nspname = t.table_schema
-                WHERE t.table_schema NOT IN ('pg_catalog', 'information_schema')
-                AND t.table_type IN ('BASE TABLE', 'VIEW')
-                ORDER BY t.table_schema, t.table_name
-                """
-
-                table_records = await conn.fetch(tables_query)
-
-                for record in table_records:
-                    tables.append(
-                        TableMetadata(
-                            name=record["name"],
-                            schema_name=record["schema"],
-                            description=record["description"],
-                            type=record["type"],
-                            rowCount=record["row_count"],
-                            explorable=True,
-                        )
+            catalog = await self._fetch_catalog()
+            table_records = catalog["tables"]
+            column_records = catalog["columns"]
+            relationship_records = catalog["relationships"]
+
+            # Catalog rows are trusted, so skip pydantic validation on the hot path.
+            # refreshedAt records the read, since the result may be served from the cache later.
+            refreshed_at = datetime.now()
+            for record in table_records:
+                tables.append(
+                    TableMetadata.model_construct(
+                        name=record["name"],
+                        schema_name=record["schema"],
+                        description=record["description"],
+                        type=record["type"],
+                        rowCount=record["row_count"],
+                        explorable=True,
+                        refreshedAt=refreshed_at,
                     )
-
-                columns_query = """
-                SELECT
-                    c.table_name,
-                    c.column_name as name,
-                    c.data_type,
-                    c.is_nullable = 'YES' as nullable,
-                    pg_catalog.col_description(pgc.oid, c.ordinal_position::int) as description,
-                    CASE
-                        WHEN pk.constraint_name IS NOT NULL THEN true
-                        ELSE false
-                    END as primary_key,
-                    CASE
-                        WHEN fk.constraint_name IS NOT NULL THEN
-                            fk.referenced_table_name || '.' || fk.referenced_column_name
-                        ELSE null
-                    END as foreign_key
-                FROM information_schema.columns c
-                JOIN pg_class pgc ON pgc.relname = c.table_name
-                JOIN pg_namespace n ON pgc.relnamespace = n.oid AND n.nspname = c.table_schema
-                LEFT JOIN (
-                    SELECT
-                        tc.constraint_name,
-                        kcu.table_name,
-                        kcu.column_name
-                    FROM information_schema.table_constraints tc
-                    JOIN information_schema.key_column_usage kcu
-                        ON tc.constraint_name = kcu.constraint_name
-                        AND tc.table_schema = kcu.table_schema
-                    WHERE tc.constraint_type = 'PRIMARY KEY'
-                ) pk ON pk.table_name = c.table_name AND pk.column_name = c.column_name
-                LEFT JOIN (
-                    SELECT
-                        tc.constraint_name,
-                        kcu.table_name,
-                        kcu.column_name,
-                        ccu.table_name as referenced_table_name,
-                        ccu.column_name as referenced_column_name
-                    FROM information_schema.table_constraints tc
-                    JOIN information_schema.key_column_usage kcu
-                        ON tc.constraint_name = kcu.constraint_name
-                        AND tc.table_schema = kcu.table_schema
-                    JOIN information_schema.constraint_column_usage ccu
-                        ON tc.constraint_name = ccu.constraint_name
-                        AND tc.table_schema = ccu.table_schema
-                    WHERE tc.constraint_type = 'FOREIGN KEY'
-                ) fk ON fk.table_name = c.table_name AND fk.column_name = c.column_name
-                WHERE c.table_schema NOT IN ('pg_catalog', 'information_schema')
-                ORDER BY c.table_name, c.ordinal_position
-                """
-
-                column_records = await conn.fetch(columns_query)
-
-                for record in column_records:
-                    # Map PostgreSQL types to normalized types
-                    data_type = record["data_type"].lower()
-                    normalized_type = data_type
-
-                    if "int" in data_type:
-                        normalized_type = "integer"
-                    elif data_type in ("real", "double precision", "numeric", "decimal"):
-                        normalized_type = "number"
-                    elif "char" in data_type or "text" in data_type:
-                        normalized_type = "string"
-                    elif "bool" in data_type:
-                        normalized_type = "boolean"
-                    elif "date" in data_type:
-                        normalized_type = "date"
-                    elif "time" in data_type:
-                        normalized_type = "timestamp"
-                    elif "json" in data_type:
-                        normalized_type = "json"
-
-                    columns.append(
-                        ColumnMetadata(
-                            name=record["name"],
-                            tableName=record["table_name"],
-                            dataType=normalized_type,
-                            nullable=record["nullable"],
-                            description=record["description"],
-                            primaryKey=record["primary_key"],
-                            foreignKey=record["foreign_key"],
-                            explorable=True,
-                        )
+                )
+
+            for record in column_records:
+                normalized_type = _normalize_pg_type(record["data_type"])
+
+                columns.append(
+                    ColumnMetadata.model_construct(
+                        name=record["name"],
+                        tableName=record["table_name"],
+                        dataType=normalized_type,
+                        nullable=record["nullable"],
+                        description=record["description"],
+                        primaryKey=record["primary_key"],
+                        foreignKey=record["foreign_key"],
+                        explorable=True,
                     )
-
-                relationships_query = """
-                SELECT
-                    tc.constraint_name,
-                    kcu.table_name as source_table,
-                    kcu.column_name as source_column,
-                    ccu.table_name as target_table,
-                    ccu.column_name as target_column
-                FROM information_schema.table_constraints tc
-                JOIN information_schema.key_column_usage kcu
-                    ON tc.constraint_name = kcu.constraint_name
-                    AND tc.table_schema = kcu.table_schema
-                JOIN information_schema.constraint_column_usage ccu
-                    ON tc.constraint_name = ccu.constraint_name
-                    AND tc.table_schema = ccu.table_schema
-                WHERE tc.constraint_type = 'FOREIGN KEY'
-                AND tc.table_schema NOT IN ('pg_catalog', 'information_schema')
-                """
-
-                relationship_records = await conn.fetch(relationships_query)
-
-                for record in relationship_records:
-                    relationship_type = "many-to-one"
-
-                    relationships.append(
-                        RelationshipMetadata(
-                            sourceTable=record["source_table"],
-                            sourceColumn=record["source_column"],
-                            targetTable=record["target_table"],
-                            targetColumn=record["target_column"],
-                            relationship=relationship_type,
-                            automatic=True,
-                        )
+                )
+
+            for record in relationship_records:
+                relationship_type = "many-to-one"
+
+                relationships.append(
+                    RelationshipMetadata.model_construct(
+                        sourceTable=record["source_table"],
+                        sourceColumn=record["source_column"],
+                        targetTable=record["target_table"],
+                        targetColumn=record["target_column"],
+                        relationship=relationship_type,
+                        automatic=True,
                     )
+                )
 
         except Exception as e:
             logger.error(f"Error getting metadata: {str(e)}")
             raise
 
+        _metadata_cache[self._metadata_key] = (time.monotonic(), (tables, columns, relationships))
         return tables, columns, relationships
 
+    def invalidate_metadata(self) -> None:
+        """Drop cached catalog metadata for this connection."""
+        _metadata_cache.pop(self._metadata_key, None)
+
+    async def _fetch_catalog(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Fetch tables, columns and foreign keys from pg_catalog in one round-trip.
+
+        Returns:
+            Dict with "tables", "columns" and "relationships" lists of row objects
+        """
+        if self.pool is None:
+            raise RuntimeError("Database connection pool is not initialized")
+        async with self.pool.acquire() as conn:
+            return orjson.loads(await conn.fetchval(_CATALOG_SQL))
+
     async def execute_query(
-        self, sql: str, params: Optional[Dict[str, Any]] = None
+        self, sql: str, params: Optional[QueryParams] = None
     ) -> Tuple[List[Dict[str, Any]], List[ColumnInfo], float]:
         """Execute a SQL query and return results.
 
         Args:
             sql: The SQL query to execute
-            params: Query parameters
+            params: Positional query parameters for $1, $2, ...; a dict is accepted
+                and its values are used in insertion order
 
         Returns:
             Tuple of (results, column_info, execution_time)
@@ -263,7 +462,7 @@ class PostgresConnector(DatabaseConnector):
 
         try:
             start_time = time.time()
-            param_values = list(params.values()) if params else []
+            param_values = _positional(params)
 
             if self.pool is None:
                 raise RuntimeError("Database connection pool is not initialized")
@@ -271,12 +470,8 @@ class PostgresConnector(DatabaseConnector):
                 statement = await conn.prepare(sql)
                 records = await statement.fetch(*param_values)
 
-                columns = [
-                    ColumnInfo(name=attr.name, type=attr.type.name)
-                    for attr in statement.get_attributes()
-                ]
-
-                results = [dict(record) for record in records]
+                keys, columns = _describe_statement(statement)
+                results = [dict(zip(keys, record)) for record in records]
 
                 execution_time = time.time() - start_time
 
@@ -286,14 +481,160 @@ class PostgresConnector(DatabaseConnector):
             logger.error(f"Error executing query: {str(e)}")
             raise
 
+    async def execute_query_columnar(
+        self, sql: str, params: Optional[QueryParams] = None
+    ) -> Tuple[Dict[str, List[Any]], List[ColumnInfo], float]:
+        """Execute a SQL query and return results as one list of values per column.
+
+        Args:
+            sql: The SQL query to execute
+            params: Positional query parameters for $1, $2, ...; a dict is accepted
+                and its values are used in insertion order
+
+        Returns:
+            Tuple of (data, column_info, execution_time)
+            where data maps each column name to its values in row order
+        """
+        await self.connect()
+
+        try:
+            start_time = time.time()
+            param_values = _positional(params)
+
+            if self.pool is None:
+                raise RuntimeError("Database connection pool is not initialized")
+            async with self.pool.acquire() as conn:
+                statement = await conn.prepare(sql)
+                records = await statement.fetch(*param_values)
+
+                keys, columns = _describe_statement(statement)
+                data = {key: [record[i] for record in records] for i, key in enumerate(keys)}
+
+                execution_time = time.time() - start_time
+
+                return data, columns, execution_time
+
+        except Exception as e:
+            logger.error(f"Error executing query: {str(e)}")
+            raise
+
+    async def execute_query_copy(
+        self,
+        sql: str,
+        params: Optional[QueryParams],
+        out: Union[BinaryIO, Callable[[bytes], Awaitable[Any]]],
+        format: str = "binary",
+    ) -> None:
+        """Write query results to out with COPY ... TO STDOUT.
+
+        COPY skips per-row protocol messages and Python row construction, so it
+        is the fastest way to export large result sets.
+
+        Args:
+            sql: The SQL query to execute
+            params: Positional query parameters for $1, $2, ...; a dict is accepted
+                and its values are used in insertion order
+            out: A binary file object, or a coroutine function called with each chunk
+            format: Export format ("binary" or "csv")
+        """
+        await self.connect()
+
+        try:
+            param_values = _positional(params)
+            options: Dict[str, Any] = {"header": True} if format == "csv" else {}
+
+            if self.long_pool is None:
+                raise RuntimeError("Database connection pool is not initialized")
+            async with self.long_pool.acquire() as conn:
+                await conn.copy_from_query(sql, *param_values, output=out, format=format, **options)
+
+        except Exception as e:
+            logger.error(f"Error exporting query: {str(e)}")
+            raise
+
+    async def execute_with_streaming(
+        self,
+        sql: str,
+        params: Optional[QueryParams] = None,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[asyncpg.Record]:
+        """Execute a SQL query and yield result rows as they arrive.
+
+        Rows are read through a server-side cursor in batches of batch_size, so
+        the full result set is never held in memory. Records support mapping
+        access, so callers that need dicts can use record.items().
+
+        Args:
+            sql: The SQL query to execute
+            params: Positional query parameters for $1, $2, ...; a dict is accepted
+                and its values are used in insertion order
+            batch_size: Number of rows to fetch per round-trip
+
+        Yields:
+            Result records
+        """
+        await self.connect()
+
+        try:
+            param_values = _positional(params)
+
+            if self.long_pool is None:
+                raise RuntimeError("Database connection pool is not initialized")
+            async with self.long_pool.acquire() as conn:
+                # Server-side cursors only live inside a transaction
+                async with conn.transaction():
+                    statement = await conn.prepare(sql)
+                    cursor = await statement.cursor(*param_values)
+                    while True:
+                        records = await cursor.fetch(batch_size)
+                        if not records:
+                            break
+                        for record in records:
+                            yield record
+
+        except Exception as e:
+            logger.error(f"Error streaming query: {str(e)}")
+            raise
+
+    async def execute_with_streaming_json(
+        self,
+        sql: str,
+        params: Optional[QueryParams] = None,
+        batch_size: int = STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[bytes]:
+        """Execute a SQL query and yield result rows as newline-delimited JSON.
+
+        Rows are serialized here so an endpoint can pass the chunks straight to a
+        StreamingResponse without encoding them again.
+
+        Args:
+            sql: The SQL query to execute
+            params: Positional query parameters for $1, $2, ...; a dict is accepted
+                and its values are used in insertion order
+            batch_size: Number of rows to fetch per round-trip
+
+        Yields:
+            One JSON object per row, terminated by a newline
+        """
+        keys: Optional[Tuple[str, ...]] = None
+        async for record in self.execute_with_streaming(sql, params, batch_size):
+            if keys is None:
+                keys = tuple(record.keys())
+            yield orjson.dumps(
+                dict(zip(keys, record.values())),
+                default=str,
+                option=orjson.OPT_APPEND_NEWLINE,
+            )
+
     async def get_query_explanation(
-        self, sql: str, params: Optional[Dict[str, Any]] = None
+        self, sql: str, params: Optional[QueryParams] = None
     ) -> Dict[str, Any]:
         """Get execution plan for a query.
 
         Args:
             sql: The SQL query to explain
-            params: Query parameters
+            params: Positional query parameters for $1, $2, ...; a dict is accepted
+                and its values are used in insertion order
 
         Returns:
             Query plan information
@@ -301,12 +642,12 @@ class PostgresConnector(DatabaseConnector):
         await self.connect()
 
         try:
-            param_values = list(params.values()) if params else []
+            param_values = _positional(params)
             explain_sql = f"EXPLAIN (FORMAT JSON, ANALYZE, VERBOSE) {sql}"
 
-            if self.pool is None:
+            if self.long_pool is None:
                 raise RuntimeError("Database connection pool is not initialized")
-            async with self.pool.acquire() as conn:
+            async with self.long_pool.acquire() as conn:
                 plan = await conn.fetchval(explain_sql, *param_values)
 
                 return {"plan": plan[0], "cost": plan[0].get("Plan", {}).get("Total Cost")}
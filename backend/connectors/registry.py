@@ -0,0 +1,97 @@
+"""Process-wide registry of database connectors, shared across requests."""
+
+import asyncio
+import contextlib
+import logging
+from typing import Dict, Iterable
+
+from connectors.base_connector import DatabaseConnector
+from connectors.connector_factory import DatabaseConnectorFactory
+from models.connection import Connection
+
+logger = logging.getLogger(__name__)
+
+# Connectors by connection id; each keeps its own pool or client open between requests
+_connectors: Dict[str, DatabaseConnector] = {}
+
+# One lock per connection id so concurrent callers never both build a connector
+_locks: Dict[str, asyncio.Lock] = {}
+
+
+async def get_connector(connection: Connection) -> DatabaseConnector:
+    """Get a connected connector for a connection, creating it on first use.
+
+    A cached connector is replaced if the connection's type or config has changed.
+
+    Args:
+        connection: The connection configuration
+
+    Returns:
+        A connected database connector
+
+    Raises:
+        ValueError: If the database type is not supported
+    """
+    async with _locks.setdefault(connection.id, asyncio.Lock()):
+        connector = _connectors.get(connection.id)
+        if connector is not None and (
+            connector.connection.type != connection.type
+            or connector.connection.config != connection.config
+        ):
+            await evict_connector(connection.id)
+            connector = None
+
+        if connector is None:
+            connector = DatabaseConnectorFactory.create_connector(connection)
+            if not connector:
+                raise ValueError(f"Unsupported database type: {connection.type}")
+            _connectors[connection.id] = connector
+
+    await connector.connect()
+    return connector
+
+
+async def warm_connectors(connections: Iterable[Connection]) -> None:
+    """Connect the given connections' connectors ahead of their first request.
+
+    Connections are opened concurrently. Failures are logged rather than raised; the
+    connector stays registered and retries on its next use.
+
+    Args:
+        connections: The connections to connect
+    """
+    connections = list(connections)
+    results = await asyncio.gather(
+        *(get_connector(connection) for connection in connections), return_exceptions=True
+    )
+    for connection, result in zip(connections, results):
+        if isinstance(result, Exception):
+            logger.warning("Could not warm up connector for %s: %s", connection.id, result)
+
+
+async def evict_connector(connection_id: str) -> None:
+    """Remove a connection's connector from the registry and close it.
+
+    The connection's lock is dropped too, unless a get_connector call is holding it.
+
+    Args:
+        connection_id: The connection ID
+    """
+    lock = _locks.get(connection_id)
+    if lock is not None and not lock.locked():
+        del _locks[connection_id]
+    connector = _connectors.pop(connection_id, None)
+    if connector is None:
+        return
+    try:
+        await connector.close()
+    except Exception as e:
+        logger.warning("Error closing connector for %s: %s", connection_id, e)
+
+
+async def close_all_connectors() -> None:
+    """Close every registered connector."""
+    for connection_id in list(_connectors):
+        with contextlib.suppress(Exception):
+            await evict_connector(connection_id)
+    _locks.clear()
@@ -1,6 +1,7 @@
 """Connector implementation for Snowflake databases."""
 
 import asyncio
+import contextlib
 import json
 import logging
 import time
@@ -32,34 +33,41 @@ class SnowflakeConnector(DatabaseConnector):
 
     async def connect(self) -> None:
         """Establish connection to the database."""
+        await self._join_warmup()
         if self.client:
             return
 
-        try:
-            # Log connection attempt
-            logger.info(
-                f"Connecting to Snowflake at {self.connection.config.account} "
-                f"with DB {self.connection.config.database}"
-            )
+        # Concurrent first callers share one connect instead of each opening their own
+        async with self._connect_lock:
+            if self.client:
+                return
 
-            # Create connection
-            self.client = await self._run_in_executor(
-                lambda: snowflake.connector.connect(
-                    user=self.connection.config.user,
-                    password=self.connection.config.password,
-                    account=self.connection.config.account,
-                    warehouse=self.connection.config.warehouse,
-                    database=self.connection.config.database,
-                    schema=getattr(self.connection.config, "snowflake_schema", "PUBLIC"),
-                    role=getattr(self.connection.config, "role", None),
+            try:
+                # Log connection attempt
+                logger.info(
+                    "Connecting to Snowflake at %s with DB %s",
+                    self.connection.config.account,
+                    self.connection.config.database,
+                )
+
+                # Create connection
+                self.client = await self._run_in_executor(
+                    lambda: snowflake.connector.connect(
+                        user=self.connection.config.user,
+                        password=self.connection.config.password,
+                        account=self.connection.config.account,
+                        warehouse=self.connection.config.warehouse,
+                        database=self.connection.config.database,
+                        schema=getattr(self.connection.config, "snowflake_schema", "PUBLIC"),
+                        role=getattr(self.connection.config, "role", None),
+                    )
                 )
-            )
 
-            logger.info("Snowflake client initialized successfully")
+                logger.info("Snowflake client initialized successfully")
 
-        except Exception as e:
-            logger.error(f"Error connecting to Snowflake: {str(e)}")
-            raise
+            except Exception as e:
+                logger.error(f"Error connecting to Snowflake: {str(e)}")
+                raise
 
     async def get_client(self):
         """Get the database client, connecting if necessary."""
@@ -75,23 +83,14 @@ class SnowflakeConnector(DatabaseConnector):
             Tuple of (success, message)
         """
         try:
-            # Create a connection for testing
-            conn = snowflake.connector.connect(
-                user=self.connection.config.user,
-                password=self.connection.config.password,
-                account=self.connection.config.account,
-                warehouse=self.connection.config.warehouse,
-                database=self.connection.config.database,
-                schema=getattr(self.connection.config, "snowflake_schema", "PUBLIC"),
-                role=getattr(self.connection.config, "role", None),
+            # Run the check on the shared client, so a passing test leaves it ready for use
+            client = await self.get_client()
+            cursor = await self._run_in_executor(
+                lambda: client.cursor().execute("SELECT CURRENT_VERSION()")
             )
-
-            # Test the connection with a simple query
-            cursor = conn.cursor()
-            cursor.execute("SELECT CURRENT_VERSION()")
-            version = cursor.fetchone()[0]
-            cursor.close()
-            conn.close()
+            row = await self._run_in_executor(lambda: cursor.fetchone())
+            await self._run_in_executor(lambda: cursor.close())
+            version = row[0]
 
             return True, f"Connection successful. Snowflake version: {version}"
 
@@ -114,7 +113,7 @@ class SnowflakeConnector(DatabaseConnector):
 
         try:
             logger.info(
-                f"Fetching metadata for Snowflake database: {self.connection.config.database}"
+                "Fetching metadata for Snowflake database: %s", self.connection.config.database
             )
 
             schema = getattr(self.connection.config, "snowflake_schema")
@@ -420,6 +419,8 @@ class SnowflakeConnector(DatabaseConnector):
 
     async def close(self) -> None:
         """Close the connection."""
+        with contextlib.suppress(Exception):
+            await self._join_warmup()
         if self.client:
             try:
                 await self._run_in_executor(lambda: self.client.close())
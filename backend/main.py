@@ -1,15 +1,22 @@
 """Main entry point for the Facet API application."""
 
+import asyncio
+import contextlib
 import logging
 import os
+from contextlib import asynccontextmanager
 from datetime import datetime
 
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+
+from connectors.registry import close_all_connectors, warm_connectors
 
 # Import routers
 from routers import connections, explorations, metadata, query
+from routers.dependencies import get_connection_service, get_exploration_service, load_services
 
 # Setup logging
 logging.basicConfig(
@@ -17,8 +24,36 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load services and warm predefined connectors on startup.
+
+    On shutdown, write any pending exploration changes and close connectors.
+    """
+    await load_services()
+
+    # Connect in the background so an unreachable database doesn't hold up startup
+    connection_service = await get_connection_service()
+    warmup = asyncio.create_task(warm_connectors(connection_service.predefined_connections))
+    yield
+
+    warmup.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await warmup
+    exploration_service = await get_exploration_service()
+    await exploration_service.close()
+    await close_all_connectors()
+
+
 # Create FastAPI app
-app = FastAPI(title="Facet API", description="API for Facet SQL exploration tool", version="1.0.0")
+app = FastAPI(
+    title="Facet API",
+    description="API for Facet SQL exploration tool",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
 
 # Add CORS middleware
 app.add_middleware(
@@ -1,9 +1,9 @@
 """Models for query representation and execution."""
 
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Union
+from typing import Annotated, Any, Dict, List, Optional, Union
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Discriminator, Tag, model_validator
 
 
 class FilterCondition(BaseModel):
@@ -14,15 +14,71 @@ class FilterCondition(BaseModel):
     value: Any
 
 
+def _filter_kind(value: Any) -> str:
+    """Tell a filter group from a single condition by its "logic" field."""
+    if isinstance(value, dict):
+        return "group" if "logic" in value else "condition"
+    return "group" if isinstance(value, LogicalFilterGroup) else "condition"
+
+
+# A condition or a nested group. Picking the branch up front avoids trying each
+# union member in turn when validating filter trees.
+FilterItem = Annotated[
+    Union[
+        Annotated[FilterCondition, Tag("condition")],
+        Annotated["LogicalFilterGroup", Tag("group")],
+    ],
+    Discriminator(_filter_kind),
+]
+
+
 class LogicalFilterGroup(BaseModel):
     """A group of filter conditions with a logical operator."""
 
     logic: str  # 'and' or 'or'
-    conditions: List[Union["FilterCondition", "LogicalFilterGroup"]]
+    conditions: List[FilterItem]
 
 
 # Resolve forward references
-LogicalFilterGroup.update_forward_refs()
+LogicalFilterGroup.model_rebuild()
+
+# Deepest nesting of filter groups accepted in a query
+MAX_FILTER_DEPTH = 16
+
+
+def _flatten_filters(items: List[FilterItem], logic: str, depth: int = 0) -> List[FilterItem]:
+    """Merge filter groups that don't change the meaning of their parent.
+
+    A group is spliced into its parent when it uses the same logic or holds a single
+    item, and dropped when it is empty.
+
+    Args:
+        items: The filters to flatten
+        logic: The logic joining items ('and' or 'or')
+        depth: How many groups deep items are
+
+    Returns:
+        The flattened filters
+
+    Raises:
+        ValueError: If groups are nested deeper than MAX_FILTER_DEPTH
+    """
+    if depth > MAX_FILTER_DEPTH:
+        raise ValueError(f"Filter groups are nested deeper than {MAX_FILTER_DEPTH} levels")
+
+    flattened = []
+    for item in items:
+        if not isinstance(item, LogicalFilterGroup):
+            flattened.append(item)
+            continue
+
+        group_logic = item.logic.lower()
+        conditions = _flatten_filters(item.conditions, group_logic, depth + 1)
+        if group_logic == logic or len(conditions) == 1:
+            flattened.extend(conditions)
+        elif conditions:
+            flattened.append(item.model_copy(update={"conditions": conditions}))
+    return flattened
 
 
 class TimeRange(BaseModel):
@@ -74,7 +130,7 @@ class QueryModel(BaseModel):
     """JSON query model."""
 
     source: Optional[QuerySource] = None
-    filters: List[Union[FilterCondition, LogicalFilterGroup]] = []
+    filters: List[FilterItem] = []
     groupBy: List[str] = []
     agg: List[Metric] = []
     timeRange: Optional[TimeRange] = None
@@ -83,10 +139,17 @@ class QueryModel(BaseModel):
     limit: Optional[int] = 100
     offset: Optional[int] = None
     isServerPagination: bool = False  # Flag to indicate server-side pagination
+    needsExactTotal: bool = True  # With server-side pagination, count all matching rows
     visualization: Optional[Visualization] = None
     selectedFields: List[str] = []  # Added for field selection
     granularity: Optional[str] = None  # For time-based aggregation
 
+    @model_validator(mode="after")
+    def _flatten_filter_groups(self) -> "QueryModel":
+        """Flatten redundant filter groups; top-level filters are joined with AND."""
+        self.filters = _flatten_filters(self.filters, "and")
+        return self
+
 
 class QueryRequest(BaseModel):
     """Request model for executing a query."""
@@ -126,8 +189,26 @@ class QueryResult(BaseModel):
     totalCount: Optional[int] = (
         None  # Total count without pagination limit (server-side pagination)
     )
+    hasMore: Optional[bool] = None  # Whether a next page exists (server-side pagination)
+    executionTime: float
+    sql: str
+    cacheHit: bool = False  # Whether the result was served from the query result cache
+    warnings: List[str] = []
+    error: Optional[str] = None
+    suggestions: Optional[List[str]] = None
+
+
+class ColumnarQueryResult(BaseModel):
+    """Result of a query execution, with data stored as one list of values per column."""
+
+    columns: List[ColumnInfo]
+    data: Dict[str, List[Any]]
+    rowCount: int
+    totalCount: Optional[int] = None
+    hasMore: Optional[bool] = None
     executionTime: float
     sql: str
+    cacheHit: bool = False
     warnings: List[str] = []
     error: Optional[str] = None
     suggestions: Optional[List[str]] = None
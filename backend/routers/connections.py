@@ -1,11 +1,12 @@
 """API routes for database connection management."""
 
 import logging
-import uuid
 from datetime import datetime
+from secrets import token_hex
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from pydantic import TypeAdapter
 
 from models.connection import (
     Connection,
@@ -14,33 +15,31 @@ from models.connection import (
     ConnectionTestResult,
     ConnectionUpdate,
 )
+from routers.dependencies import get_connection_service, get_metadata_service
+from routers.errors import ErrorHandlingRoute
+from routers.metadata import invalidate_responses
+from routers.responses import model_json_response
 from services.connection_service import ConnectionService
+from services.metadata_service import MetadataService
 
 # Create router
-router = APIRouter()
+router = APIRouter(route_class=ErrorHandlingRoute)
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
-
-# Dependencies
-def get_connection_service():
-    """Dependency for connection service."""
-    return ConnectionService()
+# Built at import so list responses serialize straight to JSON bytes
+_CONNECTIONS_ADAPTER = TypeAdapter(List[Connection])
 
 
 @router.get("/", response_model=List[Connection])
 async def list_connections(service: ConnectionService = Depends(get_connection_service)):
     """Get all connections."""
-    try:
-        connections = await service.get_all_connections()
-        return connections
-    except Exception as e:
-        logger.error(f"Error listing connections: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to list connections: {str(e)}",
-        )
+    connections = await service.get_all_connections()
+    return Response(
+        content=_CONNECTIONS_ADAPTER.dump_json(connections, by_alias=True),
+        media_type="application/json",
+    )
 
 
 @router.post("/", response_model=Connection, status_code=status.HTTP_201_CREATED)
@@ -48,29 +47,23 @@ async def create_connection(
     connection: ConnectionCreate, service: ConnectionService = Depends(get_connection_service)
 ):
     """Create a new connection."""
-    try:
-        # Generate ID
-        connection_id = f"conn_{uuid.uuid4().hex[:8]}"
-
-        # Create connection object
-        new_connection = Connection(
-            id=connection_id,
-            name=connection.name,
-            type=connection.type,
-            config=connection.config,
-            created_at=datetime.now(),
-            updated_at=datetime.now(),
-        )
+    # Generate ID
+    connection_id = f"conn_{token_hex(4)}"
+    now = datetime.now()
 
-        # Save connection
-        saved_connection = await service.create_connection(new_connection)
-        return saved_connection
-    except Exception as e:
-        logger.error(f"Error creating connection: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to create connection: {str(e)}",
-        )
+    # Create connection object
+    new_connection = Connection(
+        id=connection_id,
+        name=connection.name,
+        type=connection.type,
+        config=connection.config,
+        created_at=now,
+        updated_at=now,
+    )
+
+    # Save connection
+    saved_connection = await service.create_connection(new_connection)
+    return model_json_response(saved_connection, status_code=status.HTTP_201_CREATED)
 
 
 @router.get("/{connection_id}", response_model=Connection)
@@ -78,22 +71,13 @@ async def get_connection(
     connection_id: str, service: ConnectionService = Depends(get_connection_service)
 ):
     """Get a connection by ID."""
-    try:
-        connection = await service.get_connection(connection_id)
-        if not connection:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Connection with ID {connection_id} not found",
-            )
-        return connection
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting connection {connection_id}: {str(e)}")
+    connection = await service.get_connection(connection_id)
+    if not connection:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get connection: {str(e)}",
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Connection with ID {connection_id} not found",
         )
+    return model_json_response(connection)
 
 
 @router.put("/{connection_id}", response_model=Connection)
@@ -101,65 +85,27 @@ async def update_connection(
     connection_id: str,
     connection_update: ConnectionUpdate,
     service: ConnectionService = Depends(get_connection_service),
+    metadata_service: MetadataService = Depends(get_metadata_service),
 ):
     """Update a connection."""
-    try:
-        # Get existing connection
-        existing_connection = await service.get_connection(connection_id)
-        if not existing_connection:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Connection with ID {connection_id} not found",
-            )
-
-        # Update fields
-        updated_connection = Connection(
-            id=connection_id,
-            name=connection_update.name,
-            type=connection_update.type,
-            config=connection_update.config,
-            created_at=existing_connection.created_at,
-            updated_at=datetime.now(),
-        )
-
-        # Save updated connection
-        result = await service.update_connection(updated_connection)
-        return result
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error updating connection {connection_id}: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to update connection: {str(e)}",
-        )
+    result = await service.update_connection(connection_id, connection_update)
+    # Metadata read through the old config must not be served for the new one
+    metadata_service.expire(connection_id)
+    invalidate_responses(connection_id)
+    return model_json_response(result)
 
 
 @router.delete("/{connection_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_connection(
-    connection_id: str, service: ConnectionService = Depends(get_connection_service)
+    connection_id: str,
+    service: ConnectionService = Depends(get_connection_service),
+    metadata_service: MetadataService = Depends(get_metadata_service),
 ):
     """Delete a connection."""
-    try:
-        # Check if connection exists
-        existing_connection = await service.get_connection(connection_id)
-        if not existing_connection:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Connection with ID {connection_id} not found",
-            )
-
-        # Delete connection
-        await service.delete_connection(connection_id)
-        return None
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error deleting connection {connection_id}: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to delete connection: {str(e)}",
-        )
+    await service.delete_connection(connection_id)
+    metadata_service.expire(connection_id, deleted=True)
+    invalidate_responses(connection_id)
+    return None
 
 
 @router.post("/test", response_model=ConnectionTestResult)
@@ -168,10 +114,6 @@ async def test_connection(
     service: ConnectionService = Depends(get_connection_service),
 ):
     """Test a connection."""
-    try:
-        # Test connection
-        result = await service.test_connection(test_request.type, test_request.config)
-        return result
-    except Exception as e:
-        logger.error(f"Error testing connection: {str(e)}")
-        return ConnectionTestResult(success=False, message=f"Connection test failed: {str(e)}")
+    # Failures, including timeouts, come back as an unsuccessful result rather than an error
+    result = await service.test_connection(test_request.type, test_request.config)
+    return model_json_response(result)
@@ -0,0 +1,79 @@
+"""Shared service dependencies for the API routers.
+
+Each service is built once per process and reused by every request, so in-memory
+state (session connections, cached metadata) survives between requests.
+"""
+
+import asyncio
+from functools import lru_cache
+
+from fastapi import Depends, HTTPException, status
+
+from models.connection import Connection
+from services.connection_service import ConnectionService
+from services.exploration_service import ExplorationService
+from services.metadata_service import MetadataService
+from services.query_service import QueryService
+
+
+@lru_cache(maxsize=1)
+def _connection_service() -> ConnectionService:
+    return ConnectionService()
+
+
+@lru_cache(maxsize=1)
+def _exploration_service() -> ExplorationService:
+    return ExplorationService()
+
+
+@lru_cache(maxsize=1)
+def _metadata_service() -> MetadataService:
+    return MetadataService()
+
+
+@lru_cache(maxsize=1)
+def _query_service() -> QueryService:
+    return QueryService()
+
+
+async def get_connection_service() -> ConnectionService:
+    """Dependency for connection service."""
+    return _connection_service()
+
+
+async def get_exploration_service() -> ExplorationService:
+    """Dependency for exploration service."""
+    return _exploration_service()
+
+
+async def get_metadata_service() -> MetadataService:
+    """Dependency for metadata service."""
+    return _metadata_service()
+
+
+async def get_query_service() -> QueryService:
+    """Dependency for query service."""
+    return _query_service()
+
+
+async def get_connection_or_404(
+    conn_id: str, connection_service: ConnectionService = Depends(get_connection_service)
+) -> Connection:
+    """Dependency for the connection named by a route's conn_id path parameter.
+
+    Raises:
+        HTTPException: 404 if no connection has the given ID
+    """
+    connection = await connection_service.get_connection(conn_id)
+    if not connection:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Connection with ID {conn_id} not found",
+        )
+    return connection
+
+
+async def load_services() -> None:
+    """Build the services that read files on construction, off the event loop."""
+    await asyncio.to_thread(_connection_service)
+    await asyncio.to_thread(_exploration_service)
@@ -0,0 +1,42 @@
+"""Route class that turns unexpected errors into HTTP error responses."""
+
+import logging
+from typing import Any, Callable, Coroutine
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+from services.exceptions import NotFoundError
+
+logger = logging.getLogger(__name__)
+
+
+class ErrorHandlingRoute(APIRoute):
+    """API route that maps service errors to HTTP errors for every endpoint.
+
+    NotFoundError becomes a 404. Any other exception is logged with its traceback and
+    becomes a 500 carrying the error message. This is done per route rather than with
+    app.exception_handler(Exception), because Starlette sends those responses from
+    outside CORSMiddleware, so browsers would never see them.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        """Wrap the default route handler with error mapping."""
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            try:
+                return await handler(request)
+            except (StarletteHTTPException, RequestValidationError):
+                raise
+            except NotFoundError as e:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+            except Exception as e:
+                logger.exception("Error handling %s %s: %s", request.method, request.url.path, e)
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+                )
+
+        return route_handler
@@ -1,52 +1,105 @@
 """API routes for exploration management."""
 
+import hashlib
 import logging
-import uuid
+import time
 from datetime import datetime
-from typing import List
+from secrets import token_hex
+from typing import Dict, List, Set, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import orjson
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status
+from pydantic import TypeAdapter
 
+from models.connection import Connection
 from models.explorations import Exploration, ExplorationCreate, ExplorationUpdate
+from models.query import QueryModel
+from routers.dependencies import get_connection_service, get_exploration_service, get_query_service
+from routers.errors import ErrorHandlingRoute
+from routers.responses import ModelResponse, model_json_response
 from services.connection_service import ConnectionService
 from services.exploration_service import ExplorationService
 from services.query_service import QueryService
 
 # Create router
-router = APIRouter()
+router = APIRouter(route_class=ErrorHandlingRoute)
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Built at import so list responses serialize straight to JSON bytes
+_EXPLORATIONS_ADAPTER = TypeAdapter(List[Exploration])
 
-# Dependencies
-def get_exploration_service():
-    """Dependency for exploration service."""
-    return ExplorationService()
+# Seconds a cached exploration result is served without refreshing it
+RESULT_FRESH_TTL = 30
+# Seconds a cached result may be served while a refresh runs in the background
+RESULT_STALE_TTL = 300
 
+# Rendered results keyed by exploration ID: (time stored, query digest, response body)
+_result_cache: Dict[str, Tuple[float, bytes, bytes]] = {}
 
-def get_query_service():
-    """Dependency for query service."""
-    return QueryService()
+# Explorations with a background refresh in flight
+_refreshing: Set[str] = set()
 
 
-def get_connection_service():
-    """Dependency for connection service."""
-    return ConnectionService()
+def _result_digest(exploration: Exploration, connection: Connection) -> bytes:
+    """Identify what a cached result was computed from.
+
+    Editing the exploration's query or the connection changes the digest.
+    """
+    payload = orjson.dumps(
+        [exploration.query, connection.id, connection.updated_at],
+        option=orjson.OPT_SORT_KEYS,
+    )
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+async def _run_and_cache(
+    exploration_id: str,
+    digest: bytes,
+    connection: Connection,
+    query_model: QueryModel,
+    query_service: QueryService,
+    refresh: bool = False,
+) -> bytes:
+    """Execute an exploration's query and cache the rendered result unless it failed.
+
+    With refresh set, the query runs even if QueryService has a recent result cached.
+    The cached copy is rendered with cacheHit set, since only later requests are served it.
+    """
+    result = await query_service.execute_query(connection, query_model, refresh=refresh)
+    if result.error is None:
+        cached = ModelResponse(result.model_copy(update={"cacheHit": True})).body
+        _result_cache[exploration_id] = (time.monotonic(), digest, bytes(cached))
+    return bytes(ModelResponse(result).body)
+
+
+async def _refresh_result(
+    exploration_id: str,
+    digest: bytes,
+    connection: Connection,
+    query_model: QueryModel,
+    query_service: QueryService,
+) -> None:
+    """Refresh a stale cached result after the stale copy has been sent."""
+    try:
+        await _run_and_cache(
+            exploration_id, digest, connection, query_model, query_service, refresh=True
+        )
+    except Exception as e:
+        logger.exception("Error refreshing result for exploration %s: %s", exploration_id, e)
+    finally:
+        _refreshing.discard(exploration_id)
 
 
 @router.get("/", response_model=List[Exploration])
 async def list_explorations(service: ExplorationService = Depends(get_exploration_service)):
     """Get all explorations."""
-    try:
-        explorations = await service.get_all_explorations()
-        return explorations
-    except Exception as e:
-        logger.error(f"Error listing explorations: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to list explorations: {str(e)}",
-        )
+    explorations = await service.get_all_explorations()
+    return Response(
+        content=_EXPLORATIONS_ADAPTER.dump_json(explorations, by_alias=True),
+        media_type="application/json",
+    )
 
 
 @router.post("/", response_model=Exploration, status_code=status.HTTP_201_CREATED)
@@ -54,30 +107,24 @@ async def create_exploration(
     exploration: ExplorationCreate, service: ExplorationService = Depends(get_exploration_service)
 ):
     """Create a new exploration."""
-    try:
-        # Generate ID
-        exploration_id = f"exp_{uuid.uuid4().hex[:8]}"
-
-        # Create exploration object
-        new_exploration = Exploration(
-            id=exploration_id,
-            name=exploration.name,
-            description=exploration.description,
-            query=exploration.query,
-            created_at=datetime.now(),
-            updated_at=datetime.now(),
-            last_run=None,
-        )
-
-        # Save exploration
-        saved_exploration = await service.create_exploration(new_exploration)
-        return saved_exploration
-    except Exception as e:
-        logger.error(f"Error creating exploration: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to create exploration: {str(e)}",
-        )
+    # Generate ID
+    exploration_id = f"exp_{token_hex(4)}"
+    now = datetime.now()
+
+    # Create exploration object
+    new_exploration = Exploration(
+        id=exploration_id,
+        name=exploration.name,
+        description=exploration.description,
+        query=exploration.query,
+        created_at=now,
+        updated_at=now,
+        last_run=None,
+    )
+
+    # Save exploration
+    saved_exploration = await service.create_exploration(new_exploration)
+    return model_json_response(saved_exploration, status_code=status.HTTP_201_CREATED)
 
 
 @router.get("/{exploration_id}", response_model=Exploration)
@@ -85,22 +132,13 @@ async def get_exploration(
     exploration_id: str, service: ExplorationService = Depends(get_exploration_service)
 ):
     """Get an exploration by ID."""
-    try:
-        exploration = await service.get_exploration(exploration_id)
-        if not exploration:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Exploration with ID {exploration_id} not found",
-            )
-        return exploration
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting exploration {exploration_id}: {str(e)}")
+    exploration = await service.get_exploration(exploration_id)
+    if not exploration:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get exploration: {str(e)}",
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Exploration with ID {exploration_id} not found",
         )
+    return model_json_response(exploration)
 
 
 @router.put("/{exploration_id}", response_model=Exploration)
@@ -110,49 +148,9 @@ async def update_exploration(
     service: ExplorationService = Depends(get_exploration_service),
 ):
     """Update an exploration."""
-    try:
-        # Get existing exploration
-        existing_exploration = await service.get_exploration(exploration_id)
-        if not existing_exploration:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Exploration with ID {exploration_id} not found",
-            )
-
-        # Update fields
-        updated_exploration = Exploration(
-            id=exploration_id,
-            name=(
-                exploration_update.name
-                if exploration_update.name is not None
-                else existing_exploration.name
-            ),
-            description=(
-                exploration_update.description
-                if exploration_update.description is not None
-                else existing_exploration.description
-            ),
-            query=(
-                exploration_update.query
-                if exploration_update.query is not None
-                else existing_exploration.query
-            ),
-            created_at=existing_exploration.created_at,
-            updated_at=datetime.now(),
-            last_run=existing_exploration.last_run,
-        )
-
-        # Save updated exploration
-        result = await service.update_exploration(updated_exploration)
-        return result
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error updating exploration {exploration_id}: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to update exploration: {str(e)}",
-        )
+    result = await service.update_exploration(exploration_id, exploration_update)
+    _result_cache.pop(exploration_id, None)
+    return model_json_response(result)
 
 
 @router.delete("/{exploration_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -160,83 +158,74 @@ async def delete_exploration(
     exploration_id: str, service: ExplorationService = Depends(get_exploration_service)
 ):
     """Delete an exploration."""
-    try:
-        # Check if exploration exists
-        existing_exploration = await service.get_exploration(exploration_id)
-        if not existing_exploration:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Exploration with ID {exploration_id} not found",
-            )
-
-        # Delete exploration
-        await service.delete_exploration(exploration_id)
-        return None
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error deleting exploration {exploration_id}: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to delete exploration: {str(e)}",
-        )
+    await service.delete_exploration(exploration_id)
+    _result_cache.pop(exploration_id, None)
+    return None
 
 
 @router.post("/{exploration_id}/execute", status_code=status.HTTP_200_OK)
 async def execute_exploration(
     exploration_id: str,
+    background_tasks: BackgroundTasks,
+    refresh: bool = False,
     exploration_service: ExplorationService = Depends(get_exploration_service),
     query_service: QueryService = Depends(get_query_service),
     connection_service: ConnectionService = Depends(get_connection_service),
 ):
-    """Execute a saved exploration."""
-    try:
-        # Get exploration
-        exploration = await exploration_service.get_exploration(exploration_id)
-        if not exploration:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Exploration with ID {exploration_id} not found",
-            )
-
-        # Get connection ID from query
-        connection_id = exploration.query.get("source", {}).get("connectionId")
-        if not connection_id:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Exploration query does not have a connection ID",
-            )
-
-        # Get connection
-        connection = await connection_service.get_connection(connection_id)
-        if not connection:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Connection with ID {connection_id} not found",
-            )
-
-        # Execute query
-        result = await query_service.execute_query(connection, exploration.query)
-
-        # Update last run timestamp
-        updated_exploration = Exploration(
-            id=exploration_id,
-            name=exploration.name,
-            description=exploration.description,
-            query=exploration.query,
-            created_at=exploration.created_at,
-            updated_at=exploration.updated_at,
-            last_run=datetime.now(),
+    """Execute a saved exploration.
+
+    Results are cached per exploration. A cached result younger than RESULT_FRESH_TTL
+    is returned as-is; one younger than RESULT_STALE_TTL is returned and refreshed in
+    the background. With refresh=true the query is run again before responding.
+    """
+    # Get exploration
+    exploration = await exploration_service.get_exploration(exploration_id)
+    if not exploration:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Exploration with ID {exploration_id} not found",
         )
 
-        await exploration_service.update_exploration(updated_exploration)
+    # Get connection ID from query
+    connection_id = exploration.query.get("source", {}).get("connectionId")
+    if not connection_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Exploration query does not have a connection ID",
+        )
 
-        return result
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error executing exploration {exploration_id}: {str(e)}")
+    # Get connection
+    connection = await connection_service.get_connection(connection_id)
+    if not connection:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to execute exploration: {str(e)}",
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Connection with ID {connection_id} not found",
         )
+
+    query_model = QueryModel.model_validate(exploration.query)
+    digest = _result_digest(exploration, connection)
+
+    # Update last run timestamp once the response has been sent
+    background_tasks.add_task(exploration_service.record_run, exploration_id)
+
+    cached = None if refresh else _result_cache.get(exploration_id)
+    if cached is not None and cached[1] == digest:
+        age = time.monotonic() - cached[0]
+        if age < RESULT_STALE_TTL:
+            if age >= RESULT_FRESH_TTL and exploration_id not in _refreshing:
+                _refreshing.add(exploration_id)
+                background_tasks.add_task(
+                    _refresh_result,
+                    exploration_id,
+                    digest,
+                    connection,
+                    query_model,
+                    query_service,
+                )
+            return Response(content=cached[2], media_type="application/json")
+
+    # Execute query
+    body = await _run_and_cache(
+        exploration_id, digest, connection, query_model, query_service, refresh=refresh
+    )
+    return Response(content=body, media_type="application/json")
@@ -1,130 +1,134 @@
 """Router for metadata-related API endpoints."""
 
 import logging
-from typing import List
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status
+from pydantic import TypeAdapter
 
+from models.connection import Connection
 from models.metadata import (
     ColumnMetadata,
     MetadataUpdateRequest,
     RelationshipMetadata,
     TableMetadata,
 )
-from services.connection_service import ConnectionService
-from services.metadata_service import MetadataService
+from routers.dependencies import get_connection_or_404, get_metadata_service
+from routers.errors import ErrorHandlingRoute
+from routers.responses import ModelResponse
+from services.metadata_service import METADATA_CACHE_TTL, MetadataService
 
 # Create router
-router = APIRouter()
+router = APIRouter(route_class=ErrorHandlingRoute)
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Serialize metadata lists to JSON in one pass inside pydantic, without building dicts first
+_TABLES_ADAPTER = TypeAdapter(List[TableMetadata])
+_COLUMNS_ADAPTER = TypeAdapter(List[ColumnMetadata])
+_RELATIONSHIPS_ADAPTER = TypeAdapter(List[RelationshipMetadata])
 
-# Dependencies
-def get_metadata_service():
-    """Dependency injection for metadata service."""
-    return MetadataService()
+# Maximum number of rendered responses kept; least recently used ones are dropped first
+RESPONSE_CACHE_SIZE = 1024
 
+# Rendered response bodies keyed by (conn_id, endpoint, table_id), with the time they were built.
+# Read endpoints serve these directly so cached metadata is not re-serialized on every request.
+_response_cache: "OrderedDict[Tuple[str, str, str], Tuple[float, bytes]]" = OrderedDict()
 
-def get_connection_service():
-    """Dependency injection for connection service."""
-    return ConnectionService()
+
+def _cached_response(key: Tuple[str, str, str]) -> Optional[Response]:
+    """Return the cached response body for key, or None if missing or expired."""
+    entry = _response_cache.get(key)
+    if entry is None or time.monotonic() - entry[0] >= METADATA_CACHE_TTL:
+        return None
+    _response_cache.move_to_end(key)
+    return Response(content=entry[1], media_type="application/json")
+
+
+def _cache_response(key: Tuple[str, str, str], body: bytes) -> Response:
+    """Keep a rendered body for later requests with the same key and return it as a response."""
+    _response_cache[key] = (time.monotonic(), body)
+    _response_cache.move_to_end(key)
+    if len(_response_cache) > RESPONSE_CACHE_SIZE:
+        _response_cache.popitem(last=False)
+    return Response(content=body, media_type="application/json")
+
+
+def invalidate_responses(conn_id: str) -> None:
+    """Drop every cached response for a connection."""
+    for key in [key for key in _response_cache if key[0] == conn_id]:
+        del _response_cache[key]
 
 
 @router.get("/connections/{conn_id}/tables", response_model=List[TableMetadata])
 async def list_tables(
     conn_id: str,
+    connection: Connection = Depends(get_connection_or_404),
     metadata_service: MetadataService = Depends(get_metadata_service),
-    connection_service: ConnectionService = Depends(get_connection_service),
 ):
     """List all tables for a connection."""
-    try:
-        logger.info(f"Getting connection for fetching tables: {conn_id}")
-        connection = await connection_service.get_connection(conn_id)
-        if not connection:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Connection with ID {conn_id} not found",
-            )
-
-        # Get tables using the metadata service
-        tables = await metadata_service.get_tables(connection)
-        logger.info(f"Tables returned for connection {conn_id}: {len(tables)}")
-        return tables
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error listing tables for connection {conn_id}: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e),
-        )
+    # Serve the rendered body if this response was built recently
+    cached = _cached_response((conn_id, "tables", ""))
+    if cached is not None:
+        return cached
+
+    # Get tables using the metadata service
+    tables = await metadata_service.get_tables(connection)
+    logger.info(f"Tables returned for connection {conn_id}: {len(tables)}")
+    return _cache_response(
+        (conn_id, "tables", ""), _TABLES_ADAPTER.dump_json(tables, by_alias=True)
+    )
 
 
 @router.get("/connections/{conn_id}/tables/{table_id}", response_model=TableMetadata)
 async def get_table_metadata(
     conn_id: str,
     table_id: str,
+    connection: Connection = Depends(get_connection_or_404),
     metadata_service: MetadataService = Depends(get_metadata_service),
-    connection_service: ConnectionService = Depends(get_connection_service),
 ):
     """Get metadata for a specific table."""
-    try:
-        # Get connection
-        connection = await connection_service.get_connection(conn_id)
-        if not connection:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Connection with ID {conn_id} not found",
-            )
-
-        # Get table metadata
-        table = await metadata_service.get_table(connection, table_id)
-        if not table:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail=f"Table {table_id} not found"
-            )
-
-        return table
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting metadata for table {table_id}: {str(e)}")
+    # Serve the rendered body if this response was built recently
+    cached = _cached_response((conn_id, "table", table_id))
+    if cached is not None:
+        return cached
+
+    # Get table metadata
+    table = await metadata_service.get_table(connection, table_id)
+    if not table:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e),
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Table {table_id} not found"
         )
 
+    return _cache_response(
+        (conn_id, "table", table_id), table.model_dump_json(by_alias=True).encode()
+    )
+
 
 @router.get("/connections/{conn_id}/tables/{table_id}/columns", response_model=List[ColumnMetadata])
 async def get_table_columns(
     conn_id: str,
     table_id: str,
+    connection: Connection = Depends(get_connection_or_404),
     metadata_service: MetadataService = Depends(get_metadata_service),
-    connection_service: ConnectionService = Depends(get_connection_service),
 ):
     """Get columns for a specific table."""
-    try:
-        # Get connection
-        connection = await connection_service.get_connection(conn_id)
-        if not connection:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Connection with ID {conn_id} not found",
-            )
-
-        # Get columns
-        columns = await metadata_service.get_columns(connection, table_id)
-        return columns
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting columns for table {table_id}: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e),
-        )
+    # Serve the rendered body if this response was built recently
+    cached = _cached_response((conn_id, "columns", table_id))
+    if cached is not None:
+        return cached
+
+    # Get columns
+    columns = await metadata_service.get_columns(connection, table_id)
+    if not columns:
+        # Unknown tables have no columns; keep arbitrary table ids out of the cache
+        return Response(content=b"[]", media_type="application/json")
+    return _cache_response(
+        (conn_id, "columns", table_id), _COLUMNS_ADAPTER.dump_json(columns, by_alias=True)
+    )
 
 
 @router.put("/connections/{conn_id}/tables/{table_id}", response_model=TableMetadata)
@@ -132,94 +136,57 @@ async def update_table_metadata(
     conn_id: str,
     table_id: str,
     metadata_update: MetadataUpdateRequest,
+    connection: Connection = Depends(get_connection_or_404),
     metadata_service: MetadataService = Depends(get_metadata_service),
-    connection_service: ConnectionService = Depends(get_connection_service),
 ):
     """Update metadata for a table."""
-    try:
-        # Get connection
-        connection = await connection_service.get_connection(conn_id)
-        if not connection:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Connection with ID {conn_id} not found",
-            )
-
-        # Update table metadata
-        updated_table = await metadata_service.update_table_metadata(
-            connection, table_id, metadata_update
-        )
-
-        if not updated_table:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail=f"Table {table_id} not found"
-            )
+    # Update table metadata
+    updated_table = await metadata_service.update_table_metadata(
+        connection, table_id, metadata_update
+    )
 
-        return updated_table
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error updating metadata for table {table_id}: {str(e)}")
+    if not updated_table:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to update table metadata: {str(e)}",
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Table {table_id} not found"
         )
 
+    invalidate_responses(conn_id)
+    return ModelResponse(updated_table)
+
 
 @router.post("/connections/{conn_id}/refresh", status_code=status.HTTP_202_ACCEPTED)
 async def refresh_metadata(
     conn_id: str,
+    background_tasks: BackgroundTasks,
+    connection: Connection = Depends(get_connection_or_404),
     metadata_service: MetadataService = Depends(get_metadata_service),
-    connection_service: ConnectionService = Depends(get_connection_service),
 ):
-    """Refresh metadata for a connection."""
-    try:
-        # Get connection
-        connection = await connection_service.get_connection(conn_id)
-        if not connection:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Connection with ID {conn_id} not found",
-            )
-
-        # Refresh metadata
-        await metadata_service.refresh_metadata(connection)
-
-        return {"message": f"Metadata refresh started for connection {conn_id}"}
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error refreshing metadata for connection {conn_id}: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e),
-        )
+    """Refresh metadata for a connection.
+
+    Responds immediately; reads that arrive before the refresh finishes wait for it.
+    """
+    metadata_service.expire(conn_id)
+    invalidate_responses(conn_id)
+    background_tasks.add_task(metadata_service.warm_metadata, connection)
+
+    return {"message": f"Metadata refresh started for connection {conn_id}"}
 
 
 @router.get("/connections/{conn_id}/relationships", response_model=List[RelationshipMetadata])
 async def get_relationships(
     conn_id: str,
+    connection: Connection = Depends(get_connection_or_404),
     metadata_service: MetadataService = Depends(get_metadata_service),
-    connection_service: ConnectionService = Depends(get_connection_service),
 ):
     """Get relationships for a connection."""
-    try:
-        # Get connection
-        connection = await connection_service.get_connection(conn_id)
-        if not connection:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Connection with ID {conn_id} not found",
-            )
-
-        # Get relationships
-        relationships = await metadata_service.get_relationships(connection)
-        return relationships
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting relationships for connection {conn_id}: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get relationships: {str(e)}",
-        )
+    # Serve the rendered body if this response was built recently
+    cached = _cached_response((conn_id, "relationships", ""))
+    if cached is not None:
+        return cached
+
+    # Get relationships
+    relationships = await metadata_service.get_relationships(connection)
+    return _cache_response(
+        (conn_id, "relationships", ""),
+        _RELATIONSHIPS_ADAPTER.dump_json(relationships, by_alias=True),
+    )
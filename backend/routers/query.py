@@ -1,58 +1,100 @@
 """API routes for executing queries."""
 
 import logging
+from typing import Literal, Union
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 
 from models.query import (
+    ColumnarQueryResult,
     QueryRequest,
     QueryResult,
 )
+from routers.dependencies import get_connection_service, get_query_service
+from routers.errors import ErrorHandlingRoute
+from routers.responses import ModelResponse
 from services.connection_service import ConnectionService
 from services.query_service import QueryService
 
 # Create router
-router = APIRouter()
+router = APIRouter(route_class=ErrorHandlingRoute)
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
 
-# Dependencies
-def get_query_service():
-    """Return a query service instance."""
-    return QueryService()
+@router.post("/execute", response_model=Union[QueryResult, ColumnarQueryResult])
+async def execute_query(
+    query_request: QueryRequest,
+    format: Literal["rows", "columnar"] = "rows",
+    refresh: bool = False,
+    query_service: QueryService = Depends(get_query_service),
+    connection_service: ConnectionService = Depends(get_connection_service),
+):
+    """Execute a query.
 
+    With format=columnar, data maps each column name to its values, so column names
+    are sent once instead of once per row. Recent results are served from the query
+    cache and marked with cacheHit; refresh=true runs the query again.
+    """
+    # Get connection
+    connection = await connection_service.get_connection(query_request.connectionId)
+    if not connection:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Connection with ID {query_request.connectionId} not found",
+        )
 
-def get_connection_service():
-    """Return a connection service instance."""
-    return ConnectionService()
+    # Execute query
+    result = await query_service.execute_query(
+        connection, query_request.query, columnar=format == "columnar", refresh=refresh
+    )
+    return ModelResponse(result)
 
 
-@router.post("/execute", response_model=QueryResult)
-async def execute_query(
+@router.post("/stream")
+async def stream_query(
     query_request: QueryRequest,
+    refresh: bool = False,
     query_service: QueryService = Depends(get_query_service),
     connection_service: ConnectionService = Depends(get_connection_service),
 ):
-    """Execute a query."""
-    try:
-        # Get connection
-        connection = await connection_service.get_connection(query_request.connectionId)
-        if not connection:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Connection with ID {query_request.connectionId} not found",
-            )
-
-        # Execute query
-        result = await query_service.execute_query(connection, query_request.query)
-        return result
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error executing query: {str(e)}")
+    """Execute a query and stream its rows as newline-delimited JSON as they are read.
+
+    A recent cached result for the same query is replayed; refresh=true reads the rows again.
+    """
+    # Get connection
+    connection = await connection_service.get_connection(query_request.connectionId)
+    if not connection:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to execute query: {str(e)}",
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Connection with ID {query_request.connectionId} not found",
         )
+
+    rows = await query_service.stream_query(connection, query_request.query, refresh=refresh)
+    return StreamingResponse(rows, media_type="application/x-ndjson")
+
+
+@router.post("/export")
+async def export_query(
+    query_request: QueryRequest,
+    format: Literal["binary", "csv"] = "binary",
+    query_service: QueryService = Depends(get_query_service),
+    connection_service: ConnectionService = Depends(get_connection_service),
+):
+    """Export the full result of a query, streamed as COPY output."""
+    # Get connection
+    connection = await connection_service.get_connection(query_request.connectionId)
+    if not connection:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Connection with ID {query_request.connectionId} not found",
+        )
+
+    try:
+        chunks = await query_service.export_query(connection, query_request.query, format)
+    except NotImplementedError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    media_type = "text/csv" if format == "csv" else "application/octet-stream"
+    return StreamingResponse(chunks, media_type=media_type)
@@ -0,0 +1,79 @@
+"""Response helpers shared by the API routers."""
+
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+import orjson
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel
+
+# Stringify non-str dict keys (e.g. ClickHouse Map columns) as jsonable_encoder did
+_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    """Convert values orjson can't serialize natively, matching jsonable_encoder's output.
+
+    Args:
+        obj: The value to convert
+
+    Returns:
+        A JSON-serializable value
+
+    Raises:
+        TypeError: If the value has no JSON representation
+    """
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(by_alias=True)
+    if isinstance(obj, Decimal):
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, timedelta):
+        return obj.total_seconds()
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class ModelResponse(ORJSONResponse):
+    """ORJSONResponse that also serializes pydantic models.
+
+    Returning one from a route skips FastAPI's response_model validation and
+    jsonable_encoder pass; the response_model is still used for the OpenAPI schema.
+    """
+
+    def render(self, content: Any) -> bytes:
+        """Serialize the content with orjson.
+
+        Args:
+            content: Models, or JSON-compatible data containing models
+
+        Returns:
+            The encoded JSON body
+        """
+        return orjson.dumps(content, default=_default, option=_OPTIONS)
+
+
+def model_json_response(model: BaseModel, status_code: int = 200) -> Response:
+    """Render one model with pydantic's JSON serializer, without building a dict first.
+
+    Only for models whose fields pydantic serializes the same way as _default; query
+    results hold arbitrary database values and go through ModelResponse instead.
+
+    Args:
+        model: The model to render
+        status_code: The response status code
+
+    Returns:
+        A JSON response
+    """
+    return Response(
+        content=model.model_dump_json(by_alias=True),
+        status_code=status_code,
+        media_type="application/json",
+    )
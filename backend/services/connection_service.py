@@ -1,18 +1,43 @@
 """Service for managing database connections."""
 
+import asyncio
+import hashlib
 import logging
 import os
 import re
+from collections import OrderedDict
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import yaml
 
-from connectors.connector_factory import DatabaseConnectorFactory
-from models.connection import Connection, ConnectionConfig, ConnectionTestResult
+from connectors.registry import evict_connector, get_connector
+from models.connection import Connection, ConnectionConfig, ConnectionTestResult, ConnectionUpdate
+from services.exceptions import NotFoundError
 
 logger = logging.getLogger(__name__)
 
+# Matches environment variable references like ${FACET_POSTGRES_USER} in config values
+_ENV_VAR_RE = re.compile(r"\$\{(FACET_[A-Z0-9_]+)\}")
+
+# libyaml's loader when PyYAML was built with it, which parses several times faster
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Seconds a connection test may take before it is reported as failed
+CONNECTION_TEST_TIMEOUT = 5.0
+
+# Number of successfully tested configs whose connectors stay open for repeat tests
+TEST_CONNECTOR_LIMIT = 4
+
+
+def _env_value(match: "re.Match[str]") -> str:
+    """Return the value of the environment variable a reference names, or ""."""
+    env_var = match.group(1)
+    env_value = os.environ.get(env_var, "")
+    if not env_value:
+        logger.warning(f"Environment variable {env_var} not found or empty")
+    return env_value
+
 
 class ConnectionService:
     """Service for managing database connections."""
@@ -21,26 +46,39 @@ class ConnectionService:
     # In a production system, this could be a proper database or Redis store
     _active_connections: Dict[str, Any] = {}
 
+    # Predefined connections parsed from each config file, keyed by path,
+    # with the file's (mtime, size) when it was read
+    _config_cache: Dict[str, Tuple[Tuple[float, int], List[Connection]]] = {}
+
     def __init__(self):
         """Initialize the connection service."""
         # Predefined connections from config
         self.predefined_connections = []
 
-        # User session connections (in-memory storage)
-        self.session_connections = []
+        # User session connections by ID, in creation order (in-memory storage)
+        self.session_connections: Dict[str, Connection] = {}
+
+        # Predefined and session connections by ID, kept in step with the lists above
+        self._by_id: Dict[str, Connection] = {}
+
+        # Predefined then session connections, rebuilt whenever either list changes
+        self._all: List[Connection] = []
+
+        # Registry IDs of connectors kept from connection tests, least recently tested first
+        self._test_connector_ids: "OrderedDict[str, None]" = OrderedDict()
 
         # Load predefined connections from YAML config
         self._load_predefined_connections()
+        self._rebuild_all()
 
     async def get_all_connections(self) -> List[Connection]:
         """
         Get all connections (predefined + session).
 
         Returns:
-            List of connections
+            List of connections, shared between callers and not to be modified
         """
-        # Return both predefined and session connections
-        return self.predefined_connections + self.session_connections
+        return self._all
 
     async def get_connection(self, connection_id: str) -> Optional[Connection]:
         """
@@ -52,17 +90,7 @@ class ConnectionService:
         Returns:
             Connection or None if not found
         """
-        # Check predefined connections first
-        for connection in self.predefined_connections:
-            if connection.id == connection_id:
-                return connection
-
-        # Then check session connections
-        for connection in self.session_connections:
-            if connection.id == connection_id:
-                return connection
-
-        return None
+        return self._by_id.get(connection_id)
 
     async def create_connection(self, connection: Connection) -> Connection:
         """
@@ -74,31 +102,52 @@ class ConnectionService:
         Returns:
             The created connection
         """
-        # Add to session connections list
-        self.session_connections.append(connection)
+        # Add to session connections
+        self.session_connections[connection.id] = connection
+        self._by_id[connection.id] = connection
+        self._rebuild_all()
         return connection
 
-    async def update_connection(self, connection: Connection) -> Connection:
+    async def update_connection(
+        self, connection_id: str, connection_update: ConnectionUpdate
+    ) -> Connection:
         """
         Update an existing session connection.
 
         Args:
-            connection: The connection to update
+            connection_id: The ID of the connection to update
+            connection_update: The new connection details
 
         Returns:
             The updated connection
+
+        Raises:
+            NotFoundError: If no connection has the given ID
         """
-        # Predefined connections cannot be modified
-        for predefined in self.predefined_connections:
-            if predefined.id == connection.id:
-                logger.warning(f"Attempted to update predefined connection: {connection.id}")
+        existing_connection = self.session_connections.get(connection_id)
+        if existing_connection is None:
+            # Predefined connections cannot be modified
+            predefined = self._by_id.get(connection_id)
+            if predefined is not None:
+                logger.warning(f"Attempted to update predefined connection: {connection_id}")
                 return predefined
+            raise NotFoundError(f"Connection with ID {connection_id} not found")
 
         # Update session connection
-        for i, existing_connection in enumerate(self.session_connections):
-            if existing_connection.id == connection.id:
-                self.session_connections[i] = connection
-                break
+        connection = Connection(
+            id=connection_id,
+            name=connection_update.name,
+            type=connection_update.type,
+            config=connection_update.config,
+            created_at=existing_connection.created_at,
+            updated_at=datetime.now(),
+        )
+        self.session_connections[connection_id] = connection
+        self._by_id[connection_id] = connection
+        self._rebuild_all()
+
+        # Drop the pooled connector so the next request reconnects with the new config
+        await evict_connector(connection_id)
 
         return connection
 
@@ -108,17 +157,20 @@ class ConnectionService:
 
         Args:
             connection_id: The connection ID to delete
+
+        Raises:
+            NotFoundError: If no connection has the given ID
         """
-        # Check if it's a predefined connection (which can't be deleted)
-        for predefined in self.predefined_connections:
-            if predefined.id == connection_id:
+        # Remove from session connections
+        if self.session_connections.pop(connection_id, None) is None:
+            # Predefined connections cannot be deleted
+            if connection_id in self._by_id:
                 logger.warning(f"Attempted to delete predefined connection: {connection_id}")
                 return
-
-        # Remove from session connections
-        self.session_connections = [
-            conn for conn in self.session_connections if conn.id != connection_id
-        ]
+            raise NotFoundError(f"Connection with ID {connection_id} not found")
+        self._by_id.pop(connection_id, None)
+        self._rebuild_all()
+        await evict_connector(connection_id)
 
     async def test_connection(
         self, connection_type: str, connection_config: ConnectionConfig
@@ -126,6 +178,10 @@ class ConnectionService:
         """
         Test a connection.
 
+        A saved connection with the same settings is tested through its pooled connector.
+        Other settings get a connector that is kept open after a successful test, so
+        testing them again (or a few other configs in between) skips reconnecting.
+
         Args:
             connection_type: The connection type
             connection_config: The connection configuration
@@ -133,34 +189,81 @@ class ConnectionService:
         Returns:
             Connection test result
         """
-        try:
-            # Create temporary connection object
-            temp_connection = Connection(
-                id="temp",
+        saved = next(
+            (
+                conn
+                for conn in self._all
+                if conn.type == connection_type and conn.config == connection_config
+            ),
+            None,
+        )
+        if saved is not None:
+            connection = saved
+        else:
+            # Key the temporary connection by its settings so repeat tests find its connector
+            digest = hashlib.blake2b(
+                (connection_type + connection_config.model_dump_json()).encode(), digest_size=8
+            ).hexdigest()
+            now = datetime.now()
+            connection = Connection(
+                id=f"test_{digest}",
                 name="Test Connection",
                 type=connection_type,
                 config=connection_config,
-                created_at=None,
-                updated_at=None,
+                created_at=now,
+                updated_at=now,
             )
 
-            # Create connector for the database
-            connector = await DatabaseConnectorFactory.create_connector(temp_connection)
-            if not connector:
-                return ConnectionTestResult(
-                    success=False, message=f"Unsupported database type: {connection_type}"
-                )
+        try:
+            success, message = await asyncio.wait_for(
+                self._run_connection_test(connection), timeout=CONNECTION_TEST_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            success = False
+            message = f"Connection timed out after {CONNECTION_TEST_TIMEOUT:g} seconds"
+        except Exception as e:
+            logger.error(f"Error testing connection: {str(e)}")
+            success, message = False, f"Error testing connection: {str(e)}"
 
-            # Test connection
-            success, message = await connector.test_connection()
+        if saved is None:
+            await self._keep_test_connector(connection.id, success)
 
-            return ConnectionTestResult(success=success, message=message)
+        return ConnectionTestResult(success=success, message=message)
 
-        except Exception as e:
-            logger.error(f"Error testing connection: {str(e)}")
-            return ConnectionTestResult(
-                success=False, message=f"Error testing connection: {str(e)}"
-            )
+    async def _run_connection_test(self, connection: Connection) -> Tuple[bool, str]:
+        """Test a connection through its registered connector.
+
+        Args:
+            connection: The connection to test
+
+        Returns:
+            Tuple of (success, message)
+        """
+        connector = await get_connector(connection)
+        return await connector.test_connection()
+
+    async def _keep_test_connector(self, connection_id: str, keep: bool) -> None:
+        """Keep a tested connector for reuse, or close it if its test failed.
+
+        Args:
+            connection_id: The registry ID of the tested connector
+            keep: Whether the test succeeded
+        """
+        if not keep:
+            self._test_connector_ids.pop(connection_id, None)
+            await evict_connector(connection_id)
+            return
+
+        self._test_connector_ids[connection_id] = None
+        self._test_connector_ids.move_to_end(connection_id)
+        while len(self._test_connector_ids) > TEST_CONNECTOR_LIMIT:
+            oldest, _ = self._test_connector_ids.popitem(last=False)
+            await evict_connector(oldest)
+
+    def _rebuild_all(self) -> None:
+        """Rebuild the combined list returned by get_all_connections."""
+        # A new list rather than an in-place update, so lists already handed out don't change
+        self._all = self.predefined_connections + list(self.session_connections.values())
 
     def _load_predefined_connections(self) -> None:
         """Load predefined connections from YAML config file."""
@@ -173,13 +276,23 @@ class ConnectionService:
             logger.info(f"Attempting to load connections from: {config_file}")
 
             if os.path.exists(config_file):
+                stat = os.stat(config_file)
+                signature = (stat.st_mtime, stat.st_size)
+                cached = self._config_cache.get(config_file)
+                if cached is not None and cached[0] == signature:
+                    # The file hasn't changed since it was last parsed
+                    self.predefined_connections = list(cached[1])
+                    self._by_id.update((conn.id, conn) for conn in cached[1])
+                    return
+
                 with open(config_file, "r") as f:
-                    config_data = yaml.safe_load(f)
+                    config_data = yaml.load(f, Loader=_YAML_LOADER)
 
                 logger.info(f"Loaded YAML: {config_data}")
 
                 # Process connections from the YAML
                 if config_data and "connections" in config_data:
+                    loaded_at = datetime.now()
                     for i, conn_data in enumerate(config_data["connections"]):
                         # Generate a stable ID for each predefined connection
                         conn_id = f"predef_{i}_{conn_data['type']}"
@@ -196,16 +309,21 @@ class ConnectionService:
                             name=conn_data["name"],
                             type=conn_data["type"],
                             config=ConnectionConfig(**processed_config),
-                            created_at=datetime.now(),
-                            updated_at=datetime.now(),
+                            created_at=loaded_at,
+                            updated_at=loaded_at,
                         )
 
                         self.predefined_connections.append(connection)
+                        self._by_id[connection.id] = connection
 
                     logger.info(
                         f"Loaded {len(self.predefined_connections)} "
                         f"predefined connections from config"
                     )
+                    self._config_cache[config_file] = (
+                        signature,
+                        list(self.predefined_connections),
+                    )
                 else:
                     logger.warning(
                         "Invalid config format: 'connections' key missing or config is empty"
@@ -241,19 +359,8 @@ class ConnectionService:
 
         for key, value in config.items():
             if isinstance(value, str):
-                # Check if the value contains an environment variable reference
-                matches = re.findall(r"\${(FACET_[A-Z0-9_]+)}", value)
-                if matches:
-                    # Process all env var references in the string
-                    new_value = value
-                    for env_var in matches:
-                        env_value = os.environ.get(env_var, "")
-                        if not env_value:
-                            logger.warning(f"Environment variable {env_var} not found or empty")
-                        new_value = new_value.replace(f"${{{env_var}}}", env_value)
-                    processed_config[key] = new_value
-                else:
-                    processed_config[key] = value
+                # Substitute all env var references in the string in one pass
+                processed_config[key] = _ENV_VAR_RE.sub(_env_value, value)
             else:
                 # Non-string values are passed through unchanged
                 processed_config[key] = value
@@ -0,0 +1,5 @@
+"""Exceptions raised by the service layer."""
+
+
+class NotFoundError(Exception):
+    """Raised when a requested resource does not exist."""
@@ -1,22 +1,42 @@
 """Service for managing explorations and their metadata."""
 
-import json
+import asyncio
 import logging
 import os
-from typing import List, Optional
+from datetime import datetime
+from typing import Dict, List, Optional
 
-from models.explorations import Exploration
+from pydantic import TypeAdapter
+
+from models.explorations import Exploration, ExplorationUpdate
+from services.exceptions import NotFoundError
 
 logger = logging.getLogger(__name__)
 
+# Reads and writes a JSON array of explorations directly as bytes, without an intermediate dict pass
+_EXPLORATIONS_ADAPTER = TypeAdapter(List[Exploration])
+
+# Seconds changes wait before being written, so a burst of edits is saved once
+SAVE_DELAY = 0.2
+
 
 class ExplorationService:
     """Service for managing saved explorations."""
 
     def __init__(self):
         """Initialize the exploration service."""
-        # In-memory storage for explorations (would be replaced with a database in production)
-        self.explorations = []
+        # In-memory storage for explorations by ID, in creation order
+        # (would be replaced with a database in production)
+        self.explorations: Dict[str, Exploration] = {}
+
+        # Serializes file writes so they land in the order the changes were made
+        self._save_lock = asyncio.Lock()
+
+        # Set when explorations changed since the last write started
+        self._dirty = False
+
+        # Pending delayed write, if any
+        self._save_task: Optional["asyncio.Task[None]"] = None
 
         # Try to load explorations from file (for development/testing)
         self._load_explorations()
@@ -27,7 +47,7 @@ class ExplorationService:
         Returns:
             List of explorations
         """
-        return self.explorations
+        return list(self.explorations.values())
 
     async def get_exploration(self, exploration_id: str) -> Optional[Exploration]:
         """Get an exploration by ID.
@@ -38,11 +58,7 @@ class ExplorationService:
         Returns:
             Exploration or None if not found
         """
-        for exploration in self.explorations:
-            if exploration.id == exploration_id:
-                return exploration
-
-        return None
+        return self.explorations.get(exploration_id)
 
     async def create_exploration(self, exploration: Exploration) -> Exploration:
         """Create a new exploration.
@@ -53,31 +69,69 @@ class ExplorationService:
         Returns:
             The created exploration
         """
-        # Add to explorations list
-        self.explorations.append(exploration)
+        # Add to explorations
+        self.explorations[exploration.id] = exploration
 
         # Save explorations to file (for development/testing)
-        self._save_explorations()
+        self._schedule_save()
 
         return exploration
 
-    async def update_exploration(self, exploration: Exploration) -> Exploration:
+    async def update_exploration(
+        self, exploration_id: str, exploration_update: ExplorationUpdate
+    ) -> Exploration:
         """Update an existing exploration.
 
+        Fields not set in the update keep their existing values.
+
         Args:
-            exploration: The exploration to update
+            exploration_id: The ID of the exploration to update
+            exploration_update: The fields to change
 
         Returns:
             The updated exploration
+
+        Raises:
+            NotFoundError: If no exploration has the given ID
         """
-        # Find and update the exploration
-        for i, existing_exploration in enumerate(self.explorations):
-            if existing_exploration.id == exploration.id:
-                self.explorations[i] = exploration
-                break
+        existing_exploration = self.explorations.get(exploration_id)
+        if existing_exploration is None:
+            raise NotFoundError(f"Exploration with ID {exploration_id} not found")
+
+        # model_copy skips re-validating fields that are already validated
+        changes = exploration_update.model_dump(exclude_none=True)
+        exploration = existing_exploration.model_copy(
+            update={**changes, "updated_at": datetime.now()}
+        )
+        self.explorations[exploration_id] = exploration
 
         # Save explorations to file (for development/testing)
-        self._save_explorations()
+        self._schedule_save()
+
+        return exploration
+
+    async def record_run(self, exploration_id: str) -> Optional[Exploration]:
+        """Set an exploration's last run timestamp to now.
+
+        Runs after the response has been sent, so a missing exploration is logged
+        rather than raised.
+
+        Args:
+            exploration_id: The ID of the exploration that was run
+
+        Returns:
+            The updated exploration or None if not found
+        """
+        existing_exploration = self.explorations.get(exploration_id)
+        if existing_exploration is None:
+            logger.warning(f"Cannot record run for missing exploration: {exploration_id}")
+            return None
+
+        exploration = existing_exploration.model_copy(update={"last_run": datetime.now()})
+        self.explorations[exploration_id] = exploration
+
+        # Save explorations to file (for development/testing)
+        self._schedule_save()
 
         return exploration
 
@@ -86,34 +140,72 @@ class ExplorationService:
 
         Args:
             exploration_id: The exploration ID to delete
+
+        Raises:
+            NotFoundError: If no exploration has the given ID
         """
-        # Find and remove the exploration
-        self.explorations = [exp for exp in self.explorations if exp.id != exploration_id]
+        if self.explorations.pop(exploration_id, None) is None:
+            raise NotFoundError(f"Exploration with ID {exploration_id} not found")
 
         # Save explorations to file (for development/testing)
-        self._save_explorations()
+        self._schedule_save()
 
     def _load_explorations(self) -> None:
         """Load explorations from file for development/testing."""
         try:
             # Check if explorations file exists
             if os.path.exists("explorations.json"):
-                with open("explorations.json", "r") as f:
-                    explorations_data = json.load(f)
-
-                # Convert to Exploration objects
-                self.explorations = [Exploration(**exp) for exp in explorations_data]
+                with open("explorations.json", "rb") as f:
+                    explorations = _EXPLORATIONS_ADAPTER.validate_json(f.read())
+                self.explorations = {exploration.id: exploration for exploration in explorations}
         except Exception as e:
             logger.error(f"Error loading explorations: {str(e)}")
 
-    def _save_explorations(self) -> None:
-        """Save explorations to file for development/testing."""
+    def _schedule_save(self) -> None:
+        """Write the explorations after SAVE_DELAY, once for all changes made until then."""
+        self._dirty = True
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.get_running_loop().create_task(self._save_later())
+
+    async def _save_later(self) -> None:
+        """Write pending changes after SAVE_DELAY, repeating while changes keep arriving."""
+        while self._dirty:
+            await asyncio.sleep(SAVE_DELAY)
+            await self.flush()
+
+    async def close(self) -> None:
+        """Wait for the pending delayed write, then write any changes it didn't include."""
+        if self._save_task is not None:
+            # Cancelling would not stop a write already running in a thread, and shutdown
+            # could finish before it replaced the file; waiting costs at most SAVE_DELAY
+            await self._save_task
+            self._save_task = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        """Write pending changes now, without blocking the event loop."""
+        async with self._save_lock:
+            if not self._dirty:
+                # A write that queued before us already included every change
+                return
+            self._dirty = False
+            # Explorations are replaced rather than mutated, so a shallow copy is a stable snapshot
+            snapshot = list(self.explorations.values())
+            await asyncio.to_thread(self._save_explorations, snapshot)
+
+    def _save_explorations(self, explorations: List[Exploration]) -> None:
+        """Save explorations to file for development/testing.
+
+        Args:
+            explorations: The explorations to write
+        """
         try:
-            # Convert Exploration objects to dictionaries
-            explorations_data = [exp.dict() for exp in self.explorations]
+            # Values JSON can't represent are written as strings, as json.dump(default=str) did
+            data = _EXPLORATIONS_ADAPTER.dump_json(explorations, indent=2, fallback=str)
 
-            # Save to file
-            with open("explorations.json", "w") as f:
-                json.dump(explorations_data, f, default=str, indent=2)
+            # Write to a temporary file and swap it in, so readers never see a partial file
+            with open("explorations.json.tmp", "wb") as f:
+                f.write(data)
+            os.replace("explorations.json.tmp", "explorations.json")
         except Exception as e:
             logger.error(f"Error saving explorations: {str(e)}")
@@ -1,10 +1,19 @@
 """Service for managing database metadata."""
 
+import asyncio
+import glob
+import hashlib
 import logging
+import os
+import random
+import stat
+import time
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
 
-from connectors.connector_factory import DatabaseConnectorFactory
+from pydantic import TypeAdapter
+
+from connectors.registry import get_connector
 from models.connection import Connection
 from models.metadata import (
     ColumnMetadata,
@@ -15,6 +24,143 @@ from models.metadata import (
 
 logger = logging.getLogger(__name__)
 
+# Seconds cached metadata is served before it is read from the connector again
+METADATA_CACHE_TTL = 60
+
+# Fraction the TTL is randomly stretched or shrunk by, so connections don't all expire together
+METADATA_CACHE_JITTER = 0.05
+
+# Directory metadata is shared through, so other workers and restarts skip the connector.
+# It must belong to the user the app runs as and be private to it, or it is not used.
+METADATA_SHARED_DIR = os.environ.get(
+    "METADATA_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache", "metadata"),
+)
+
+# Seconds metadata in the shared directory is reused before it is read from the connector again
+METADATA_SHARED_TTL = 3600
+
+# Table fields users can edit; edits are re-applied each time metadata is refreshed
+_TABLE_EDIT_FIELDS = {"displayName", "description", "category", "explorable"}
+
+MetadataSnapshot = Tuple[List[TableMetadata], List[ColumnMetadata], List[RelationshipMetadata]]
+
+# Edited field values by table name, for one connection
+TableEdits = Dict[str, Dict[str, Any]]
+
+_SNAPSHOT_ADAPTER = TypeAdapter(MetadataSnapshot)
+_EDITS_ADAPTER = TypeAdapter(TableEdits)
+
+
+def _digest(value: str) -> str:
+    """Return a short hex digest of value that is safe to use in a file name."""
+    return hashlib.blake2b(value.encode(), digest_size=8).hexdigest()
+
+
+def _shared_path(connection: Connection) -> str:
+    """Return the shared cache file for a connection.
+
+    The file name covers the connection's settings as well as its ID, so an updated
+    connection never reads metadata from the database it used to point at.
+    """
+    settings = _digest(connection.type + connection.config.model_dump_json())
+    return os.path.join(METADATA_SHARED_DIR, f"{_digest(connection.id)}-{settings}.json")
+
+
+def _edits_path(connection_id: str) -> str:
+    """Return the shared file holding a connection's table edits.
+
+    Its name doesn't match the metadata files, so expiring those keeps the edits.
+    """
+    return os.path.join(METADATA_SHARED_DIR, f"{_digest(connection_id)}.edits.json")
+
+
+def _check_shared_dir() -> None:
+    """Make sure the shared directory is a real directory that only the app's user can use.
+
+    Raises:
+        FileNotFoundError: If the directory does not exist
+        PermissionError: If it is not a directory or belongs to another user
+    """
+    info = os.lstat(METADATA_SHARED_DIR)
+    if not stat.S_ISDIR(info.st_mode):
+        raise PermissionError(f"{METADATA_SHARED_DIR} is not a directory")
+    if hasattr(os, "getuid"):
+        if info.st_uid != os.getuid():
+            raise PermissionError(f"{METADATA_SHARED_DIR} belongs to another user")
+        if info.st_mode & 0o077:
+            os.chmod(METADATA_SHARED_DIR, 0o700)
+
+
+def _read_shared(connection: Connection) -> Optional[MetadataSnapshot]:
+    """Read a connection's metadata from the shared cache, if it is there and not too old."""
+    path = _shared_path(connection)
+    try:
+        _check_shared_dir()
+        if time.time() - os.stat(path).st_mtime >= METADATA_SHARED_TTL:
+            return None
+        with open(path, "rb") as f:
+            return _SNAPSHOT_ADAPTER.validate_json(f.read())
+    except FileNotFoundError:
+        return None
+
+
+def _replace_shared(path: str, content: bytes) -> None:
+    """Write a file in the shared directory, replacing any existing one atomically."""
+    os.makedirs(METADATA_SHARED_DIR, mode=0o700, exist_ok=True)
+    _check_shared_dir()
+    # A per-process temporary name keeps workers writing at once from clobbering each other
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _write_shared(connection: Connection, snapshot: MetadataSnapshot) -> None:
+    """Write a connection's metadata to the shared cache, replacing the file atomically."""
+    # By alias, so fields like TableMetadata.schema_name validate again on load
+    _replace_shared(_shared_path(connection), _SNAPSHOT_ADAPTER.dump_json(snapshot, by_alias=True))
+
+
+def _read_edits(connection_id: str) -> Optional[TableEdits]:
+    """Read a connection's table edits from the shared directory, if any were saved."""
+    try:
+        _check_shared_dir()
+        with open(_edits_path(connection_id), "rb") as f:
+            return _EDITS_ADAPTER.validate_json(f.read())
+    except FileNotFoundError:
+        return None
+
+
+def _merge_edits(connection_id: str, table_id: str, edits: Dict[str, Any]) -> TableEdits:
+    """Add one table's edits to the connection's shared edits and return all of them.
+
+    Edits saved by other workers are read first, so each worker's edits are kept.
+    """
+    merged = _read_edits(connection_id) or {}
+    merged.setdefault(table_id, {}).update(edits)
+    _replace_shared(_edits_path(connection_id), _EDITS_ADAPTER.dump_json(merged))
+    return merged
+
+
+def _remove_shared(connection_id: str, edits: bool = False) -> None:
+    """Remove every shared cache file written for a connection ID, logging rather than raising.
+
+    Args:
+        connection_id: The connection ID
+        edits: Remove the connection's saved table edits as well
+    """
+    paths = glob.glob(os.path.join(METADATA_SHARED_DIR, f"{_digest(connection_id)}-*.json"))
+    if edits:
+        paths.append(_edits_path(connection_id))
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Error removing shared metadata {path}: {str(e)}")
+
 
 class MetadataService:
     """Service for managing database metadata."""
@@ -24,12 +170,30 @@ class MetadataService:
         # In-memory storage for metadata (would be replaced with a database in production)
         self.metadata = {}
 
+        # Monotonic time each connection's metadata expires
+        self._expires_at: Dict[str, float] = {}
+
+        # One lock per connection so concurrent cache misses trigger a single refresh
+        self._refresh_locks: Dict[str, asyncio.Lock] = {}
+
+        # Connections whose next refresh should bypass the connector's own metadata cache
+        self._force_refresh: Set[str] = set()
+
+        # User edits by connection id, kept apart so refreshes don't drop them. They are saved
+        # to the shared directory and re-read on each refresh, so every worker applies them.
+        self._table_edits: Dict[str, TableEdits] = {}
+
+        # Latest pending removal of shared metadata by connection id; each removal waits for the
+        # one before it, and the next write waits for the latest
+        self._removals: Dict[str, "asyncio.Task[None]"] = {}
+
     async def _get_metadata(self, connection: Connection, metadata_type: str):
         """Get metadata, refreshing from the database if not cached.
 
         Args:
             connection: The database connection
-            metadata_type: Type of metadata to retrieve ("tables", "columns", or "relationships")
+            metadata_type: Type of metadata to retrieve ("tables", "columns", "relationships",
+                or one of the "tables_by_name" / "columns_by_table" indexes)
 
         Returns:
             The requested metadata
@@ -40,21 +204,185 @@ class MetadataService:
         connection_id = connection.id
 
         # Check if we have cached metadata
-        if connection_id in self.metadata and metadata_type in self.metadata[connection_id]:
-            return self.metadata[connection_id][metadata_type]
-
-        # Extract metadata from database
-        await self.refresh_metadata(connection)
+        bucket = self.metadata.get(connection_id)
+        if (
+            bucket is not None
+            and (value := bucket.get(metadata_type)) is not None
+            and time.monotonic() < self._expires_at.get(connection_id, 0.0)
+        ):
+            return value
+
+        # Extract metadata from database, unless a concurrent request already did
+        lock = self._refresh_locks.setdefault(connection_id, asyncio.Lock())
+        async with lock:
+            if not self._is_fresh(connection_id, metadata_type):
+                force = connection_id in self._force_refresh
+                if force or not await self._load_shared(connection):
+                    await self.refresh_metadata(connection, force=force)
 
         # Get refreshed metadata
-        if connection_id in self.metadata and metadata_type in self.metadata[connection_id]:
-            return self.metadata[connection_id][metadata_type]
+        bucket = self.metadata.get(connection_id)
+        if bucket is not None and (value := bucket.get(metadata_type)) is not None:
+            return value
 
         # If we still don't have metadata, something went wrong
         raise ValueError(
             f"Failed to retrieve {metadata_type} metadata for connection {connection_id}"
         )
 
+    def _is_fresh(self, connection_id: str, metadata_type: str) -> bool:
+        """Check whether cached metadata exists and has not expired."""
+        if metadata_type not in self.metadata.get(connection_id, {}):
+            return False
+        return time.monotonic() < self._expires_at.get(connection_id, 0.0)
+
+    async def _load_shared(self, connection: Connection) -> bool:
+        """Load a connection's metadata from the shared cache written by another worker.
+
+        Args:
+            connection: The database connection
+
+        Returns:
+            Whether metadata was found and loaded
+        """
+        try:
+            snapshot = await asyncio.to_thread(_read_shared, connection)
+        except Exception as e:
+            logger.warning(f"Error reading shared metadata for {connection.id}: {str(e)}")
+            return False
+
+        if snapshot is None:
+            return False
+        await self._load_edits(connection.id)
+        self._store(connection.id, *snapshot)
+        return True
+
+    async def _load_edits(self, connection_id: str) -> None:
+        """Pick up table edits saved by any worker, keeping this worker's if none are saved."""
+        try:
+            edits = await asyncio.to_thread(_read_edits, connection_id)
+        except Exception as e:
+            logger.warning(f"Error reading table edits for {connection_id}: {str(e)}")
+            return
+        if edits is not None:
+            self._table_edits[connection_id] = edits
+
+    def _store(
+        self,
+        connection_id: str,
+        tables: List[TableMetadata],
+        columns: List[ColumnMetadata],
+        relationships: List[RelationshipMetadata],
+    ) -> None:
+        """Cache a connection's metadata, with per-table indexes, until it expires."""
+        # Index tables and columns by table name so per-table lookups skip the full lists
+        tables_by_name = {table.name: table for table in tables}
+        for table_name, edits in self._table_edits.get(connection_id, {}).items():
+            table = tables_by_name.get(table_name)
+            if table is not None:
+                for field, value in edits.items():
+                    setattr(table, field, value)
+
+        columns_by_table: Dict[str, List[ColumnMetadata]] = {}
+        for column in columns:
+            columns_by_table.setdefault(column.tableName, []).append(column)
+
+        self.metadata[connection_id] = {
+            "tables": tables,
+            "columns": columns,
+            "relationships": relationships,
+            "tables_by_name": tables_by_name,
+            "columns_by_table": columns_by_table,
+        }
+        jitter = random.uniform(1 - METADATA_CACHE_JITTER, 1 + METADATA_CACHE_JITTER)
+        self._expires_at[connection_id] = time.monotonic() + METADATA_CACHE_TTL * jitter
+
+    def expire(self, connection_id: str, deleted: bool = False) -> None:
+        """Mark a connection's metadata stale so the next read re-reads the database.
+
+        Cached metadata is kept for update_table_metadata, but reads wait for the refresh,
+        which also bypasses any metadata the connector has cached.
+
+        Args:
+            connection_id: The connection ID
+            deleted: The connection was deleted, so drop its metadata, edits and locks too
+        """
+        self._expires_at.pop(connection_id, None)
+        if deleted:
+            self.metadata.pop(connection_id, None)
+            self._table_edits.pop(connection_id, None)
+            self._force_refresh.discard(connection_id)
+            lock = self._refresh_locks.get(connection_id)
+            if lock is not None and not lock.locked():
+                del self._refresh_locks[connection_id]
+        else:
+            self._force_refresh.add(connection_id)
+
+        # Keep other workers from reloading the stale metadata before the refresh lands.
+        # The files are removed in a thread so the event loop doesn't wait on the disk.
+        removal = asyncio.get_running_loop().create_task(
+            self._remove_shared_files(connection_id, self._removals.get(connection_id), deleted)
+        )
+        self._removals[connection_id] = removal
+        removal.add_done_callback(lambda task: self._removal_done(connection_id, task))
+
+    async def _remove_shared_files(
+        self, connection_id: str, previous: Optional["asyncio.Task[None]"], edits: bool
+    ) -> None:
+        """Remove a connection's shared files once any earlier removal has finished.
+
+        Args:
+            connection_id: The connection ID
+            previous: The connection's earlier removal, if still pending
+            edits: Remove the connection's saved table edits as well
+        """
+        if previous is not None:
+            await previous
+        try:
+            await asyncio.to_thread(_remove_shared, connection_id, edits)
+        except Exception as e:
+            logger.warning(f"Error removing shared metadata for {connection_id}: {str(e)}")
+
+    def _removal_done(self, connection_id: str, task: "asyncio.Task[None]") -> None:
+        """Forget a finished removal unless a later one has replaced it."""
+        if self._removals.get(connection_id) is task:
+            del self._removals[connection_id]
+
+    async def _share(self, connection: Connection) -> None:
+        """Write a connection's cached metadata to the shared cache, logging rather than raising.
+
+        Args:
+            connection: The database connection
+        """
+        connection_id = connection.id
+        removal = self._removals.get(connection_id)
+        if removal is not None:
+            # Let an earlier expire() finish removing the old files before the new one lands
+            await removal
+
+        bucket = self.metadata.get(connection_id)
+        if bucket is None:
+            return
+        snapshot = (bucket["tables"], bucket["columns"], bucket["relationships"])
+        try:
+            await asyncio.to_thread(_write_shared, connection, snapshot)
+        except Exception as e:
+            logger.warning(f"Error sharing metadata for {connection_id}: {str(e)}")
+
+    async def warm_metadata(self, connection: Connection) -> None:
+        """Refresh a connection's metadata if it is stale, logging rather than raising errors.
+
+        Meant to run as a background task; a failed refresh leaves the metadata stale, so
+        the next read tries again and reports the error.
+
+        Args:
+            connection: The database connection
+        """
+        try:
+            await self._get_metadata(connection, "tables")
+        except Exception as e:
+            logger.error(f"Error warming metadata for connection {connection.id}: {str(e)}")
+
     async def get_tables(self, connection: Connection) -> List[TableMetadata]:
         """
         Get tables for a connection.
@@ -65,11 +393,7 @@ class MetadataService:
         Returns:
             List of tables
         """
-        try:
-            return await self._get_metadata(connection, "tables")
-        except Exception as e:
-            logger.error(f"Error getting tables: {str(e)}")
-            raise
+        return await self._get_metadata(connection, "tables")
 
     async def get_table(self, connection: Connection, table_id: str) -> Optional[TableMetadata]:
         """
@@ -83,15 +407,8 @@ class MetadataService:
             Table metadata or None if not found
         """
         try:
-            # Get all tables
-            tables = await self.get_tables(connection)
-
-            # Find table by ID/name
-            for table in tables:
-                if table.name == table_id:
-                    return table
-
-            return None
+            tables_by_name = await self._get_metadata(connection, "tables_by_name")
+            return tables_by_name.get(table_id)
 
         except Exception as e:
             logger.error(f"Error getting table {table_id}: {str(e)}")
@@ -109,10 +426,8 @@ class MetadataService:
             List of columns
         """
         try:
-            columns = await self._get_metadata(connection, "columns")
-
-            # Filter columns for the specified table
-            return [column for column in columns if column.tableName == table_id]
+            columns_by_table = await self._get_metadata(connection, "columns_by_table")
+            return list(columns_by_table.get(table_id, []))
 
         except Exception as e:
             logger.error(f"Error getting columns for table {table_id}: {str(e)}")
@@ -128,11 +443,7 @@ class MetadataService:
         Returns:
             List of relationships
         """
-        try:
-            return await self._get_metadata(connection, "relationships")
-        except Exception as e:
-            logger.error(f"Error getting relationships: {str(e)}")
-            raise
+        return await self._get_metadata(connection, "relationships")
 
     async def update_table_metadata(
         self, connection: Connection, table_id: str, metadata_update: MetadataUpdateRequest
@@ -154,27 +465,26 @@ class MetadataService:
             if not table:
                 return None
 
-            # Update fields
-            if metadata_update.displayName is not None:
-                table.displayName = metadata_update.displayName
+            # Update fields in place; the tables list and tables_by_name share this object
+            edits = metadata_update.model_dump(include=_TABLE_EDIT_FIELDS, exclude_none=True)
+            for field, value in edits.items():
+                setattr(table, field, value)
 
-            if metadata_update.description is not None:
-                table.description = metadata_update.description
+            # Remember the edits so they are applied again to refreshed metadata
+            table_edits = self._table_edits.setdefault(connection.id, {})
+            table_edits.setdefault(table_id, {}).update(edits)
 
-            if metadata_update.category is not None:
-                table.category = metadata_update.category
+            # Save them with other workers' edits, so any worker's refresh re-applies them all.
+            # If that fails they still apply on this worker.
+            try:
+                self._table_edits[connection.id] = await asyncio.to_thread(
+                    _merge_edits, connection.id, table_id, edits
+                )
+            except Exception as e:
+                logger.warning(f"Error saving table edits for {connection.id}: {str(e)}")
 
-            if metadata_update.explorable is not None:
-                table.explorable = metadata_update.explorable
-
-            # Save metadata
-            connection_id = connection.id
-            if connection_id in self.metadata and "tables" in self.metadata[connection_id]:
-                # Find and update the table
-                for i, existing_table in enumerate(self.metadata[connection_id]["tables"]):
-                    if existing_table.name == table_id:
-                        self.metadata[connection_id]["tables"][i] = table
-                        break
+            # Other workers load edited metadata from the shared cache too
+            await self._share(connection)
 
             return table
 
@@ -182,37 +492,39 @@ class MetadataService:
             logger.error(f"Error updating table metadata for {table_id}: {str(e)}")
             raise
 
-    async def refresh_metadata(self, connection: Connection) -> None:
+    async def refresh_metadata(self, connection: Connection, force: bool = False) -> None:
         """
         Refresh metadata for a connection.
 
         Args:
             connection: The database connection
+            force: Bypass any metadata the connector has cached; implied after expire()
         """
         try:
-            # Create connector for the database
-            connector = await DatabaseConnectorFactory.create_connector(connection)
-            if not connector:
-                raise ValueError(f"Unsupported database type: {connection.type}")
+            connection_id = connection.id
+            force = force or connection_id in self._force_refresh
+            connector = await get_connector(connection)
+            if force:
+                connector.invalidate_metadata()
+
+            # Extract metadata from database
+            tables, columns, relationships = await connector.get_metadata()
+
+            # Copy the tables so edits never reach objects the connector has cached, and
+            # keep the time a connector that caches metadata actually read it
+            refreshed_at = datetime.now()
+            tables = [table.model_copy() for table in tables]
+            for table in tables:
+                if table.refreshedAt is None:
+                    table.refreshedAt = refreshed_at
 
-            try:
-                # Extract metadata from database
-                tables, columns, relationships = await connector.get_metadata()
-
-                # Update tables with refreshed timestamp
-                for table in tables:
-                    table.refreshedAt = datetime.now()
-
-                # Store metadata
-                connection_id = connection.id
-                self.metadata[connection_id] = {
-                    "tables": tables,
-                    "columns": columns,
-                    "relationships": relationships,
-                }
-            finally:
-                # Ensure connector is properly closed
-                await connector.close()
+            # Store metadata, with edits saved by any worker applied
+            await self._load_edits(connection_id)
+            self._store(connection_id, tables, columns, relationships)
+            if force:
+                self._force_refresh.discard(connection_id)
+
+            await self._share(connection)
 
         except Exception as e:
             logger.error(f"Error refreshing metadata: {str(e)}")
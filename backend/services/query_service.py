@@ -1,10 +1,20 @@
 """Service for handling database queries."""
 
+import asyncio
+import contextlib
+import hashlib
 import logging
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple, Union
 
-from connectors.connector_factory import DatabaseConnectorFactory
+import orjson
+
+from connectors.base_connector import DatabaseConnector
+from connectors.registry import get_connector
 from models.connection import Connection
 from models.query import (
+    ColumnarQueryResult,
     QueryModel,
     QueryResult,
 )
@@ -12,35 +22,300 @@ from services.query_translator import SQLTranslator
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of export chunks buffered ahead of the client
+EXPORT_QUEUE_SIZE = 16
+
+# Maximum number of rendered SQL statements kept in memory
+SQL_CACHE_SIZE = 2048
+
+# Seconds a query result is reused, unless the connection sets query_cache_ttl
+QUERY_CACHE_TTL = 60
+
+# Maximum number of query results kept in memory
+QUERY_CACHE_SIZE = 4096
+
+# Queries run at once on one connection, unless the connection sets max_concurrent_queries
+MAX_CONCURRENT_QUERIES = 8
+
+# Seconds a query waits for one of its connection's slots before failing
+QUERY_SLOT_TIMEOUT = 30
+
+QueryOutcome = Union[QueryResult, ColumnarQueryResult]
+
+# Query results keyed by (connection ID, columnar, digest of the connection version and SQL),
+# least recently used first
+_result_cache: "OrderedDict[Tuple[str, bool, bytes], Tuple[float, QueryOutcome]]" = OrderedDict()
+
+# Runs in progress, so concurrent identical queries wait for the same result
+_in_flight: "Dict[Tuple[str, bool, bytes], asyncio.Future[QueryOutcome]]" = {}
+
+# Total row counts keyed by (connection ID, digest of the connection version and count SQL),
+# least recently used first. Pages of one query share a count, so paging skips the COUNT.
+_count_cache: "OrderedDict[Tuple[str, bytes], Tuple[float, Optional[int]]]" = OrderedDict()
+
+# Per-connection query slots, with the limit each semaphore was created for
+_query_slots: Dict[str, Tuple[int, asyncio.Semaphore]] = {}
+
+# Rendered SQL keyed by (dialect, statement kind, query model digest), least recently used first
+_sql_cache: "OrderedDict[Tuple[str, str, bytes], str]" = OrderedDict()
+
+
+def _render_sql(dialect: str, kind: str, query_model: QueryModel, render: Callable[[], str]) -> str:
+    """Return the SQL for a query model, calling render only if it isn't cached.
+
+    Translation depends only on the dialect and the query model, so repeated runs
+    of the same query (saved explorations, polling dashboards) skip the translator.
+
+    Args:
+        dialect: The SQL dialect the statement is rendered for
+        kind: Which statement is rendered from the model ("select" or "count")
+        query_model: The query model being rendered
+        render: Renders the SQL on a cache miss
+
+    Returns:
+        The SQL statement
+    """
+    digest = hashlib.blake2b(query_model.model_dump_json().encode(), digest_size=16).digest()
+    key = (dialect, kind, digest)
+
+    sql = _sql_cache.get(key)
+    if sql is not None:
+        _sql_cache.move_to_end(key)
+        return sql
+
+    sql = render()
+    _sql_cache[key] = sql
+    if len(_sql_cache) > SQL_CACHE_SIZE:
+        _sql_cache.popitem(last=False)
+    return sql
+
+
+@contextlib.asynccontextmanager
+async def _query_slot(connection: Connection) -> AsyncIterator[None]:
+    """Hold one of a connection's query slots while the block runs.
+
+    Bounds how many queries run at once on one database, so a burst of requests queues
+    here instead of exhausting the driver's pool or the executor threads behind it.
+
+    Args:
+        connection: The connection the query runs on
+
+    Raises:
+        TimeoutError: If no slot frees up within QUERY_SLOT_TIMEOUT seconds
+    """
+    limit = getattr(connection.config, "max_concurrent_queries", None)
+    limit = MAX_CONCURRENT_QUERIES if limit is None else int(limit)
+    entry = _query_slots.get(connection.id)
+    if entry is None or entry[0] != limit:
+        entry = (limit, asyncio.Semaphore(limit))
+        _query_slots[connection.id] = entry
+    semaphore = entry[1]
+
+    try:
+        await asyncio.wait_for(semaphore.acquire(), QUERY_SLOT_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise TimeoutError(
+            f"Connection {connection.id} is busy: no query slot freed up "
+            f"within {QUERY_SLOT_TIMEOUT} seconds"
+        ) from None
+    try:
+        yield
+    finally:
+        semaphore.release()
+
+
+def _cache_ttl(connection: Connection) -> float:
+    """Return how many seconds results for a connection are reused; 0 or less disables reuse."""
+    ttl = getattr(connection.config, "query_cache_ttl", None)
+    return QUERY_CACHE_TTL if ttl is None else float(ttl)
+
+
+def _statement_digest(connection: Connection, *statements: str) -> bytes:
+    """Digest SQL statements together with the connection's version.
+
+    The connection's updated_at changes whenever its config is edited, so results
+    cached under the old config stop matching.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (connection.updated_at.isoformat(), *statements):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.digest()
+
+
+def _result_key(
+    connection: Connection, sql: str, count_query: Optional[str], columnar: bool
+) -> Tuple[str, bool, bytes]:
+    """Return the _result_cache key for a query's statements."""
+    return (connection.id, columnar, _statement_digest(connection, sql, count_query or ""))
+
+
+def _recent_result(connection: Connection, key: Tuple[str, bool, bytes]) -> Optional[QueryOutcome]:
+    """Return the cached result for key, marked as a cache hit, or None if missing or expired."""
+    cached = _result_cache.get(key)
+    if cached is None or time.monotonic() - cached[0] >= _cache_ttl(connection):
+        return None
+    _result_cache.move_to_end(key)
+    return cached[1].model_copy(update={"cacheHit": True})
+
+
+async def _cached_count(
+    connection: Connection,
+    count_query: str,
+    run: Callable[[], Awaitable[Optional[int]]],
+    refresh: bool = False,
+) -> Optional[int]:
+    """Return a recent total row count for a count query, or run it and cache the count.
+
+    Counts are kept as long as query results are (see _cached_result).
+
+    Args:
+        connection: The connection the count query runs on
+        count_query: The count query
+        run: Runs the count query on a cache miss
+        refresh: Run the count query even if a recent count is cached
+
+    Returns:
+        The total row count, or None if the query returned no rows
+    """
+    ttl = _cache_ttl(connection)
+    if ttl <= 0:
+        return await run()
+
+    key = (connection.id, _statement_digest(connection, count_query))
+    cached = None if refresh else _count_cache.get(key)
+    if cached is not None and time.monotonic() - cached[0] < ttl:
+        _count_cache.move_to_end(key)
+        return cached[1]
+
+    count = await run()
+    _count_cache[key] = (time.monotonic(), count)
+    _count_cache.move_to_end(key)
+    if len(_count_cache) > QUERY_CACHE_SIZE:
+        _count_cache.popitem(last=False)
+    return count
+
+
+async def _cached_result(
+    connection: Connection,
+    sql: str,
+    count_query: Optional[str],
+    columnar: bool,
+    run: Callable[[], Awaitable[QueryOutcome]],
+    refresh: bool = False,
+) -> QueryOutcome:
+    """Return a recent result for the same statements, or run them and cache the result.
+
+    Concurrent calls for the same statements share a single run. Results are kept for
+    the connection's query_cache_ttl config setting, or QUERY_CACHE_TTL seconds if it
+    isn't set; a TTL of 0 disables caching for the connection. Errors are never cached.
+
+    Args:
+        connection: The connection the statements run on
+        sql: The query to execute
+        count_query: The count query for server-side pagination, if any
+        columnar: Whether the result is columnar
+        run: Runs the statements on a cache miss
+        refresh: Run the statements even if a recent result is cached; a run already in
+            flight is still shared
+
+    Returns:
+        The query result, with cacheHit set if it was served from the cache
+    """
+    if _cache_ttl(connection) <= 0:
+        return await run()
+
+    key = _result_key(connection, sql, count_query, columnar)
+
+    cached = None if refresh else _recent_result(connection, key)
+    if cached is not None:
+        return cached
+
+    in_flight = _in_flight.get(key)
+    if in_flight is not None:
+        return await asyncio.shield(in_flight)
+
+    task = asyncio.ensure_future(run())
+    _in_flight[key] = task
+    try:
+        result = await asyncio.shield(task)
+    finally:
+        _in_flight.pop(key, None)
+
+    _result_cache[key] = (time.monotonic(), result)
+    _result_cache.move_to_end(key)
+    if len(_result_cache) > QUERY_CACHE_SIZE:
+        _result_cache.popitem(last=False)
+    return result
+
+
+def _trim_probe_row(result: QueryOutcome, limit: int, offset: int) -> QueryOutcome:
+    """Drop the extra row fetched past a page and report whether a next page exists.
+
+    Args:
+        result: Result of the query run with limit + 1
+        limit: The page size the caller asked for
+        offset: The page offset
+
+    Returns:
+        The result trimmed to limit rows, with hasMore and a lower-bound totalCount set
+    """
+    if result.error is not None:
+        return result
+
+    has_more = result.rowCount > limit
+    if isinstance(result, ColumnarQueryResult):
+        data = {name: values[:limit] for name, values in result.data.items()}
+    else:
+        data = result.data[:limit]
+    row_count = min(result.rowCount, limit)
+    return result.model_copy(
+        update={
+            "data": data,
+            "rowCount": row_count,
+            "hasMore": has_more,
+            "totalCount": offset + row_count + (1 if has_more else 0),
+        }
+    )
+
 
 class QueryService:
     """Service for handling queries."""
 
     def __init__(self):
         """Initialize the query service."""
-        pass
+        # Translators hold no per-query state, so one per dialect is shared by all queries
+        self._translators: Dict[str, SQLTranslator] = {}
+
+    def _translator(self, dialect: str) -> SQLTranslator:
+        """Get the shared translator for a dialect, creating it on first use."""
+        translator = self._translators.get(dialect)
+        if translator is None:
+            translator = self._translators[dialect] = SQLTranslator(dialect)
+        return translator
 
-    async def execute_query(self, connection: Connection, query_model: QueryModel) -> QueryResult:
+    async def execute_query(
+        self,
+        connection: Connection,
+        query_model: QueryModel,
+        columnar: bool = False,
+        refresh: bool = False,
+    ) -> Union[QueryResult, ColumnarQueryResult]:
         """Execute a query.
 
         Args:
             connection: The database connection
             query_model: The query model to execute
+            columnar: Return data as one list of values per column instead of one dict per row
+            refresh: Run the query even if a recent result is cached
 
         Returns:
-            Query result
+            Query result, or a columnar query result if columnar is set
         """
-        connector = None
         try:
-            connector = await DatabaseConnectorFactory.create_connector(connection)
-            if not connector:
-                raise ValueError(f"Unsupported database type: {connection.type}")
-
-            await connector.connect()
-            translator = SQLTranslator(connector.get_dialect())
-
-            # Initialize pagination-related values
-            totalCount = None
+            connector = await get_connector(connection)
+            dialect = connector.get_dialect()
+            translator = self._translator(dialect)
 
             # Execute the main query with pagination
             # Log all key query model properties for debugging
@@ -60,39 +335,39 @@ class QueryService:
                 if query_model.offset is None:
                     raise ValueError("Server-side pagination requires an offset value")
 
-            if is_server_side_pagination_enabled:
-                # Create a count query version (without pagination)
-                count_query_model = QueryModel(**query_model.dict())
-                count_query_model.isServerPagination = False  # Only modify the copy for count query
-                count_query_model.limit = None  # Only modify the copy for count query
-                count_query_model.offset = None  # Only modify the copy for count query
-
-                # Get total count for the query
-                count_query = translator.translate_count(count_query_model)
-                logger.info(f"Executing count SQL: {count_query}")
-                count_result, _, _ = await connector.execute_query(count_query)
-                logger.info(f"count_result: {count_result}")
-                if count_result and len(count_result) > 0:
-                    first_row = count_result[0]
-                    # try both lowercase and uppercase
-                    # Snowflake seems to return uppercase
-                    totalCount = first_row["count"] if "count" in first_row else first_row["COUNT"]
-
-            sql = translator.translate(query_model)
-            logger.info(f"Executing SQL: {sql}")
-
-            results, columns, execution_time = await connector.execute_query(sql)
-
-            result = QueryResult(
-                columns=columns,
-                data=results,
-                rowCount=len(results),
-                totalCount=totalCount,
-                executionTime=execution_time,
-                sql=sql,
-                warnings=[],
+            count_query = None
+            probe_limit = None
+            if is_server_side_pagination_enabled and not query_model.needsExactTotal:
+                # Fetch one row past the page instead of counting: the extra row tells
+                # whether a next page exists without a second statement
+                probe_limit = query_model.limit
+                query_model = query_model.model_copy(update={"limit": probe_limit + 1})
+            elif is_server_side_pagination_enabled:
+                # Create a count query version (without pagination). model_copy skips the
+                # dump and re-validation a full rebuild would do, and every page of a query
+                # shares the copy's cache entry.
+                count_query_model = query_model.model_copy(
+                    update={"isServerPagination": False, "limit": None, "offset": None}
+                )
+                count_query = _render_sql(
+                    dialect,
+                    "count",
+                    count_query_model,
+                    lambda: translator.translate_count(count_query_model),
+                )
+
+            sql = _render_sql(
+                dialect, "select", query_model, lambda: translator.translate(query_model)
             )
 
+            async def run() -> QueryOutcome:
+                return await self._run_query(
+                    connection, connector, sql, count_query, columnar, refresh
+                )
+
+            result = await _cached_result(connection, sql, count_query, columnar, run, refresh)
+            if probe_limit is not None:
+                result = _trim_probe_row(result, probe_limit, query_model.offset)
             return result
 
         except Exception as e:
@@ -102,15 +377,235 @@ class QueryService:
             logger.error(f"Error executing query: {str(e)}\nTraceback: {error_traceback}")
 
             # Return error result
+            if columnar:
+                return ColumnarQueryResult(
+                    columns=[],
+                    data={},
+                    rowCount=0,
+                    executionTime=0,
+                    sql=sql if "sql" in locals() else "",
+                    error=str(e),
+                )
             return QueryResult(
                 columns=[],
                 data=[],
                 rowCount=0,
                 executionTime=0,
                 sql=sql if "sql" in locals() else "",
-                cacheHit=False,
                 error=str(e),
             )
-        finally:
-            if connector:
-                await connector.close()
+
+    async def _run_query(
+        self,
+        connection: Connection,
+        connector: DatabaseConnector,
+        sql: str,
+        count_query: Optional[str],
+        columnar: bool,
+        refresh: bool = False,
+    ) -> Union[QueryResult, ColumnarQueryResult]:
+        """Run a translated query, and its count query if given, against the database.
+
+        The two statements are independent, so they run concurrently on separate pooled
+        connections and the result waits only for the slower one. Each statement holds
+        one of the connection's query slots while it runs.
+
+        Args:
+            connection: The connection the statements run on
+            connector: The connector to run the statements on
+            sql: The query to execute
+            count_query: Query returning the total row count, for server-side pagination
+            columnar: Return data as one list of values per column instead of one dict per row
+            refresh: Run the count query even if a recent count is cached
+
+        Returns:
+            Query result, or a columnar query result if columnar is set
+        """
+        logger.info(f"Executing SQL: {sql}")
+        execute = connector.execute_query_columnar if columnar else connector.execute_query
+
+        async def run_data():
+            async with _query_slot(connection):
+                return await execute(sql)
+
+        async def run_count():
+            async with _query_slot(connection):
+                return await self._run_count(connector, count_query)
+
+        # Initialize pagination-related values
+        totalCount = None
+
+        if count_query is not None:
+            # Pages of the same query share a count, so only the first page runs it
+            totalCount, (data, columns, execution_time) = await asyncio.gather(
+                _cached_count(connection, count_query, run_count, refresh), run_data()
+            )
+        else:
+            data, columns, execution_time = await run_data()
+
+        if columnar:
+            return ColumnarQueryResult(
+                columns=columns,
+                data=data,
+                rowCount=len(next(iter(data.values()), [])),
+                totalCount=totalCount,
+                executionTime=execution_time,
+                sql=sql,
+                warnings=[],
+            )
+
+        result = QueryResult(
+            columns=columns,
+            data=data,
+            rowCount=len(data),
+            totalCount=totalCount,
+            executionTime=execution_time,
+            sql=sql,
+            warnings=[],
+        )
+
+        return result
+
+    async def _run_count(self, connector: DatabaseConnector, count_query: str) -> Optional[int]:
+        """Run a count query and return its total row count.
+
+        Args:
+            connector: The connector to run the count query on
+            count_query: Query returning the total row count
+
+        Returns:
+            The total row count, or None if the query returned no rows
+        """
+        logger.info(f"Executing count SQL: {count_query}")
+        count_result, _, _ = await connector.execute_query(count_query)
+        logger.info(f"count_result: {count_result}")
+        if count_result and len(count_result) > 0:
+            first_row = count_result[0]
+            # try both lowercase and uppercase
+            # Snowflake seems to return uppercase
+            return first_row["count"] if "count" in first_row else first_row["COUNT"]
+        return None
+
+    async def export_query(
+        self, connection: Connection, query_model: QueryModel, format: str = "binary"
+    ) -> AsyncIterator[bytes]:
+        """Export the full result of a query as a stream of COPY output chunks.
+
+        The connector is connected and the SQL translated before this returns, so
+        setup errors are raised here rather than in the middle of the stream.
+
+        Args:
+            connection: The database connection
+            query_model: The query model to export
+            format: Export format ("binary" or "csv")
+
+        Returns:
+            Async iterator over the exported bytes
+        """
+        connector = await get_connector(connection)
+        if not connector.supports_export:
+            raise NotImplementedError(f"Export is not supported for {connection.type}")
+
+        dialect = connector.get_dialect()
+        sql = _render_sql(
+            dialect, "select", query_model, lambda: self._translator(dialect).translate(query_model)
+        )
+
+        logger.info("Exporting SQL as %s: %s", format, sql)
+
+        async def stream() -> AsyncIterator[bytes]:
+            queue: "asyncio.Queue[Optional[bytes]]" = asyncio.Queue(maxsize=EXPORT_QUEUE_SIZE)
+
+            async def copy() -> None:
+                try:
+                    await connector.execute_query_copy(sql, None, queue.put, format=format)
+                finally:
+                    # If the reader has gone nothing drains the queue, so never wait on it here;
+                    # a reader still draining a full queue stops once the task is done
+                    with contextlib.suppress(asyncio.QueueFull):
+                        queue.put_nowait(None)
+
+            task = asyncio.create_task(copy())
+            try:
+                while not (queue.empty() and task.done()):
+                    chunk = await queue.get()
+                    if chunk is None:
+                        break
+                    yield chunk
+                # Re-raise any error from the COPY once the buffered output is drained
+                await task
+            finally:
+                # Stop the COPY and wait for it, so its connection goes back to the pool
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+        return stream()
+
+    async def stream_query(
+        self, connection: Connection, query_model: QueryModel, refresh: bool = False
+    ) -> AsyncIterator[bytes]:
+        """Stream the result of a query as newline-delimited JSON, one object per row.
+
+        Rows are read in batches where the connector supports it, so the full result
+        is never held in memory. The first row is fetched before this returns, so
+        connection and SQL errors are raised here rather than in the middle of the stream.
+        Connectors without batched reads run the whole query at that point. One of the
+        connection's query slots is held from then until the stream is exhausted or
+        closed, so the returned iterator must be consumed or closed. A recent
+        execute_query result for the same SQL is replayed instead of reading the rows again.
+
+        Args:
+            connection: The database connection
+            query_model: The query model to execute
+            refresh: Read the rows from the database even if a recent result is cached
+
+        Returns:
+            Async iterator over the JSON lines
+        """
+        connector = await get_connector(connection)
+        dialect = connector.get_dialect()
+        sql = _render_sql(
+            dialect, "select", query_model, lambda: self._translator(dialect).translate(query_model)
+        )
+
+        cached = None
+        if not refresh:
+            cached = _recent_result(connection, _result_key(connection, sql, None, False))
+        if cached is not None:
+            logger.info("Streaming cached result for SQL: %s", sql)
+
+            async def replay() -> AsyncIterator[bytes]:
+                for row in cached.data:
+                    yield orjson.dumps(row, default=str, option=orjson.OPT_APPEND_NEWLINE)
+
+            return replay()
+
+        logger.info("Streaming SQL: %s", sql)
+
+        slot = contextlib.AsyncExitStack()
+        await slot.enter_async_context(_query_slot(connection))
+        rows = connector.execute_with_streaming_json(sql)
+        try:
+            first: Optional[bytes] = await rows.__anext__()
+        except StopAsyncIteration:
+            first = None
+        except BaseException:
+            await slot.aclose()
+            raise
+
+        async def stream() -> AsyncIterator[bytes]:
+            try:
+                if first is None:
+                    return
+                yield first
+                async for row in rows:
+                    yield row
+            finally:
+                # Release the connector's cursor if the client goes away mid-stream,
+                # then the query slot
+                try:
+                    await rows.aclose()
+                finally:
+                    await slot.aclose()
+
+        return stream()
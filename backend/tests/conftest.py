@@ -1,8 +1,13 @@
+"""Shared fixtures and helpers for the test suite."""
+
 import asyncio
 from asyncio import Future
 
 import pytest
 
+from connectors import registry
+from services import metadata_service, query_service
+
 
 # Make tests run with pytest-asyncio
 @pytest.fixture
@@ -13,6 +18,36 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(autouse=True)
+def clear_connector_registry():
+    """Start each test without connectors cached by earlier tests."""
+    registry._connectors.clear()
+    registry._locks.clear()
+    yield
+    registry._connectors.clear()
+    registry._locks.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_query_caches():
+    """Start each test without SQL, results, counts or query slots left by earlier tests."""
+    query_service._sql_cache.clear()
+    query_service._result_cache.clear()
+    query_service._query_slots.clear()
+    query_service._count_cache.clear()
+    yield
+    query_service._sql_cache.clear()
+    query_service._result_cache.clear()
+    query_service._query_slots.clear()
+    query_service._count_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def isolate_shared_metadata(tmp_path, monkeypatch):
+    """Give each test its own shared metadata directory."""
+    monkeypatch.setattr(metadata_service, "METADATA_SHARED_DIR", str(tmp_path / "metadata"))
+
+
 # Helper for working with async tests
 def async_return(result):
     """Create a future that returns the given result."""
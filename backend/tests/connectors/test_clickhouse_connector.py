@@ -0,0 +1,99 @@
+"""Tests for the ClickHouse connector."""
+
+from datetime import datetime
+
+import pytest
+
+from connectors.clickhouse_connector import ClickHouseConnector, _apply_params
+from models.connection import Connection, ConnectionConfig
+from models.metadata import ColumnMetadata, TableMetadata
+
+
+class FakeClient:
+    """Minimal stand-in for aiochclient.ChClient returning canned rows."""
+
+    def __init__(self, tables, columns):
+        """Store the rows returned for system.tables and system.columns."""
+        self.tables = tables
+        self.columns = columns
+        self.queries = []
+
+    async def fetch(self, query, params=None):
+        """Return canned rows based on the system table being queried."""
+        self.queries.append(query)
+        if "system.tables" in query:
+            return self.tables
+        if "system.columns" in query:
+            return self.columns
+        raise AssertionError(f"Unexpected query: {query}")
+
+    async def fetchone(self, query, params=None):
+        """Return a canned server version."""
+        self.queries.append(query)
+        return {"version": "24.3.1"}
+
+
+@pytest.fixture
+def connection():
+    """Create a test connection."""
+    return Connection(
+        id="test-conn-id",
+        name="Test ClickHouse Connection",
+        type="clickhouse",
+        config=ConnectionConfig(host="localhost", port=8123, database="facet", https=False),
+        created_at=datetime.now(),
+        updated_at=datetime.now(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_metadata(connection):
+    """Test that metadata matches what validated models would produce."""
+    connector = ClickHouseConnector(connection)
+    connector.client = FakeClient(
+        tables=[{"name": "events"}],
+        columns=[
+            {"table": "events", "name": "id", "type": "UInt64", "is_in_primary_key": 1},
+            {"table": "events", "name": "ts", "type": "DateTime", "is_in_primary_key": 0},
+        ],
+    )
+
+    tables, columns, relationships = await connector.get_metadata()
+
+    assert len(connector.client.queries) == 2
+    assert (
+        tables[0].model_dump()
+        == TableMetadata(
+            name="events", schema="facet", type="table", rowCount=0, explorable=True
+        ).model_dump()
+    )
+    assert [column.model_dump() for column in columns] == [
+        ColumnMetadata(
+            name="id", tableName="events", dataType="integer", primaryKey=True
+        ).model_dump(),
+        ColumnMetadata(name="ts", tableName="events", dataType="timestamp").model_dump(),
+    ]
+    assert relationships == []
+
+
+@pytest.mark.asyncio
+async def test_test_connection_uses_pooled_client(connection):
+    """Test that a connection test runs on the connector's client instead of a new session."""
+    connector = ClickHouseConnector(connection)
+    connector.client = FakeClient(tables=[], columns=[])
+
+    success, message = await connector.test_connection()
+
+    assert success is True
+    assert "24.3.1" in message
+    assert connector.client.queries == ["SELECT version() as version"]
+
+
+def test_apply_params_escapes_values():
+    """Test that placeholders are replaced with escaped literals."""
+    sql = _apply_params(
+        "SELECT * FROM t WHERE a = {a} AND b = {b} AND c = {c} AND d = {d}",
+        {"a": "o'brien", "b": 3, "c": None},
+    )
+
+    assert sql == "SELECT * FROM t WHERE a = 'o\\'brien' AND b = 3 AND c = NULL AND d = {d}"
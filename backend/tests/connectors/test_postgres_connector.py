@@ -1,11 +1,19 @@
 """Unit tests for the PostgreSQL connector implementation."""
 
+import asyncio
+import json
 from datetime import datetime
+from decimal import Decimal
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from connectors.postgres_connector import PostgresConnector
+from connectors.postgres_connector import (
+    PostgresConnector,
+    _normalize_pg_type,
+    _positional,
+    _setup_codecs,
+)
 from models.connection import Connection, ConnectionConfig
 from tests.conftest import async_return
 
@@ -28,7 +36,9 @@ def mock_connection():
 @pytest.fixture
 def postgres_connector(mock_connection):
     """Fixture that creates a PostgresConnector instance with the mock connection."""
-    return PostgresConnector(mock_connection)
+    connector = PostgresConnector(mock_connection)
+    connector.invalidate_metadata()
+    return connector
 
 
 class TestPostgresConnector:
@@ -58,6 +68,22 @@ class TestPostgresConnector:
         # Verify pool was set
         assert postgres_connector.pool == mock_pool
 
+    @pytest.mark.asyncio
+    @patch("asyncpg.create_pool")
+    async def test_concurrent_connects_open_pools_once(self, mock_create_pool, postgres_connector):
+        """Test that callers connecting at the same time share one pair of pools."""
+
+        async def create_pool(**kwargs):
+            # Yield so the other callers arrive while the pools are being opened
+            await asyncio.sleep(0)
+            return MagicMock()
+
+        mock_create_pool.side_effect = create_pool
+
+        await asyncio.gather(*(postgres_connector.connect() for _ in range(3)))
+
+        assert mock_create_pool.call_count == 2
+
     @pytest.mark.asyncio
     @patch("asyncpg.connect")
     async def test_test_connection(self, mock_connect, postgres_connector):
@@ -156,22 +182,13 @@ class TestPostgresConnector:
             }
         ]
 
-        # Set up mock responses for the three queries
-        fetch_responses = [
-            async_return(mock_table_records),
-            async_return(mock_column_records),
-            async_return(mock_relationship_records),
-        ]
-        # Create a fetch method that returns different values on each call
-        fetch_calls = 0
-
-        async def mock_fetch(*args, **kwargs):
-            nonlocal fetch_calls
-            result = fetch_responses[fetch_calls]
-            fetch_calls += 1
-            return await result
-
-        mock_conn.fetch = MagicMock(side_effect=mock_fetch)
+        # The catalog query returns all three lists as one JSON document
+        catalog = {
+            "tables": mock_table_records,
+            "columns": mock_column_records,
+            "relationships": mock_relationship_records,
+        }
+        mock_conn.fetchval = MagicMock(return_value=async_return(json.dumps(catalog)))
 
         # Configure the pool to return the mock connection in context manager
         mock_context_manager = MagicMock()
@@ -190,6 +207,8 @@ class TestPostgresConnector:
         # Verify table content
         assert tables[0].name == "users"
         assert tables[0].description == "User table"
+        # The read time is recorded, since the cached result may be served later
+        assert tables[0].refreshedAt is not None
 
         # Verify column content
         assert columns[0].name == "id"
@@ -201,6 +220,61 @@ class TestPostgresConnector:
         assert relationships[0].sourceTable == "posts"
         assert relationships[0].targetTable == "users"
 
+    @pytest.mark.asyncio
+    async def test_get_metadata_uses_cache(self, postgres_connector):
+        """Test that metadata is reused until it is invalidated."""
+        postgres_connector.pool = MagicMock()
+        calls = 0
+
+        async def mock_fetch_catalog():
+            nonlocal calls
+            calls += 1
+            return {"tables": [], "columns": [], "relationships": []}
+
+        postgres_connector._fetch_catalog = mock_fetch_catalog
+
+        await postgres_connector.get_metadata()
+        await postgres_connector.get_metadata()
+        assert calls == 1
+
+        postgres_connector.invalidate_metadata()
+        await postgres_connector.get_metadata()
+        assert calls == 2
+
+    @pytest.mark.asyncio
+    async def test_metadata_cache_is_keyed_by_config(self, postgres_connector, mock_connection):
+        """Test that a connection pointed at another database does not reuse the old catalog."""
+        postgres_connector.pool = MagicMock()
+        postgres_connector._fetch_catalog = lambda: async_return(
+            {
+                "tables": [
+                    {
+                        "name": "old",
+                        "schema": "public",
+                        "description": None,
+                        "type": "table",
+                        "row_count": 0,
+                    }
+                ],
+                "columns": [],
+                "relationships": [],
+            }
+        )
+        await postgres_connector.get_metadata()
+
+        moved = mock_connection.model_copy(
+            update={"config": mock_connection.config.model_copy(update={"database": "other"})}
+        )
+        connector = PostgresConnector(moved)
+        connector.pool = MagicMock()
+        connector._fetch_catalog = lambda: async_return(
+            {"tables": [], "columns": [], "relationships": []}
+        )
+        tables, _, _ = await connector.get_metadata()
+        connector.invalidate_metadata()
+
+        assert tables == []
+
     @pytest.mark.asyncio
     async def test_execute_query(self, postgres_connector):
         """Test the execute_query method runs SQL queries correctly."""
@@ -233,3 +307,148 @@ class TestPostgresConnector:
         finally:
             # Restore original method
             postgres_connector.execute_query = original_execute
+
+    @pytest.mark.asyncio
+    async def test_execute_query_reads_columns_from_statement(self, postgres_connector):
+        """Test that result columns follow the statement, so a changed table is picked up."""
+        id_attr = MagicMock()
+        id_attr.name = "id"
+        id_attr.type.name = "int4"
+        email_attr = MagicMock()
+        email_attr.name = "email"
+        email_attr.type.name = "text"
+
+        # The table gains a column between the two runs of the same SQL
+        mock_statement = MagicMock()
+        mock_statement.fetch = MagicMock(
+            side_effect=[async_return([(1,)]), async_return([(1, "a@example.com")])]
+        )
+        mock_statement.get_attributes = MagicMock(side_effect=[(id_attr,), (id_attr, email_attr)])
+
+        mock_conn = MagicMock()
+        mock_conn.prepare = MagicMock(side_effect=lambda sql: async_return(mock_statement))
+
+        mock_context_manager = MagicMock()
+        mock_context_manager.__aenter__ = MagicMock(return_value=async_return(mock_conn))
+        mock_context_manager.__aexit__ = MagicMock(return_value=async_return(None))
+        postgres_connector.pool = MagicMock()
+        postgres_connector.pool.acquire = MagicMock(return_value=mock_context_manager)
+
+        results, columns, _ = await postgres_connector.execute_query("SELECT * FROM users")
+        assert results == [{"id": 1}]
+        assert [(column.name, column.type) for column in columns] == [("id", "int4")]
+
+        results, columns, _ = await postgres_connector.execute_query("SELECT * FROM users")
+        assert results == [{"id": 1, "email": "a@example.com"}]
+        assert [column.name for column in columns] == ["id", "email"]
+
+    @pytest.mark.asyncio
+    async def test_execute_query_columnar(self, postgres_connector):
+        """Test that columnar results hold one list of values per column."""
+        id_attr = MagicMock()
+        id_attr.name = "id"
+        id_attr.type.name = "int4"
+        name_attr = MagicMock()
+        name_attr.name = "name"
+        name_attr.type.name = "text"
+
+        mock_statement = MagicMock()
+        mock_statement.fetch = MagicMock(return_value=async_return([(1, "a"), (2, "b")]))
+        mock_statement.get_attributes = MagicMock(return_value=(id_attr, name_attr))
+
+        mock_conn = MagicMock()
+        mock_conn.prepare = MagicMock(return_value=async_return(mock_statement))
+
+        mock_context_manager = MagicMock()
+        mock_context_manager.__aenter__ = MagicMock(return_value=async_return(mock_conn))
+        mock_context_manager.__aexit__ = MagicMock(return_value=async_return(None))
+        postgres_connector.pool = MagicMock()
+        postgres_connector.pool.acquire = MagicMock(return_value=mock_context_manager)
+
+        data, columns, _ = await postgres_connector.execute_query_columnar("SELECT id, name FROM t")
+
+        assert data == {"id": [1, 2], "name": ["a", "b"]}
+        assert [column.name for column in columns] == ["id", "name"]
+
+    @pytest.mark.asyncio
+    async def test_execute_with_streaming(self, postgres_connector):
+        """Test that streaming reads the cursor in batches until it is exhausted."""
+        batches = [[{"id": 1}, {"id": 2}], [{"id": 3}], []]
+        mock_cursor = MagicMock()
+        mock_cursor.fetch = MagicMock(side_effect=lambda n: async_return(batches.pop(0)))
+
+        mock_statement = MagicMock()
+        mock_statement.cursor = MagicMock(return_value=async_return(mock_cursor))
+
+        mock_transaction = MagicMock()
+        mock_transaction.__aenter__ = MagicMock(return_value=async_return(None))
+        mock_transaction.__aexit__ = MagicMock(return_value=async_return(None))
+
+        mock_conn = MagicMock()
+        mock_conn.prepare = MagicMock(return_value=async_return(mock_statement))
+        mock_conn.transaction = MagicMock(return_value=mock_transaction)
+
+        mock_context_manager = MagicMock()
+        mock_context_manager.__aenter__ = MagicMock(return_value=async_return(mock_conn))
+        mock_context_manager.__aexit__ = MagicMock(return_value=async_return(None))
+        postgres_connector.pool = MagicMock()
+        postgres_connector.long_pool = MagicMock()
+        postgres_connector.long_pool.acquire = MagicMock(return_value=mock_context_manager)
+
+        rows = [
+            row
+            async for row in postgres_connector.execute_with_streaming(
+                "SELECT id FROM users", batch_size=2
+            )
+        ]
+
+        assert rows == [{"id": 1}, {"id": 2}, {"id": 3}]
+        mock_cursor.fetch.assert_called_with(2)
+
+    @pytest.mark.asyncio
+    async def test_execute_with_streaming_json(self, postgres_connector):
+        """Test that streamed rows are serialized as newline-delimited JSON."""
+
+        async def mock_stream(*args, **kwargs):
+            yield {"id": 1, "amount": Decimal("1.50")}
+            yield {"id": 2, "amount": None}
+
+        postgres_connector.execute_with_streaming = mock_stream
+
+        chunks = [
+            chunk async for chunk in postgres_connector.execute_with_streaming_json("SELECT 1")
+        ]
+
+        assert chunks == [b'{"id":1,"amount":"1.50"}\n', b'{"id":2,"amount":null}\n']
+
+
+def test_normalize_pg_type():
+    """Test that PostgreSQL type names map to normalized types."""
+    assert _normalize_pg_type("character varying") == "string"
+    assert _normalize_pg_type("timestamp with time zone") == "timestamp"
+    assert _normalize_pg_type("jsonb") == "json"
+    assert _normalize_pg_type("integer[]") == "array"
+    assert _normalize_pg_type("text[]") == "array"
+    assert _normalize_pg_type("uuid") == "uuid"
+
+
+def test_positional_params():
+    """Test that sequences pass through and mappings bind their values in order."""
+    assert _positional(None) == ()
+    params = [1, "a"]
+    assert _positional(params) is params
+    assert _positional({"b": 1, "a": 2}) == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_setup_codecs():
+    """Test that json and jsonb are decoded with orjson."""
+    mock_conn = MagicMock()
+    mock_conn.set_type_codec = MagicMock(side_effect=lambda *args, **kwargs: async_return(None))
+
+    await _setup_codecs(mock_conn)
+
+    assert [call.args[0] for call in mock_conn.set_type_codec.call_args_list] == ["json", "jsonb"]
+    codec = mock_conn.set_type_codec.call_args.kwargs
+    assert codec["decoder"]('{"a": [1, 2]}') == {"a": [1, 2]}
+    assert codec["encoder"]({"a": [1, 2]}) == '{"a":[1,2]}'
@@ -0,0 +1,130 @@
+"""Unit tests for the shared connector registry."""
+
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from connectors import registry
+from connectors.registry import (
+    close_all_connectors,
+    evict_connector,
+    get_connector,
+    warm_connectors,
+)
+from models.connection import Connection, ConnectionConfig
+
+
+def make_connection(database="test", connection_id="conn1"):
+    """Create a connection, with a fresh timestamp as ConnectionService would."""
+    return Connection(
+        id=connection_id,
+        name="Test PostgreSQL",
+        type="postgres",
+        config=ConnectionConfig(host="localhost", port=5432, database=database),
+        created_at=datetime.now(),
+        updated_at=datetime.now(),
+    )
+
+
+def make_connector(connection):
+    """Create a mock connector for a connection."""
+    connector = MagicMock()
+    connector.connection = connection
+    connector.connect = AsyncMock()
+    connector.close = AsyncMock()
+    return connector
+
+
+@pytest.mark.asyncio
+@patch("connectors.connector_factory.DatabaseConnectorFactory.create_connector")
+async def test_get_connector_reuses_connector(mock_create_connector):
+    """Test that the same connection config gets the same connector."""
+    mock_create_connector.side_effect = make_connector
+
+    first = await get_connector(make_connection())
+    second = await get_connector(make_connection())
+
+    assert first is second
+    assert mock_create_connector.call_count == 1
+    assert first.connect.await_count == 2
+
+
+@pytest.mark.asyncio
+@patch("connectors.connector_factory.DatabaseConnectorFactory.create_connector")
+async def test_get_connector_replaces_changed_config(mock_create_connector):
+    """Test that a config change closes the old connector and creates a new one."""
+    mock_create_connector.side_effect = make_connector
+
+    first = await get_connector(make_connection())
+    second = await get_connector(make_connection(database="other"))
+
+    assert first is not second
+    first.close.assert_awaited_once()
+
+    await evict_connector("conn1")
+    second.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@patch("connectors.connector_factory.DatabaseConnectorFactory.create_connector")
+async def test_concurrent_config_change_creates_one_connector(mock_create_connector):
+    """Test that callers racing on a changed config share one new connector."""
+    mock_create_connector.side_effect = make_connector
+    old = await get_connector(make_connection())
+
+    async def slow_close():
+        # Yield, so the second caller runs while the first is evicting
+        await asyncio.sleep(0)
+
+    old.close.side_effect = slow_close
+
+    first, second = await asyncio.gather(
+        get_connector(make_connection(database="other")),
+        get_connector(make_connection(database="other")),
+    )
+
+    assert first is second is registry._connectors["conn1"]
+    assert mock_create_connector.call_count == 2
+    old.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@patch("connectors.connector_factory.DatabaseConnectorFactory.create_connector")
+async def test_evicting_connectors_drops_their_locks(mock_create_connector):
+    """Test that evicted connections don't leave their locks behind."""
+    mock_create_connector.side_effect = make_connector
+    await get_connector(make_connection())
+    await get_connector(make_connection(connection_id="conn2"))
+    await get_connector(make_connection(connection_id="conn3"))
+
+    await evict_connector("conn1")
+    assert set(registry._locks) == {"conn2", "conn3"}
+
+    await close_all_connectors()
+    assert registry._locks == {}
+    assert registry._connectors == {}
+
+
+@pytest.mark.asyncio
+@patch("connectors.connector_factory.DatabaseConnectorFactory.create_connector")
+async def test_warm_connectors_registers_connected_connectors(mock_create_connector):
+    """Test that warm-up connects every connection and tolerates failures."""
+
+    def create(connection):
+        connector = make_connector(connection)
+        if connection.id == "down":
+            connector.connect.side_effect = ConnectionError("refused")
+        return connector
+
+    mock_create_connector.side_effect = create
+
+    await warm_connectors([make_connection(), make_connection(connection_id="down")])
+
+    assert set(registry._connectors) == {"conn1", "down"}
+    registry._connectors["conn1"].connect.assert_awaited_once()
+
+    # A later request reuses the warmed connector
+    assert await get_connector(make_connection()) is registry._connectors["conn1"]
+    assert mock_create_connector.call_count == 2
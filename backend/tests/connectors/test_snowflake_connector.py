@@ -81,6 +81,7 @@ async def test_test_connection(connection):
     with patch("snowflake.connector.connect") as mock_connect:
         mock_cursor = MagicMock()
         mock_cursor.fetchone.return_value = ["Snowflake 5.0.0"]
+        mock_cursor.execute.return_value = mock_cursor
         mock_connect.return_value.cursor.return_value = mock_cursor
 
         connector = SnowflakeConnector(connection)
@@ -90,6 +91,11 @@ async def test_test_connection(connection):
         assert "Connection successful" in message
         assert "Snowflake 5.0.0" in message
 
+        # The tested client is kept for later queries instead of being closed
+        assert connector.client is mock_connect.return_value
+        await connector.test_connection()
+        mock_connect.assert_called_once()
+
 
 @pytest.mark.asyncio
 async def test_get_metadata(connection, mock_snowflake_client):
@@ -0,0 +1 @@
+"""Test package for API routers."""
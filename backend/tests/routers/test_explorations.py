@@ -0,0 +1,148 @@
+"""Unit tests for the exploration routes' result cache."""
+
+import time
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from models.connection import Connection, ConnectionConfig
+from models.explorations import Exploration
+from models.query import QueryResult
+from routers import explorations as explorations_module
+from routers.dependencies import get_connection_service, get_exploration_service, get_query_service
+
+
+@pytest.fixture(autouse=True)
+def clear_result_cache():
+    """Start each test without cached exploration results."""
+    explorations_module._result_cache.clear()
+    explorations_module._refreshing.clear()
+    yield
+    explorations_module._result_cache.clear()
+    explorations_module._refreshing.clear()
+
+
+@pytest.fixture
+def query_service():
+    """Fixture for a query service whose results count the executions so far."""
+    service = MagicMock()
+    runs = []
+
+    async def execute_query(connection, query_model, refresh=False):
+        runs.append(refresh)
+        return QueryResult(
+            columns=[{"name": "id", "type": "integer"}],
+            data=[{"id": len(runs)}],
+            rowCount=1,
+            executionTime=0.1,
+            sql="SELECT id FROM events",
+        )
+
+    service.execute_query = AsyncMock(side_effect=execute_query)
+    service.runs = runs
+    return service
+
+
+@pytest.fixture
+def client(query_service):
+    """Fixture for a client of an app serving only the exploration routes."""
+    exploration = Exploration(
+        id="exp1",
+        name="Events",
+        query={"source": {"connectionId": "conn1", "table": "events"}},
+        created_at=datetime(2024, 1, 1),
+        updated_at=datetime(2024, 1, 1),
+    )
+    connection = Connection(
+        id="conn1",
+        name="Test Connection",
+        type="postgres",
+        config=ConnectionConfig(
+            host="localhost", port=5432, database="test", user="user", password="password"
+        ),
+        created_at=datetime(2024, 1, 1),
+        updated_at=datetime(2024, 1, 1),
+    )
+    exploration_service = MagicMock()
+    exploration_service.get_exploration = AsyncMock(return_value=exploration)
+    exploration_service.record_run = AsyncMock()
+    connection_service = MagicMock()
+    connection_service.get_connection = AsyncMock(return_value=connection)
+
+    app = FastAPI()
+    app.include_router(explorations_module.router, prefix="/api/v1/explorations")
+    app.dependency_overrides[get_exploration_service] = lambda: exploration_service
+    app.dependency_overrides[get_connection_service] = lambda: connection_service
+    app.dependency_overrides[get_query_service] = lambda: query_service
+    return TestClient(app)
+
+
+def _age_cached_result(exploration_id, seconds):
+    """Make the cached result for an exploration look the given number of seconds old."""
+    stored_at, digest, body = explorations_module._result_cache[exploration_id]
+    explorations_module._result_cache[exploration_id] = (time.monotonic() - seconds, digest, body)
+
+
+def _row_id(response):
+    """Return the id in the first row of an execute response."""
+    return response.json()["data"][0]["id"]
+
+
+class TestExecuteExplorationCache:
+    """Test suite for serving exploration results from the cache."""
+
+    def test_fresh_result_is_served_without_running_the_query(self, client, query_service):
+        """Test that a result younger than RESULT_FRESH_TTL is returned as-is."""
+        first = client.post("/api/v1/explorations/exp1/execute")
+        second = client.post("/api/v1/explorations/exp1/execute")
+
+        assert first.status_code == 200
+        assert not first.json()["cacheHit"]
+        assert second.json() == {**first.json(), "cacheHit": True}
+        assert query_service.runs == [False]
+
+    def test_stale_result_is_served_and_refreshed_once(self, client, query_service):
+        """Test that a stale result is returned while exactly one refresh runs behind it."""
+        first = client.post("/api/v1/explorations/exp1/execute")
+        _age_cached_result("exp1", explorations_module.RESULT_FRESH_TTL + 1)
+
+        # A refresh already in flight is not started again
+        explorations_module._refreshing.add("exp1")
+        stale = client.post("/api/v1/explorations/exp1/execute")
+        assert _row_id(stale) == _row_id(first)
+        assert query_service.runs == [False]
+
+        explorations_module._refreshing.clear()
+        stale = client.post("/api/v1/explorations/exp1/execute")
+        assert _row_id(stale) == _row_id(first)
+        assert query_service.runs == [False, True]
+        assert "exp1" not in explorations_module._refreshing
+
+        # The refreshed result is fresh again, so it is served without another run
+        refreshed = client.post("/api/v1/explorations/exp1/execute")
+        assert _row_id(refreshed) == 2
+        assert query_service.runs == [False, True]
+
+    def test_expired_result_is_recomputed_before_responding(self, client, query_service):
+        """Test that a result older than RESULT_STALE_TTL is not served."""
+        client.post("/api/v1/explorations/exp1/execute")
+        _age_cached_result("exp1", explorations_module.RESULT_STALE_TTL)
+
+        response = client.post("/api/v1/explorations/exp1/execute")
+
+        assert _row_id(response) == 2
+        assert query_service.runs == [False, False]
+
+    def test_refresh_runs_the_query_again(self, client, query_service):
+        """Test that refresh=true skips a fresh cached result and replaces it."""
+        client.post("/api/v1/explorations/exp1/execute")
+
+        refreshed = client.post("/api/v1/explorations/exp1/execute", params={"refresh": True})
+        cached = client.post("/api/v1/explorations/exp1/execute")
+
+        assert not refreshed.json()["cacheHit"]
+        assert _row_id(refreshed) == _row_id(cached) == 2
+        assert query_service.runs == [False, True]
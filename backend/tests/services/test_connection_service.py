@@ -0,0 +1,136 @@
+"""Unit tests for the connection service implementation."""
+
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from connectors import registry
+from models.connection import Connection, ConnectionConfig, ConnectionUpdate
+from services import connection_service as connection_module
+from services.connection_service import ConnectionService
+from services.exceptions import NotFoundError
+
+
+@pytest.fixture
+def connection_service():
+    """Fixture that creates a connection service without predefined connections."""
+    with patch.object(ConnectionService, "_load_predefined_connections"):
+        yield ConnectionService()
+
+
+@pytest.fixture
+def session_connection():
+    """Fixture that creates a session connection."""
+    return Connection(
+        id="conn1",
+        name="Test Connection",
+        type="postgres",
+        config=ConnectionConfig(host="localhost", port=5432, database="test"),
+        created_at=datetime(2024, 1, 1),
+        updated_at=datetime(2024, 1, 1),
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_connection_follows_changes(connection_service, session_connection):
+    """Test that get_connection sees created, updated and deleted connections."""
+    await connection_service.create_connection(session_connection)
+    assert await connection_service.get_connection("conn1") is session_connection
+    assert await connection_service.get_all_connections() == [session_connection]
+
+    updated = await connection_service.update_connection(
+        "conn1",
+        ConnectionUpdate(name="Renamed", type="postgres", config=session_connection.config),
+    )
+    assert await connection_service.get_connection("conn1") is updated
+    assert await connection_service.get_all_connections() == [updated]
+    assert updated.created_at == session_connection.created_at
+
+    await connection_service.delete_connection("conn1")
+    assert await connection_service.get_connection("conn1") is None
+    assert await connection_service.get_all_connections() == []
+
+
+@pytest.mark.asyncio
+async def test_missing_connection_raises_not_found(connection_service, session_connection):
+    """Test that updating or deleting an unknown connection raises NotFoundError."""
+    with pytest.raises(NotFoundError):
+        await connection_service.update_connection(
+            "missing",
+            ConnectionUpdate(name="x", type="postgres", config=session_connection.config),
+        )
+    with pytest.raises(NotFoundError):
+        await connection_service.delete_connection("missing")
+
+
+@pytest.mark.asyncio
+async def test_predefined_connections_are_read_only(connection_service, session_connection):
+    """Test that updating or deleting a predefined connection leaves it in place."""
+    connection_service.predefined_connections = [session_connection]
+    connection_service._by_id["conn1"] = session_connection
+
+    result = await connection_service.update_connection(
+        "conn1", ConnectionUpdate(name="Renamed", type="postgres", config=session_connection.config)
+    )
+    await connection_service.delete_connection("conn1")
+
+    assert result is session_connection
+    assert await connection_service.get_connection("conn1") is session_connection
+
+
+def make_connector(connection):
+    """Create a mock connector whose connection test succeeds."""
+    connector = MagicMock()
+    connector.connection = connection
+    connector.connect = AsyncMock()
+    connector.close = AsyncMock()
+    connector.test_connection = AsyncMock(return_value=(True, "Connection successful"))
+    return connector
+
+
+@pytest.mark.asyncio
+@patch("connectors.connector_factory.DatabaseConnectorFactory.create_connector")
+async def test_test_connection_reuses_connectors(
+    mock_create_connector, connection_service, session_connection
+):
+    """Test that repeat tests of a config, or of a saved connection, reuse one connector."""
+    mock_create_connector.side_effect = make_connector
+    config = ConnectionConfig(host="localhost", port=5432, database="other")
+
+    first = await connection_service.test_connection("postgres", config)
+    second = await connection_service.test_connection("postgres", config)
+    assert first.success and second.success
+    assert mock_create_connector.call_count == 1
+
+    # A saved connection's settings are tested on its own pooled connector
+    await connection_service.create_connection(session_connection)
+    await connection_service.test_connection("postgres", session_connection.config)
+    assert mock_create_connector.call_args.args[0] is session_connection
+    assert set(registry._connectors) == {
+        "conn1",
+        next(iter(connection_service._test_connector_ids)),
+    }
+
+
+@pytest.mark.asyncio
+@patch("connectors.connector_factory.DatabaseConnectorFactory.create_connector")
+async def test_test_connection_times_out(mock_create_connector, connection_service):
+    """Test that a hanging connection test fails after the timeout and closes its connector."""
+    connector = make_connector(None)
+
+    async def hang():
+        await asyncio.sleep(60)
+
+    connector.test_connection.side_effect = hang
+    mock_create_connector.return_value = connector
+    config = ConnectionConfig(host="unreachable", port=5432, database="test")
+
+    with patch.object(connection_module, "CONNECTION_TEST_TIMEOUT", 0.01):
+        result = await connection_service.test_connection("postgres", config)
+
+    assert not result.success
+    assert "timed out" in result.message
+    connector.close.assert_awaited_once()
+    assert registry._connectors == {}
@@ -0,0 +1,141 @@
+"""Unit tests for the exploration service implementation."""
+
+import asyncio
+import threading
+import time
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from models.explorations import Exploration, ExplorationUpdate
+from services import exploration_service as exploration_module
+from services.exceptions import NotFoundError
+from services.exploration_service import ExplorationService
+
+
+@pytest.fixture
+async def exploration_service():
+    """Fixture that creates an exploration service holding one in-memory exploration."""
+    with (
+        patch.object(ExplorationService, "_load_explorations"),
+        patch.object(ExplorationService, "_save_explorations"),
+    ):
+        service = ExplorationService()
+        service.explorations = {
+            "exp1": Exploration(
+                id="exp1",
+                name="Events",
+                query={"source": {"connectionId": "conn1", "table": "events"}},
+                created_at=datetime(2024, 1, 1),
+                updated_at=datetime(2024, 1, 1),
+            )
+        }
+        yield service
+        await service.close()
+
+
+@pytest.mark.asyncio
+async def test_update_exploration_keeps_unset_fields(exploration_service):
+    """Test that update_exploration only changes the fields that were provided."""
+    result = await exploration_service.update_exploration("exp1", ExplorationUpdate(name="Renamed"))
+
+    assert result.name == "Renamed"
+    assert result.query == {"source": {"connectionId": "conn1", "table": "events"}}
+    assert result.updated_at > datetime(2024, 1, 1)
+    assert await exploration_service.get_all_explorations() == [result]
+
+
+@pytest.mark.asyncio
+async def test_update_exploration_not_found(exploration_service):
+    """Test that updating a missing exploration raises NotFoundError."""
+    with pytest.raises(NotFoundError):
+        await exploration_service.update_exploration("missing", ExplorationUpdate(name="x"))
+
+
+@pytest.mark.asyncio
+async def test_delete_exploration_not_found(exploration_service):
+    """Test that deleting a missing exploration raises NotFoundError and keeps the rest."""
+    with pytest.raises(NotFoundError):
+        await exploration_service.delete_exploration("missing")
+
+    assert len(exploration_service.explorations) == 1
+
+
+@pytest.mark.asyncio
+async def test_record_run(exploration_service):
+    """Test that record_run sets last_run without touching updated_at."""
+    result = await exploration_service.record_run("exp1")
+
+    assert result.last_run is not None
+    assert result.updated_at == datetime(2024, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_record_run_missing_exploration(exploration_service):
+    """Test that record_run returns None instead of raising for a missing exploration."""
+    assert await exploration_service.record_run("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_burst_of_changes_is_saved_once(exploration_service):
+    """Test that changes made within the save delay share one write."""
+    with patch.object(exploration_module, "SAVE_DELAY", 0.01):
+        for name in ("a", "b", "c"):
+            await exploration_service.update_exploration("exp1", ExplorationUpdate(name=name))
+        exploration_service._save_explorations.assert_not_called()
+
+        await asyncio.sleep(0.05)
+
+    saves = exploration_service._save_explorations.call_args_list
+    assert len(saves) == 1
+    assert saves[0].args[0][0].name == "c"
+
+
+@pytest.mark.asyncio
+async def test_close_writes_pending_changes(exploration_service):
+    """Test that close() writes changes still waiting for the save delay."""
+    await exploration_service.update_exploration("exp1", ExplorationUpdate(name="a"))
+    await exploration_service.close()
+
+    saves = exploration_service._save_explorations.call_args_list
+    assert len(saves) == 1
+    assert saves[0].args[0][0].name == "a"
+
+
+@pytest.mark.asyncio
+async def test_close_waits_for_write_in_progress(exploration_service):
+    """Test that close() returns only after a delayed write already running has finished."""
+    writing = threading.Event()
+    written = []
+
+    def slow_save(explorations):
+        writing.set()
+        time.sleep(0.05)
+        written.append(explorations[0].name)
+
+    exploration_service._save_explorations.side_effect = slow_save
+    with patch.object(exploration_module, "SAVE_DELAY", 0.01):
+        await exploration_service.update_exploration("exp1", ExplorationUpdate(name="a"))
+        await asyncio.to_thread(writing.wait, 1)
+        await exploration_service.close()
+
+    assert written == ["a"]
+
+
+def test_saved_explorations_load_back(tmp_path, monkeypatch):
+    """Test that explorations written to file are read back unchanged."""
+    monkeypatch.chdir(tmp_path)
+    exploration = Exploration(
+        id="exp1",
+        name="Events",
+        query={"source": {"connectionId": "conn1", "table": "events"}, "limit": 100},
+        created_at=datetime(2024, 1, 1),
+        updated_at=datetime(2024, 1, 2),
+        last_run=datetime(2024, 1, 3, 12, 30),
+    )
+
+    ExplorationService()._save_explorations([exploration])
+
+    assert ExplorationService().explorations == {"exp1": exploration}
+    assert not (tmp_path / "explorations.json.tmp").exists()
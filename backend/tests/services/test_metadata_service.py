@@ -0,0 +1,340 @@
+"""Unit tests for the metadata service implementation."""
+
+import asyncio
+import time
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from models.connection import Connection, ConnectionConfig
+from models.metadata import ColumnMetadata, MetadataUpdateRequest, TableMetadata
+from services import metadata_service as metadata_module
+from services.metadata_service import MetadataService
+
+
+@pytest.fixture
+def mock_connection():
+    """Fixture that creates a mock database connection."""
+    return Connection(
+        id="conn1",
+        name="Test Connection",
+        type="postgres",
+        config=ConnectionConfig(
+            host="localhost", port=5432, database="test", user="user", password="password"
+        ),
+        created_at=datetime.now(),
+        updated_at=datetime.now(),
+    )
+
+
+@pytest.fixture
+def mock_connector():
+    """Fixture that creates a connector returning a single table."""
+    connector = MagicMock()
+
+    async def get_metadata():
+        # Yield so concurrent callers overlap while the refresh is in flight
+        await asyncio.sleep(0)
+        return [TableMetadata(name="events")], [], []
+
+    connector.get_metadata = AsyncMock(side_effect=get_metadata)
+    return connector
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_refresh_once(mock_connection, mock_connector):
+    """Test that concurrent requests for uncached metadata share one refresh."""
+    service = MetadataService()
+    with patch("services.metadata_service.get_connector", AsyncMock(return_value=mock_connector)):
+        results = await asyncio.gather(*(service.get_tables(mock_connection) for _ in range(5)))
+
+    assert mock_connector.get_metadata.await_count == 1
+    assert all(tables[0].name == "events" for tables in results)
+
+
+@pytest.mark.asyncio
+async def test_expired_metadata_is_refreshed(mock_connection, mock_connector):
+    """Test that metadata older than the TTL is read from the connector again."""
+    service = MetadataService()
+    with patch("services.metadata_service.get_connector", AsyncMock(return_value=mock_connector)):
+        await service.get_tables(mock_connection)
+        await service.get_tables(mock_connection)
+        assert mock_connector.get_metadata.await_count == 1
+
+        # Expire both this worker's copy and the one shared with other workers
+        service._expires_at["conn1"] = 0.0
+        with patch.object(metadata_module, "METADATA_SHARED_TTL", 0):
+            await service.get_tables(mock_connection)
+
+    assert mock_connector.get_metadata.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_expiry_is_jittered(mock_connection, mock_connector):
+    """Test that metadata expires within the jittered TTL window."""
+    service = MetadataService()
+    with patch("services.metadata_service.get_connector", AsyncMock(return_value=mock_connector)):
+        before = time.monotonic()
+        await service.refresh_metadata(mock_connection)
+        after = time.monotonic()
+
+    ttl = metadata_module.METADATA_CACHE_TTL
+    jitter = metadata_module.METADATA_CACHE_JITTER
+    assert before + ttl * (1 - jitter) <= service._expires_at["conn1"] <= after + ttl * (1 + jitter)
+
+
+@pytest.mark.asyncio
+async def test_table_and_column_lookups_share_one_snapshot(mock_connection):
+    """Test that per-table lookups are served from a single metadata read."""
+    connector = MagicMock()
+    connector.get_metadata = AsyncMock(
+        return_value=(
+            [TableMetadata(name="events"), TableMetadata(name="users")],
+            [
+                ColumnMetadata(name="id", tableName="events", dataType="integer"),
+                ColumnMetadata(name="id", tableName="users", dataType="integer"),
+                ColumnMetadata(name="email", tableName="users", dataType="string"),
+            ],
+            [],
+        )
+    )
+
+    service = MetadataService()
+    with patch("services.metadata_service.get_connector", AsyncMock(return_value=connector)):
+        users = await service.get_columns(mock_connection, "users")
+        events = await service.get_columns(mock_connection, "events")
+        missing = await service.get_columns(mock_connection, "orders")
+        table = await service.get_table(mock_connection, "users")
+
+    assert connector.get_metadata.await_count == 1
+    assert [column.name for column in users] == ["id", "email"]
+    assert [column.name for column in events] == ["id"]
+    assert missing == []
+    assert table.name == "users"
+    assert await service.get_table(mock_connection, "orders") is None
+
+
+@pytest.mark.asyncio
+async def test_expired_metadata_refreshes_past_connector_cache(mock_connection, mock_connector):
+    """Test that reads after expire() share one refresh that bypasses the connector cache."""
+    service = MetadataService()
+    with patch("services.metadata_service.get_connector", AsyncMock(return_value=mock_connector)):
+        await service.get_tables(mock_connection)
+        service.expire("conn1")
+
+        results = await asyncio.gather(
+            service.warm_metadata(mock_connection),
+            service.get_tables(mock_connection),
+            service.get_columns(mock_connection, "events"),
+        )
+
+    assert mock_connector.get_metadata.await_count == 2
+    mock_connector.invalidate_metadata.assert_called_once()
+    assert results[1][0].name == "events"
+    assert "conn1" not in service._force_refresh
+
+
+@pytest.mark.asyncio
+async def test_warm_metadata_logs_errors(mock_connection, mock_connector):
+    """Test that a failed background refresh is not raised and is retried on the next read."""
+    mock_connector.get_metadata.side_effect = ConnectionError("refused")
+    service = MetadataService()
+    with patch("services.metadata_service.get_connector", AsyncMock(return_value=mock_connector)):
+        await service.warm_metadata(mock_connection)
+        with pytest.raises(ConnectionError):
+            await service.get_tables(mock_connection)
+
+    assert mock_connector.get_metadata.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_update_table_metadata_is_seen_by_all_lookups(mock_connection, mock_connector):
+    """Test that a table update shows up in both get_tables and get_table."""
+    service = MetadataService()
+    with patch("services.metadata_service.get_connector", AsyncMock(return_value=mock_connector)):
+        updated = await service.update_table_metadata(
+            mock_connection, "events", MetadataUpdateRequest(displayName="Events")
+        )
+        tables = await service.get_tables(mock_connection)
+        table = await service.get_table(mock_connection, "events")
+
+    assert updated.displayName == "Events"
+    assert tables[0] is table is updated
+    assert (
+        await service.update_table_metadata(
+            mock_connection, "missing", MetadataUpdateRequest(displayName="x")
+        )
+        is None
+    )
+
+
+@pytest.mark.asyncio
+async def test_shared_metadata_is_reused_by_other_services(mock_connection, mock_connector):
+    """Test that metadata read by one worker is loaded by another without the connector."""
+    with patch("services.metadata_service.get_connector", AsyncMock(return_value=mock_connector)):
+        await MetadataService().get_tables(mock_connection)
+        tables = await MetadataService().get_tables(mock_connection)
+
+        # A connection pointed at another database does not reuse the old metadata
+        moved = mock_connection.model_copy(
+            update={"config": mock_connection.config.model_copy(update={"database": "other"})}
+        )
+        await MetadataService().get_tables(moved)
+
+    assert mock_connector.get_metadata.await_count == 2
+    assert tables[0].name == "events"
+    assert tables[0].refreshedAt is not None
+
+
+@pytest.mark.asyncio
+async def test_expire_removes_shared_metadata(mock_connection, mock_connector):
+    """Test that expire() keeps other workers from reloading the stale shared metadata."""
+    with patch("services.metadata_service.get_connector", AsyncMock(return_value=mock_connector)):
+        await MetadataService().get_tables(mock_connection)
+        expiring = MetadataService()
+        expiring.expire("conn1")
+        # The files are removed in the background; wait for that before another worker reads
+        await expiring._removals["conn1"]
+        await MetadataService().get_tables(mock_connection)
+
+    assert mock_connector.get_metadata.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_table_edits_survive_refresh(mock_connection, mock_connector):
+    """Test that table edits are applied again when expired metadata is re-read."""
+    service = MetadataService()
+    with patch("services.metadata_service.get_connector", AsyncMock(return_value=mock_connector)):
+        await service.update_table_metadata(
+            mock_connection, "events", MetadataUpdateRequest(displayName="Events!")
+        )
+        await service.update_table_metadata(
+            mock_connection, "events", MetadataUpdateRequest(category="Sales")
+        )
+        service.expire("conn1")
+        table = await service.get_table(mock_connection, "events")
+
+    assert mock_connector.get_metadata.await_count == 2
+    assert table.displayName == "Events!"
+    assert table.category == "Sales"
+
+
+@pytest.mark.asyncio
+async def test_shared_metadata_keeps_aliased_fields_and_edits(mock_connection, mock_connector):
+    """Test that other workers see table schemas and edits made after the refresh."""
+    mock_connector.get_metadata = AsyncMock(
+        return_value=([TableMetadata(name="events", schema="analytics")], [], [])
+    )
+    with patch("services.metadata_service.get_connector", AsyncMock(return_value=mock_connector)):
+        await MetadataService().update_table_metadata(
+            mock_connection, "events", MetadataUpdateRequest(displayName="Events!")
+        )
+        table = await MetadataService().get_table(mock_connection, "events")
+
+    assert mock_connector.get_metadata.await_count == 1
+    assert table.schema_name == "analytics"
+    assert table.displayName == "Events!"
+
+
+@pytest.mark.asyncio
+async def test_shared_metadata_ignores_unsafe_directory(
+    mock_connection, mock_connector, tmp_path, monkeypatch
+):
+    """Test that a shared directory that is really a symlink is not read or written."""
+    target = tmp_path / "elsewhere"
+    target.mkdir()
+    link = tmp_path / "link"
+    link.symlink_to(target)
+    monkeypatch.setattr(metadata_module, "METADATA_SHARED_DIR", str(link))
+
+    with patch("services.metadata_service.get_connector", AsyncMock(return_value=mock_connector)):
+        await MetadataService().get_tables(mock_connection)
+        await MetadataService().get_tables(mock_connection)
+
+    assert mock_connector.get_metadata.await_count == 2
+    assert list(target.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_connector_cached_tables_are_not_edited(mock_connection):
+    """Test that edits stay out of the connector's cache and its read time is kept."""
+    read_at = datetime(2024, 1, 1)
+    cached = TableMetadata(name="events", refreshedAt=read_at)
+    connector = MagicMock()
+    connector.get_metadata = AsyncMock(return_value=([cached], [], []))
+
+    service = MetadataService()
+    with patch("services.metadata_service.get_connector", AsyncMock(return_value=connector)):
+        table = await service.update_table_metadata(
+            mock_connection, "events", MetadataUpdateRequest(displayName="Events!")
+        )
+
+    assert table.displayName == "Events!"
+    assert table.refreshedAt == read_at
+    assert cached.displayName is None
+
+
+@pytest.mark.asyncio
+async def test_refresh_after_expire_bypasses_connector_cache(mock_connection, mock_connector):
+    """Test that a direct refresh after expire() also skips the connector's cached metadata."""
+    service = MetadataService()
+    service.expire("conn1")
+    with patch("services.metadata_service.get_connector", AsyncMock(return_value=mock_connector)):
+        await service.refresh_metadata(mock_connection)
+
+    mock_connector.invalidate_metadata.assert_called_once()
+    assert "conn1" not in service._force_refresh
+
+
+@pytest.mark.asyncio
+async def test_edits_from_other_workers_survive_connector_refresh(mock_connection, mock_connector):
+    """Test that a worker re-reading the database keeps table edits made on other workers."""
+    with patch("services.metadata_service.get_connector", AsyncMock(return_value=mock_connector)):
+        await MetadataService().update_table_metadata(
+            mock_connection, "events", MetadataUpdateRequest(displayName="Events!")
+        )
+
+        refreshing = MetadataService()
+        refreshing.expire("conn1")
+        table = await refreshing.get_table(mock_connection, "events")
+        # A third worker loads what the refreshing worker shared
+        shared = await MetadataService().get_table(mock_connection, "events")
+
+    assert mock_connector.get_metadata.await_count == 2
+    assert table.displayName == shared.displayName == "Events!"
+
+
+@pytest.mark.asyncio
+async def test_repeated_expire_runs_removals_in_order(mock_connection, mock_connector):
+    """Test that each expire() waits for the previous removal and finished ones are dropped."""
+    service = MetadataService()
+    service.expire("conn1")
+    first = service._removals["conn1"]
+    service.expire("conn1")
+    second = service._removals["conn1"]
+
+    await second
+    await asyncio.sleep(0)
+
+    assert first.done()
+    assert service._removals == {}
+
+
+@pytest.mark.asyncio
+async def test_deleted_connection_state_is_dropped(mock_connection, mock_connector):
+    """Test that deleting a connection drops its metadata, edits and refresh lock."""
+    service = MetadataService()
+    with patch("services.metadata_service.get_connector", AsyncMock(return_value=mock_connector)):
+        await service.update_table_metadata(
+            mock_connection, "events", MetadataUpdateRequest(displayName="Events!")
+        )
+
+    service.expire("conn1", deleted=True)
+    await service._removals["conn1"]
+
+    assert "conn1" not in service.metadata
+    assert "conn1" not in service._table_edits
+    assert "conn1" not in service._force_refresh
+    assert "conn1" not in service._refresh_locks
+    assert metadata_module._read_edits("conn1") is None
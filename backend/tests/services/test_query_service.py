@@ -1,12 +1,14 @@
 """Unit tests for the query service implementation."""
 
+import asyncio
 from datetime import datetime
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
 from models.connection import Connection, ConnectionConfig
 from models.query import QueryModel, QueryResult, QuerySource
+from services import query_service as query_module
 from services.query_service import QueryService
 
 
@@ -37,6 +39,20 @@ def mock_query_model():
     )
 
 
+@pytest.fixture
+def mock_connector():
+    """Fixture that makes the connector factory return one mock Postgres connector."""
+    connector = MagicMock()
+    connector.get_dialect.return_value = "postgresql"
+    connector.connect = AsyncMock()
+    connector.close = AsyncMock()
+    with patch(
+        "connectors.connector_factory.DatabaseConnectorFactory.create_connector",
+        return_value=connector,
+    ):
+        yield connector
+
+
 @pytest.fixture
 def mock_query_result():
     """Fixture that creates a mock query result."""
@@ -143,6 +159,455 @@ class TestQueryService:
         assert result.valid is True
         assert len(result.errors) == 0
 
+    @pytest.mark.asyncio
+    @patch("services.query_service.SQLTranslator.translate", return_value="SELECT id FROM events")
+    async def test_execute_query_columnar(
+        self, mock_translate, mock_connection, mock_query_model, mock_connector
+    ):
+        """Test that columnar execution returns one list of values per column."""
+        mock_connector.execute_query_columnar = AsyncMock(
+            return_value=({"id": [1, 2]}, [{"name": "id", "type": "integer"}], 0.1)
+        )
+
+        query_service = QueryService()
+        result = await query_service.execute_query(mock_connection, mock_query_model, columnar=True)
+
+        assert result.error is None
+        assert result.data == {"id": [1, 2]}
+        assert result.rowCount == 2
+
+    @pytest.mark.asyncio
+    @patch("services.query_service.SQLTranslator.translate", return_value="SELECT id FROM events")
+    async def test_execute_query_reuses_rendered_sql(
+        self, mock_translate, mock_connection, mock_query_model, mock_connector
+    ):
+        """Test that running the same query model twice translates it only once."""
+        # Turn off result caching so the second run reaches the connector
+        mock_connection.config.query_cache_ttl = 0
+        mock_connector.execute_query = AsyncMock(
+            return_value=([{"id": 1}], [{"name": "id", "type": "integer"}], 0.1)
+        )
+
+        query_service = QueryService()
+        await query_service.execute_query(mock_connection, mock_query_model)
+        result = await query_service.execute_query(mock_connection, mock_query_model)
+
+        assert result.sql == "SELECT id FROM events"
+        assert mock_translate.call_count == 1
+        assert mock_connector.execute_query.await_count == 2
+
+        # A different query model is translated again
+        await query_service.execute_query(
+            mock_connection, mock_query_model.model_copy(update={"limit": 5})
+        )
+        assert mock_translate.call_count == 2
+
+    @pytest.mark.asyncio
+    @patch("services.query_service.SQLTranslator.translate", return_value="SELECT id FROM events")
+    async def test_execute_query_reuses_results(
+        self, mock_translate, mock_connection, mock_query_model, mock_connector
+    ):
+        """Test that identical queries share one database call, including concurrent ones."""
+
+        async def mock_execute(sql, params=None):
+            await asyncio.sleep(0)
+            return [{"id": 1}], [{"name": "id", "type": "integer"}], 0.1
+
+        mock_connector.execute_query = AsyncMock(side_effect=mock_execute)
+
+        query_service = QueryService()
+        results = await asyncio.gather(
+            *(query_service.execute_query(mock_connection, mock_query_model) for _ in range(3))
+        )
+        results.append(await query_service.execute_query(mock_connection, mock_query_model))
+
+        assert mock_connector.execute_query.await_count == 1
+        assert all(result.data == [{"id": 1}] for result in results)
+
+        # Editing the connection stops its cached results from being used
+        mock_connection.updated_at = datetime.now()
+        await query_service.execute_query(mock_connection, mock_query_model)
+        assert mock_connector.execute_query.await_count == 2
+
+    @pytest.mark.asyncio
+    @patch("services.query_service.SQLTranslator.translate", return_value="SELECT id FROM events")
+    async def test_refresh_bypasses_result_cache(
+        self, mock_translate, mock_connection, mock_query_model, mock_connector
+    ):
+        """Test that a refresh runs the query again and its result replaces the cached one."""
+        mock_connector.execute_query = AsyncMock(
+            side_effect=[
+                ([{"id": 1}], [{"name": "id", "type": "integer"}], 0.1),
+                ([{"id": 2}], [{"name": "id", "type": "integer"}], 0.1),
+            ]
+        )
+
+        query_service = QueryService()
+        await query_service.execute_query(mock_connection, mock_query_model)
+        refreshed = await query_service.execute_query(
+            mock_connection, mock_query_model, refresh=True
+        )
+        cached = await query_service.execute_query(mock_connection, mock_query_model)
+
+        assert mock_connector.execute_query.await_count == 2
+        assert refreshed.data == cached.data == [{"id": 2}]
+        assert not refreshed.cacheHit
+        assert cached.cacheHit
+
+    @pytest.mark.asyncio
+    @patch("services.query_service.SQLTranslator.translate", return_value="SELECT id FROM events")
+    async def test_export_query(
+        self, mock_translate, mock_connection, mock_query_model, mock_connector
+    ):
+        """Test that export_query streams the chunks written by the connector's COPY."""
+
+        async def mock_copy(sql, params, out, format="binary"):
+            await out(b"id\n")
+            await out(b"1\n")
+
+        mock_connector.supports_export = True
+        mock_connector.execute_query_copy = mock_copy
+
+        query_service = QueryService()
+        chunks = await query_service.export_query(mock_connection, mock_query_model, "csv")
+
+        assert [chunk async for chunk in chunks] == [b"id\n", b"1\n"]
+        # The connector stays open in the registry for later requests
+        mock_connector.close.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    @patch("services.query_service.SQLTranslator.translate", return_value="SELECT id FROM events")
+    async def test_export_query_stops_copy_when_reader_leaves(
+        self, mock_translate, mock_connection, mock_query_model, mock_connector
+    ):
+        """Test that closing the export stream mid-way stops the COPY, even with a full queue."""
+        copy_finished = asyncio.Event()
+
+        async def mock_copy(sql, params, out, format="binary"):
+            try:
+                while True:
+                    await out(b"row\n")
+            finally:
+                copy_finished.set()
+
+        mock_connector.supports_export = True
+        mock_connector.execute_query_copy = mock_copy
+
+        chunks = await QueryService().export_query(mock_connection, mock_query_model, "csv")
+        assert await chunks.__anext__() == b"row\n"
+        # Let the COPY fill the queue before the reader goes away
+        for _ in range(query_module.EXPORT_QUEUE_SIZE + 2):
+            await asyncio.sleep(0)
+        await asyncio.wait_for(chunks.aclose(), timeout=1)
+
+        assert copy_finished.is_set()
+        # The COPY task has finished rather than blocking on the full queue
+        assert asyncio.all_tasks() == {asyncio.current_task()}
+
+    @pytest.mark.asyncio
+    @patch("services.query_service.SQLTranslator.translate", return_value="SELECT id FROM events")
+    async def test_stream_query(
+        self, mock_translate, mock_connection, mock_query_model, mock_connector
+    ):
+        """Test that stream_query yields the connector's JSON lines and closes its stream."""
+        closed = []
+
+        async def mock_stream(sql):
+            try:
+                yield b'{"id":1}\n'
+                yield b'{"id":2}\n'
+            finally:
+                closed.append(sql)
+
+        mock_connector.execute_with_streaming_json = mock_stream
+
+        query_service = QueryService()
+        rows = await query_service.stream_query(mock_connection, mock_query_model)
+
+        assert [row async for row in rows] == [b'{"id":1}\n', b'{"id":2}\n']
+        assert closed == ["SELECT id FROM events"]
+
+    @pytest.mark.asyncio
+    @patch("services.query_service.SQLTranslator.translate", return_value="SELECT id FROM events")
+    async def test_stream_query_replays_cached_result(
+        self, mock_translate, mock_connection, mock_query_model, mock_connector
+    ):
+        """Test that stream_query replays a cached result unless asked to refresh."""
+
+        async def mock_stream(sql):
+            yield b'{"id":2}\n'
+
+        mock_connector.execute_query = AsyncMock(
+            return_value=([{"id": 1}], [{"name": "id", "type": "integer"}], 0.1)
+        )
+        mock_connector.execute_with_streaming_json = mock_stream
+
+        query_service = QueryService()
+        await query_service.execute_query(mock_connection, mock_query_model)
+        cached = await query_service.stream_query(mock_connection, mock_query_model)
+        fresh = await query_service.stream_query(mock_connection, mock_query_model, refresh=True)
+
+        assert [row async for row in cached] == [b'{"id":1}\n']
+        assert [row async for row in fresh] == [b'{"id":2}\n']
+
+    @pytest.mark.asyncio
+    @patch("services.query_service.SQLTranslator.translate", return_value="SELECT id FROM events")
+    async def test_stream_query_holds_slot_until_closed(
+        self, mock_translate, mock_connection, mock_query_model, mock_connector
+    ):
+        """Test that a stream keeps its query slot until the client stops reading."""
+        mock_connection.config.query_cache_ttl = 0
+        mock_connection.config.max_concurrent_queries = 1
+
+        async def mock_stream(sql):
+            yield b'{"id":1}\n'
+            yield b'{"id":2}\n'
+
+        mock_connector.execute_with_streaming_json = mock_stream
+        mock_connector.execute_query = AsyncMock(
+            return_value=([{"id": 1}], [{"name": "id", "type": "integer"}], 0.1)
+        )
+
+        query_service = QueryService()
+        rows = await query_service.stream_query(mock_connection, mock_query_model)
+        assert await rows.__anext__() == b'{"id":1}\n'
+
+        with patch.object(query_module, "QUERY_SLOT_TIMEOUT", 0.01):
+            blocked = await query_service.execute_query(mock_connection, mock_query_model)
+            await rows.aclose()
+            result = await query_service.execute_query(mock_connection, mock_query_model)
+
+        assert "busy" in blocked.error
+        assert result.error is None
+
+    @pytest.mark.asyncio
+    @patch("services.query_service.SQLTranslator.translate", return_value="SELECT bad")
+    async def test_stream_query_raises_before_streaming(
+        self, mock_translate, mock_connection, mock_query_model, mock_connector
+    ):
+        """Test that an error reading the first row is raised before any output is sent."""
+
+        async def mock_stream(sql):
+            raise RuntimeError("syntax error")
+            yield b""
+
+        mock_connector.execute_with_streaming_json = mock_stream
+
+        with pytest.raises(RuntimeError, match="syntax error"):
+            await QueryService().stream_query(mock_connection, mock_query_model)
+
+    @pytest.mark.asyncio
+    @patch("services.query_service.SQLTranslator.translate", return_value="SELECT id FROM events")
+    async def test_execute_query_limits_concurrency(
+        self, mock_translate, mock_connection, mock_query_model, mock_connector
+    ):
+        """Test that a connection runs at most max_concurrent_queries queries at once."""
+        mock_connection.config.query_cache_ttl = 0
+        mock_connection.config.max_concurrent_queries = 2
+        running = 0
+        peak = 0
+
+        async def mock_execute(sql, params=None):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return [{"id": 1}], [{"name": "id", "type": "integer"}], 0.1
+
+        mock_connector.execute_query = AsyncMock(side_effect=mock_execute)
+
+        query_service = QueryService()
+        results = await asyncio.gather(
+            *(query_service.execute_query(mock_connection, mock_query_model) for _ in range(5))
+        )
+
+        assert peak == 2
+        assert mock_connector.execute_query.await_count == 5
+        assert all(result.error is None for result in results)
+
+    @pytest.mark.asyncio
+    @patch("services.query_service.SQLTranslator.translate", return_value="SELECT id FROM events")
+    async def test_execute_query_slot_timeout(
+        self, mock_translate, mock_connection, mock_query_model, mock_connector
+    ):
+        """Test that a query waiting too long for a slot returns an error result."""
+        mock_connection.config.query_cache_ttl = 0
+        mock_connection.config.max_concurrent_queries = 1
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def mock_execute(sql, params=None):
+            started.set()
+            await release.wait()
+            return [{"id": 1}], [{"name": "id", "type": "integer"}], 0.1
+
+        mock_connector.execute_query = AsyncMock(side_effect=mock_execute)
+
+        query_service = QueryService()
+        with patch.object(query_module, "QUERY_SLOT_TIMEOUT", 0.01):
+            first = asyncio.create_task(
+                query_service.execute_query(mock_connection, mock_query_model)
+            )
+            await started.wait()
+            second = await query_service.execute_query(mock_connection, mock_query_model)
+            release.set()
+            first = await first
+
+        assert "busy" in second.error
+        assert first.error is None
+
+    @pytest.mark.asyncio
+    @patch(
+        "services.query_service.SQLTranslator.translate_count",
+        return_value="SELECT COUNT(*) AS count FROM (SELECT id FROM events) AS sub_query",
+    )
+    @patch(
+        "services.query_service.SQLTranslator.translate",
+        side_effect=lambda query_model: f"SELECT id FROM events OFFSET {query_model.offset}",
+    )
+    async def test_paging_reuses_total_count(
+        self, mock_translate, mock_translate_count, mock_connection, mock_connector
+    ):
+        """Test that later pages of a query reuse the first page's total count."""
+
+        async def mock_execute(sql, params=None):
+            if sql.startswith("SELECT COUNT"):
+                return [{"count": 250}], [{"name": "count", "type": "integer"}], 0.1
+            return [{"id": 1}], [{"name": "id", "type": "integer"}], 0.1
+
+        mock_connector.execute_query = AsyncMock(side_effect=mock_execute)
+
+        query_service = QueryService()
+        results = [
+            await query_service.execute_query(
+                mock_connection,
+                QueryModel(
+                    source=QuerySource(connectionId="conn1", table="events"),
+                    limit=100,
+                    offset=offset,
+                    isServerPagination=True,
+                ),
+            )
+            for offset in (0, 100, 200)
+        ]
+
+        executed = [call.args[0] for call in mock_connector.execute_query.await_args_list]
+        assert sum(sql.startswith("SELECT COUNT") for sql in executed) == 1
+        assert len(executed) == 4
+        assert all(result.totalCount == 250 for result in results)
+        # The count SQL is rendered once, from a copy of the model without pagination
+        assert mock_translate_count.call_count == 1
+        assert mock_translate_count.call_args.args[0].offset is None
+
+    @pytest.mark.asyncio
+    @patch("services.query_service.SQLTranslator.translate_count", return_value="SELECT COUNT")
+    @patch("services.query_service.SQLTranslator.translate", return_value="SELECT id")
+    async def test_count_and_data_run_concurrently(
+        self, mock_translate, mock_translate_count, mock_connection, mock_connector
+    ):
+        """Test that the count query and the data query are in flight at the same time."""
+        both_started = asyncio.Event()
+        started = []
+
+        async def mock_execute(sql, params=None):
+            started.append(sql)
+            if len(started) == 2:
+                both_started.set()
+            # Each statement finishes only once the other one has started
+            await asyncio.wait_for(both_started.wait(), timeout=1)
+            if sql == "SELECT COUNT":
+                return [{"count": 5}], [{"name": "count", "type": "integer"}], 0.1
+            return [{"id": 1}], [{"name": "id", "type": "integer"}], 0.1
+
+        mock_connector.execute_query = AsyncMock(side_effect=mock_execute)
+
+        result = await QueryService().execute_query(
+            mock_connection,
+            QueryModel(
+                source=QuerySource(connectionId="conn1", table="events"),
+                limit=1,
+                offset=0,
+                isServerPagination=True,
+            ),
+        )
+
+        assert result.error is None
+        assert sorted(started) == ["SELECT COUNT", "SELECT id"]
+        assert result.totalCount == 5
+        assert result.data == [{"id": 1}]
+
+    @pytest.mark.asyncio
+    @patch("services.query_service.SQLTranslator.translate_count", return_value="SELECT COUNT")
+    @patch("services.query_service.SQLTranslator.translate", return_value="SELECT id")
+    async def test_count_and_data_each_take_a_slot(
+        self, mock_translate, mock_translate_count, mock_connection, mock_connector
+    ):
+        """Test that the count and data queries each hold a slot for their pooled connection."""
+        mock_connection.config.max_concurrent_queries = 1
+        running = 0
+        peak = 0
+
+        async def mock_execute(sql, params=None):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            if sql == "SELECT COUNT":
+                return [{"count": 5}], [{"name": "count", "type": "integer"}], 0.1
+            return [{"id": 1}], [{"name": "id", "type": "integer"}], 0.1
+
+        mock_connector.execute_query = AsyncMock(side_effect=mock_execute)
+
+        result = await QueryService().execute_query(
+            mock_connection,
+            QueryModel(
+                source=QuerySource(connectionId="conn1", table="events"),
+                limit=1,
+                offset=0,
+                isServerPagination=True,
+            ),
+        )
+
+        assert result.error is None
+        assert result.totalCount == 5
+        assert peak == 1
+
+    @pytest.mark.asyncio
+    @patch("services.query_service.SQLTranslator.translate_count", return_value="SELECT COUNT")
+    @patch("services.query_service.SQLTranslator.translate", return_value="SELECT id")
+    async def test_probe_row_replaces_count(
+        self, mock_translate, mock_translate_count, mock_connection, mock_connector
+    ):
+        """Test that pages without an exact total fetch limit + 1 rows instead of counting."""
+        mock_connector.execute_query = AsyncMock(
+            return_value=(
+                [{"id": 1}, {"id": 2}, {"id": 3}],
+                [{"name": "id", "type": "integer"}],
+                0.1,
+            )
+        )
+
+        result = await QueryService().execute_query(
+            mock_connection,
+            QueryModel(
+                source=QuerySource(connectionId="conn1", table="events"),
+                limit=2,
+                offset=10,
+                isServerPagination=True,
+                needsExactTotal=False,
+            ),
+        )
+
+        mock_translate_count.assert_not_called()
+        mock_connector.execute_query.assert_awaited_once()
+        assert mock_translate.call_args.args[0].limit == 3
+        assert result.data == [{"id": 1}, {"id": 2}]
+        assert result.rowCount == 2
+        assert result.hasMore is True
+        assert result.totalCount == 13
+
     @pytest.mark.asyncio
     async def test_save_to_history(self, mock_connection, mock_query_model, mock_query_result):
         """Test that queries are correctly saved to the history."""
@@ -1,6 +1,8 @@
 import pytest
+from pydantic import ValidationError
 
 from models.query import (
+    MAX_FILTER_DEPTH,
     Comparison,
     FilterCondition,
     LogicalFilterGroup,
@@ -108,6 +110,65 @@ class TestSQLTranslator:
         assert "ORDER BY request_count DESC" in sql
         assert "LIMIT 100" in sql
 
+    def test_nested_filter_groups_from_dict(self):
+        # Groups are told apart from conditions by their "logic" key
+        query = QueryModel.model_validate(
+            {
+                "source": {"connectionId": "conn1", "table": "events"},
+                "filters": [
+                    {"column": "status", "operator": "=", "value": "active"},
+                    {
+                        "logic": "or",
+                        "conditions": [
+                            {"column": "country", "operator": "=", "value": "US"},
+                            {
+                                "logic": "and",
+                                "conditions": [
+                                    {"column": "country", "operator": "=", "value": "CA"},
+                                    {"column": "plan", "operator": "=", "value": "pro"},
+                                ],
+                            },
+                        ],
+                    },
+                ],
+            }
+        )
+
+        assert isinstance(query.filters[0], FilterCondition)
+        assert isinstance(query.filters[1], LogicalFilterGroup)
+        assert isinstance(query.filters[1].conditions[0], FilterCondition)
+        assert isinstance(query.filters[1].conditions[1], LogicalFilterGroup)
+
+    def test_redundant_filter_groups_are_flattened(self):
+        # Same-logic and single-item groups are merged into their parent; empty ones dropped
+        status = FilterCondition(column="status", operator="=", value="active")
+        us = FilterCondition(column="country", operator="=", value="US")
+        ca = FilterCondition(column="country", operator="=", value="CA")
+        query = QueryModel(
+            filters=[
+                LogicalFilterGroup(logic="and", conditions=[status]),
+                LogicalFilterGroup(
+                    logic="or",
+                    conditions=[us, LogicalFilterGroup(logic="OR", conditions=[ca])],
+                ),
+                LogicalFilterGroup(logic="or", conditions=[]),
+            ]
+        )
+
+        assert query.filters == [status, LogicalFilterGroup(logic="or", conditions=[us, ca])]
+
+    def test_filter_depth_limit(self):
+        # Alternate logic so no level can be merged away
+        group = FilterCondition(column="status", operator="=", value="active")
+        for level in range(MAX_FILTER_DEPTH + 1):
+            group = LogicalFilterGroup(
+                logic="or" if level % 2 else "and",
+                conditions=[group, FilterCondition(column="n", operator="=", value=level)],
+            )
+
+        with pytest.raises(ValidationError):
+            QueryModel(filters=[group])
+
     def test_filter_condition_operators(self, postgres_translator):
         # Test different operators
         query = QueryModel(